@@ -0,0 +1,48 @@
+"""add_table_versions
+
+Revision ID: 3c5d8f1a9e27
+Revises: e2a9c4f61b08
+Create Date: 2026-01-26 10:42:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5d8f1a9e27'
+down_revision: Union[str, None] = 'e2a9c4f61b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('table_versions',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+    op.execute("INSERT INTO table_versions (table_name, version) VALUES ('students', 0)")
+
+    # One bump per statement, in the writing transaction (covers COPY and scripts too)
+    op.execute("""
+        CREATE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER students_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON students
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER students_bump_version ON students")
+    op.execute("DROP FUNCTION bump_table_version()")
+    op.drop_table('table_versions')
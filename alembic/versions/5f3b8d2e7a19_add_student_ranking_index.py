@@ -0,0 +1,32 @@
+"""add_student_ranking_index
+
+Revision ID: 5f3b8d2e7a19
+Revises: 9a4e2b7c1d60
+Create Date: 2026-02-09 11:04:26.381527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3b8d2e7a19'
+down_revision: Union[str, None] = '9a4e2b7c1d60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rankings within a class type: best total score first, id as tie-breaker
+    op.create_index(
+        'ix_students_class_type_total_score_id',
+        'students',
+        ['class_type', sa.text('total_score DESC'), 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_students_class_type_total_score_id', table_name='students')
@@ -0,0 +1,131 @@
+"""scheme_student_subject_stats
+
+Revision ID: 7c2e5a9d4b31
+Revises: 5f3b8d2e7a19
+Create Date: 2026-10-18 10:12:47.205316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e5a9d4b31'
+down_revision: Union[str, None] = '5f3b8d2e7a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SUBJECTS = ['khmer', 'math', 'history', 'geography', 'ethics', 'earth_science',
+            'chemistry', 'physics', 'biology', 'foreign_language']
+
+
+def _ranges(percentage: str) -> str:
+    return f"""
+        count(*) FILTER (WHERE {percentage} < 25),
+        count(*) FILTER (WHERE {percentage} >= 25 AND {percentage} < 50),
+        count(*) FILTER (WHERE {percentage} >= 50 AND {percentage} < 75),
+        count(*) FILTER (WHERE {percentage} >= 75)"""
+
+
+def upgrade() -> None:
+    class_type_enum = postgresql.ENUM('social_science', 'science', name='classtypeenum', create_type=False)
+
+    # Students of a scheme, ordered by id (replaces the single-column index)
+    op.create_index('ix_students_scoring_scheme_id_id', 'students', ['scoring_scheme_id', 'id'], unique=False)
+    op.drop_index('ix_students_scoring_scheme_id', table_name='students')
+
+    op.add_column('student_stats', sa.Column('average_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE student_stats s SET average_count = c.average_count
+        FROM (
+            SELECT class_type, gender, COALESCE(grade::text, '') AS grade, count(average_score) AS average_count
+            FROM students GROUP BY 1, 2, 3
+        ) c
+        WHERE (s.class_type, s.gender, s.grade) = (c.class_type, c.gender, c.grade)
+    """)
+
+    # Subject rows become per class type and scoring scheme: recreate them
+    op.drop_table('student_subject_stats')
+    op.create_table('student_subject_stats',
+        sa.Column('class_type', class_type_enum, nullable=False),
+        sa.Column('scoring_scheme_id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('max_score', sa.Float(), nullable=False),
+        sa.Column('student_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('scored_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('first_student_id', sa.Integer(), nullable=True),
+        sa.Column('score_sum', sa.Float(), nullable=False, server_default='0.0'),
+        sa.Column('score_sumsq', sa.Float(), nullable=False, server_default='0.0'),
+        sa.Column('score_min', sa.Float(), nullable=True),
+        sa.Column('score_max', sa.Float(), nullable=True),
+        sa.Column('extremes_stale', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('pass_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('fail_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_0_24', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_25_49', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_50_74', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_75_100', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['scoring_scheme_id'], ['scoring_schemes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('class_type', 'scoring_scheme_id', 'subject')
+    )
+
+    # Populate from existing students (same rules as StudentStatsStore.rebuild)
+    for subject in SUBJECTS:
+        score, max_score = f"s.{subject}_score", f"sc.{subject}_max"
+        percentage = f"({score} / {max_score} * 100)"
+        op.execute(f"""
+            INSERT INTO student_subject_stats
+            SELECT s.class_type, s.scoring_scheme_id, '{subject}', {max_score}, count(*), count({score}),
+                   min(s.id), COALESCE(sum({score}), 0.0), COALESCE(sum({score} * {score}), 0.0),
+                   min({score}), max({score}), false,
+                   count(*) FILTER (WHERE {percentage} >= 50),
+                   count(*) FILTER (WHERE {percentage} < 50),{_ranges(percentage)}
+            FROM students s JOIN scoring_schemes sc ON sc.id = s.scoring_scheme_id
+            WHERE {max_score} > 0
+            GROUP BY s.class_type, s.scoring_scheme_id, {max_score}
+        """)
+
+
+def downgrade() -> None:
+    class_type_enum = postgresql.ENUM('social_science', 'science', name='classtypeenum', create_type=False)
+
+    op.drop_table('student_subject_stats')
+    op.create_table('student_subject_stats',
+        sa.Column('class_type', class_type_enum, nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('student_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.Float(), nullable=False, server_default='0.0'),
+        sa.Column('score_sumsq', sa.Float(), nullable=False, server_default='0.0'),
+        sa.Column('score_min', sa.Float(), nullable=True),
+        sa.Column('score_max', sa.Float(), nullable=True),
+        sa.Column('max_score', sa.Float(), nullable=True),
+        sa.Column('pass_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('fail_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_0_24', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_25_49', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_50_74', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_75_100', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('class_type', 'subject')
+    )
+    for subject in SUBJECTS:
+        score, max_score = f"s.{subject}_score", f"sc.{subject}_max"
+        percentage = f"({score} / {max_score} * 100)"
+        op.execute(f"""
+            INSERT INTO student_subject_stats
+            SELECT s.class_type, '{subject}', count(*), sum({score}), sum({score} * {score}),
+                   min({score}), max({score}), max({max_score}),
+                   count(*) FILTER (WHERE {percentage} >= 50),
+                   count(*) FILTER (WHERE {percentage} < 50),{_ranges(percentage)}
+            FROM students s JOIN scoring_schemes sc ON sc.id = s.scoring_scheme_id
+            WHERE {max_score} > 0 AND {score} IS NOT NULL
+            GROUP BY s.class_type
+        """)
+
+    op.drop_column('student_stats', 'average_count')
+
+    op.create_index('ix_students_scoring_scheme_id', 'students', ['scoring_scheme_id'], unique=False)
+    op.drop_index('ix_students_scoring_scheme_id_id', table_name='students')
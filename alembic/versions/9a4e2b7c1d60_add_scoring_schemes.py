@@ -0,0 +1,104 @@
+"""add_scoring_schemes
+
+Revision ID: 9a4e2b7c1d60
+Revises: 3c5d8f1a9e27
+Create Date: 2026-02-02 09:18:51.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e2b7c1d60'
+down_revision: Union[str, None] = '3c5d8f1a9e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MAX_COLUMNS = ['khmer_max', 'math_max', 'history_max', 'geography_max', 'ethics_max', 'earth_science_max',
+               'chemistry_max', 'physics_max', 'biology_max', 'physical_education_max', 'foreign_language_max']
+
+# Max scores given to new students until now (column defaults and class-type overrides)
+DEFAULT_MAX_SCORES = {
+    'social_science': {'khmer_max': 125.0, 'math_max': 75.0, 'history_max': 75.0},
+    'science': {'khmer_max': 75.0, 'math_max': 125.0, 'history_max': 50.0},
+}
+COLUMN_DEFAULTS = {'geography_max': 75.0, 'ethics_max': 75.0, 'earth_science_max': 50.0, 'chemistry_max': 75.0,
+                   'physics_max': 75.0, 'biology_max': 75.0, 'physical_education_max': 75.0,
+                   'foreign_language_max': 50.0}
+
+
+def _coalesced(column: str, prefix: str = '') -> str:
+    """Student max column with NULL read as the value new students got (per class type)."""
+    social, science = DEFAULT_MAX_SCORES['social_science'], DEFAULT_MAX_SCORES['science']
+    if column in social:
+        return (f"COALESCE({prefix}{column}, CASE WHEN {prefix}class_type = 'science' "
+                f"THEN {science[column]} ELSE {social[column]} END)")
+    return f"COALESCE({prefix}{column}, {COLUMN_DEFAULTS[column]})"
+
+
+def upgrade() -> None:
+    class_type_enum = postgresql.ENUM('social_science', 'science', name='classtypeenum', create_type=False)
+
+    op.create_table('scoring_schemes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('class_type', class_type_enum, nullable=False),
+        sa.Column('exam_year', sa.Integer(), nullable=False),
+        *[sa.Column(column, sa.Float(), nullable=False) for column in MAX_COLUMNS],
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scoring_schemes_class_type_exam_year', 'scoring_schemes', ['class_type', 'exam_year'], unique=False)
+
+    # One scheme per distinct set of max scores in use, the most common last so
+    # it becomes the current scheme of its class type (highest id)
+    columns = ', '.join(MAX_COLUMNS)
+    coalesced = ', '.join(f"{_coalesced(column)} AS {column}" for column in MAX_COLUMNS)
+    op.execute(f"""
+        INSERT INTO scoring_schemes (class_type, exam_year, {columns})
+        SELECT class_type, EXTRACT(YEAR FROM now())::int, {columns}
+        FROM (SELECT class_type, {coalesced} FROM students) AS maxima
+        GROUP BY class_type, {columns}
+        ORDER BY count(*), class_type
+    """)
+    for class_type, overrides in DEFAULT_MAX_SCORES.items():
+        values = {**COLUMN_DEFAULTS, **overrides}
+        op.execute(f"""
+            INSERT INTO scoring_schemes (class_type, exam_year, {columns})
+            SELECT '{class_type}', EXTRACT(YEAR FROM now())::int, {', '.join(str(values[c]) for c in MAX_COLUMNS)}
+            WHERE NOT EXISTS (SELECT 1 FROM scoring_schemes WHERE class_type = '{class_type}')
+        """)
+
+    op.add_column('students', sa.Column('scoring_scheme_id', sa.Integer(), nullable=True))
+    matches = ' AND '.join(f"scoring_schemes.{column} = {_coalesced(column, 'students.')}" for column in MAX_COLUMNS)
+    op.execute(f"""
+        UPDATE students SET scoring_scheme_id = scoring_schemes.id
+        FROM scoring_schemes
+        WHERE scoring_schemes.class_type = students.class_type AND {matches}
+    """)
+    op.alter_column('students', 'scoring_scheme_id', nullable=False)
+    op.create_foreign_key('fk_students_scoring_scheme_id', 'students', 'scoring_schemes', ['scoring_scheme_id'], ['id'])
+    op.create_index(op.f('ix_students_scoring_scheme_id'), 'students', ['scoring_scheme_id'], unique=False)
+
+    for column in MAX_COLUMNS:
+        op.drop_column('students', column)
+
+
+def downgrade() -> None:
+    for column in MAX_COLUMNS:
+        op.add_column('students', sa.Column(column, sa.Float(), nullable=True))
+    assignments = ', '.join(f"{column} = scoring_schemes.{column}" for column in MAX_COLUMNS)
+    op.execute(f"""
+        UPDATE students SET {assignments}
+        FROM scoring_schemes
+        WHERE scoring_schemes.id = students.scoring_scheme_id
+    """)
+
+    op.drop_index(op.f('ix_students_scoring_scheme_id'), table_name='students')
+    op.drop_constraint('fk_students_scoring_scheme_id', 'students', type_='foreignkey')
+    op.drop_column('students', 'scoring_scheme_id')
+    op.drop_index('ix_scoring_schemes_class_type_exam_year', table_name='scoring_schemes')
+    op.drop_table('scoring_schemes')
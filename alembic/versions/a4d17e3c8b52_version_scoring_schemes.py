@@ -0,0 +1,32 @@
+"""version_scoring_schemes
+
+Revision ID: a4d17e3c8b52
+Revises: 7c2e5a9d4b31
+Create Date: 2026-10-18 11:37:05.914263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d17e3c8b52'
+down_revision: Union[str, None] = '7c2e5a9d4b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Student responses include the scheme max scores: scheme writes change the ETag too
+    op.execute("INSERT INTO table_versions (table_name, version) VALUES ('scoring_schemes', 0)")
+    op.execute("""
+        CREATE TRIGGER scoring_schemes_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON scoring_schemes
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER scoring_schemes_bump_version ON scoring_schemes")
+    op.execute("DELETE FROM table_versions WHERE table_name = 'scoring_schemes'")
@@ -0,0 +1,44 @@
+"""add_student_listing_indexes
+
+Revision ID: b7e41c9a2d53
+Revises: 8eb3ca3150e9
+Create Date: 2026-01-12 10:21:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e41c9a2d53'
+down_revision: Union[str, None] = '8eb3ca3150e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filters (class_type, grade) and the common sort columns, with id as tie-breaker
+    op.create_index('ix_students_class_type_grade_id', 'students', ['class_type', 'grade', 'id'], unique=False)
+    op.create_index('ix_students_total_score_id', 'students', ['total_score', 'id'], unique=False)
+    op.create_index('ix_students_average_score_id', 'students', ['average_score', 'id'], unique=False)
+    op.create_index('ix_students_last_name_id', 'students', ['last_name', 'id'], unique=False)
+    op.create_index('ix_students_first_name_id', 'students', ['first_name', 'id'], unique=False)
+
+    # Trigram index for the name search: ILIKE '%term%' on "first_name last_name"
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_students_full_name_trgm ON students "
+        "USING gin ((first_name || ' ' || last_name) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_students_full_name_trgm")
+    op.drop_index('ix_students_first_name_id', table_name='students')
+    op.drop_index('ix_students_last_name_id', table_name='students')
+    op.drop_index('ix_students_average_score_id', table_name='students')
+    op.drop_index('ix_students_total_score_id', table_name='students')
+    op.drop_index('ix_students_class_type_grade_id', table_name='students')
+    # pg_trgm is left installed, other objects may depend on it
@@ -0,0 +1,95 @@
+"""add_student_stats_tables
+
+Revision ID: e2a9c4f61b08
+Revises: b7e41c9a2d53
+Create Date: 2026-01-19 14:05:12.733941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c4f61b08'
+down_revision: Union[str, None] = 'b7e41c9a2d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SUBJECTS = ['khmer', 'math', 'history', 'geography', 'ethics', 'earth_science',
+            'chemistry', 'physics', 'biology', 'foreign_language']
+
+
+def upgrade() -> None:
+    class_type_enum = postgresql.ENUM('social_science', 'science', name='classtypeenum', create_type=False)
+    gender_enum = postgresql.ENUM('M', 'F', name='genderenum', create_type=False)
+
+    op.create_table('student_stats',
+        sa.Column('class_type', class_type_enum, nullable=False),
+        sa.Column('gender', gender_enum, nullable=False),
+        sa.Column('grade', sa.String(length=1), nullable=False),
+        sa.Column('student_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('average_score_sum', sa.Float(), nullable=False, server_default='0.0'),
+        sa.Column('tier_excellent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('tier_good', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('tier_average', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('tier_below_average', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('tier_poor', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('class_type', 'gender', 'grade')
+    )
+    op.create_table('student_subject_stats',
+        sa.Column('class_type', class_type_enum, nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('student_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.Float(), nullable=False, server_default='0.0'),
+        sa.Column('score_sumsq', sa.Float(), nullable=False, server_default='0.0'),
+        sa.Column('score_min', sa.Float(), nullable=True),
+        sa.Column('score_max', sa.Float(), nullable=True),
+        sa.Column('max_score', sa.Float(), nullable=True),
+        sa.Column('pass_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('fail_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_0_24', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_25_49', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_50_74', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('range_75_100', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('class_type', 'subject')
+    )
+
+    # Populate from existing students (same rules as StudentStatsStore.rebuild)
+    op.execute("""
+        INSERT INTO student_stats
+        SELECT class_type, gender, COALESCE(grade::text, ''), count(*),
+               COALESCE(sum(average_score), 0.0),
+               count(*) FILTER (WHERE average_score >= 90),
+               count(*) FILTER (WHERE average_score >= 75 AND average_score < 90),
+               count(*) FILTER (WHERE average_score >= 60 AND average_score < 75),
+               count(*) FILTER (WHERE average_score >= 50 AND average_score < 60),
+               count(*) FILTER (WHERE average_score < 50)
+        FROM students
+        GROUP BY 1, 2, 3
+    """)
+    for subject in SUBJECTS:
+        score, max_score = f"{subject}_score", f"{subject}_max"
+        percentage = f"({score} / {max_score} * 100)"
+        op.execute(f"""
+            INSERT INTO student_subject_stats
+            SELECT class_type, '{subject}', count(*), sum({score}), sum({score} * {score}),
+                   min({score}), max({score}), max({max_score}),
+                   count(*) FILTER (WHERE {percentage} >= 50),
+                   count(*) FILTER (WHERE {percentage} < 50),
+                   count(*) FILTER (WHERE {percentage} < 25),
+                   count(*) FILTER (WHERE {percentage} >= 25 AND {percentage} < 50),
+                   count(*) FILTER (WHERE {percentage} >= 50 AND {percentage} < 75),
+                   count(*) FILTER (WHERE {percentage} >= 75)
+            FROM students
+            WHERE {max_score} > 0 AND {score} IS NOT NULL
+            GROUP BY class_type
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table('student_subject_stats')
+    op.drop_table('student_stats')
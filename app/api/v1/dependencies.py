@@ -1,8 +1,12 @@
-from fastapi import Depends
+import time
+from fastapi import Depends, HTTPException, Request, Response
+from typing import AsyncGenerator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.session import get_db, read_router, session_scope, READ_YOUR_WRITES_SESSION
 from app.services.user_service import UserService
 from app.services.student_service import StudentService
+from app.services.cached_student_service import CachedStudentService
+from app.core.config import settings
 
 
 async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
@@ -12,9 +16,96 @@ async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     return UserService(db)
 
 
-async def get_student_service(db: AsyncSession = Depends(get_db)) -> StudentService:
+# Cookie holding the time until which a client that wrote reads from the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def _reads_from_primary(request: Request) -> bool:
+    """Whether the client wrote recently enough that a replica may not have its change yet."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_routed_db(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function that yields a replica session for reads (GET/HEAD)
+    and a primary session for writes when DATABASE_READ_URLS is set.
+    
+    A write also sets a cookie that sends the client's reads to the primary
+    for READ_YOUR_WRITES_SECONDS, so it sees its own change despite replica lag.
+    Those reads are flagged so they also bypass the shared cache.
+    """
+    if not read_router:
+        async with session_scope() as db:
+            yield db
+        return
+    
+    if request.method in SAFE_METHODS and not _reads_from_primary(request):
+        async with read_router.session() as db:
+            yield db
+        return
+    
+    if request.method not in SAFE_METHODS:
+        window = settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            f"{time.time() + window:.3f}",
+            max_age=max(int(window + 0.999), 1),
+            httponly=True,
+            samesite="lax",
+        )
+    async with session_scope() as db:
+        if request.method in SAFE_METHODS:
+            db.info[READ_YOUR_WRITES_SESSION] = True
+        yield db
+
+
+async def get_student_service(db: AsyncSession = Depends(get_routed_db)) -> StudentService:
     """
-    Dependency function that provides StudentService instance.
+    Dependency function that provides StudentService instance
+    (with the read-through cache when CACHE_ENABLED is set). Reads use a
+    replica session when replicas are configured.
     """
+    if settings.CACHE_ENABLED:
+        return CachedStudentService(db)
     return StudentService(db)
 
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag.
+
+    The header is ``*`` (any current representation) or a comma-separated
+    list of entity tags, each possibly weak (``W/"..."``).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/").strip() == etag for tag in candidates if tag)
+
+
+def conditional_get(cache_control: str):
+    """
+    Dependency factory for student reads: adds an ETag derived from the
+    students and scoring_schemes table versions and answers 304 Not Modified when the client's
+    copy is current, before the route queries or serializes anything.
+    """
+    async def check_etag(
+        request: Request,
+        response: Response,
+        service: StudentService = Depends(get_student_service),
+    ) -> None:
+        # Read before the data: a later write then changes the ETag rather than hiding
+        version = await service.get_version()
+        headers = {"ETag": f'"students-{version}"', "Cache-Control": cache_control}
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return check_etag
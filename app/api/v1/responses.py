@@ -0,0 +1,28 @@
+import time
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from app.core.metrics import current_timings
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson.
+
+    Routes returning it skip FastAPI's response_model validation and
+    ``jsonable_encoder`` pass, so the content must already have the shape of
+    the declared model (e.g. rows read with the model's columns). Datetimes
+    are written like Pydantic writes them (UTC as ``Z``).
+    """
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        body = orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        timings = current_timings.get()
+        if timings is not None:
+            timings.render_seconds += time.perf_counter() - start
+        return body
+
+
+def fast_json(content, response: Response) -> FastJSONResponse:
+    """Build a FastJSONResponse keeping the headers set by dependencies (e.g. ETag)."""
+    return FastJSONResponse(content, headers=dict(response.headers))
@@ -0,0 +1,96 @@
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import AsyncIterator, List, Mapping, Type
+from pydantic import BaseModel
+
+
+async def json_array(batches: AsyncIterator[List], model: Type[BaseModel]) -> AsyncIterator[bytes]:
+    """Serialize batches of ORM objects as one JSON array, a batch per chunk."""
+    yield b"["
+    first = True
+    async for batch in batches:
+        if not batch:
+            continue
+        rows = b",".join(model.model_validate(item).model_dump_json().encode() for item in batch)
+        yield rows if first else b"," + rows
+        first = False
+    yield b"]"
+
+
+async def ndjson(batches: AsyncIterator[List], model: Type[BaseModel]) -> AsyncIterator[bytes]:
+    """Serialize batches of ORM objects as newline-delimited JSON, a batch per chunk."""
+    async for batch in batches:
+        if batch:
+            yield b"".join(model.model_validate(item).model_dump_json().encode() + b"\n" for item in batch)
+
+
+def _plain(value):
+    """Value of an ORM attribute as written to CSV/Arrow (enums as their value)."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+async def csv_rows(batches: AsyncIterator[List], model: Type[BaseModel]) -> AsyncIterator[bytes]:
+    """Serialize batches of ORM objects as CSV with a header of the model's fields."""
+    fields = list(model.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for batch in batches:
+        for item in batch:
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else _plain(value)
+                for value in (getattr(item, field) for field in fields)
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def arrow_schema(columns: Mapping, fields: List[str]):
+    """Arrow schema for the given fields, typed from their SQLAlchemy columns."""
+    import pyarrow as pa
+    from sqlalchemy import Integer, Float, DateTime
+
+    arrow_fields = []
+    for name in fields:
+        column_type = columns[name].type
+        if isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+        else:
+            # Strings and enums (as their value)
+            arrow_type = pa.string()
+        arrow_fields.append(pa.field(name, arrow_type, nullable=columns[name].nullable))
+    return pa.schema(arrow_fields)
+
+
+async def arrow_stream(batches: AsyncIterator[List], model: Type[BaseModel], columns: Mapping) -> AsyncIterator[bytes]:
+    """Serialize batches of ORM objects as an Arrow IPC stream, one record batch per batch."""
+    import pyarrow as pa
+
+    fields = list(model.model_fields)
+    schema = arrow_schema(columns, fields)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for batch in batches:
+            if not batch:
+                continue
+            arrays = [
+                pa.array([_plain(getattr(item, name)) for item in batch], type=field.type)
+                for name, field in zip(fields, schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # End-of-stream marker written when the writer closes
+    yield sink.getvalue()
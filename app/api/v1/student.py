@@ -1,22 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from app.schemas.student import StudentCreate, StudentRead, StudentUpdate, StudentStats, PaginatedStudentResponse
-from app.services.student_service import StudentService
-from app.api.v1.dependencies import get_student_service
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.schemas.student import StudentCreate, StudentRead, StudentUpdate, StudentStats, PaginatedStudentResponse, StudentImportResult, StudentRank, Leaderboard, FIELDS_PROJECTION_NOTE
+from app.models.student import ClassTypeEnum
+from app.services.student_service import StudentService, InvalidFieldsError, parse_fields, STUDENT_READ_COLUMN_MAP
+from app.services.pagination import InvalidCursorError
+from app.api.v1.dependencies import get_student_service, conditional_get
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.api.v1.streaming import json_array, ndjson, csv_rows, arrow_stream
+from app.api.v1.responses import FastJSONResponse, fast_json
 from typing import List, Optional
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
+# class_type query parameter of the rankings: a class type, or empty for all students
+CLASS_TYPE_PATTERN = f"^({'|'.join(c.value for c in ClassTypeEnum)})?$"
 
-@router.get("/students/all", response_model=List[StudentRead])
-async def get_all_students(service: StudentService = Depends(get_student_service)):
+
+@router.get(
+    "/students/all",
+    response_model=List[StudentRead],
+    response_class=FastJSONResponse,
+    responses={200: {"description": FIELDS_PROJECTION_NOTE}},
+)
+async def get_all_students(
+    stream: bool = False,
+    format: str = Query("json", regex="^(json|ndjson)$"),
+    fields: Optional[str] = None,
+    service: StudentService = Depends(get_student_service),
+):
     """
     Get all students without pagination (for statistics).
+    
+    With `stream=true` rows are read from a server-side cursor and sent as they
+    are serialized (`format=json` array or `format=ndjson`), so memory stays
+    bounded whatever the table size.
+    
+    - `fields`: comma-separated columns to return (`id` is always included); the
+      items then hold only those keys rather than the full `StudentRead` schema
+    """
+    try:
+        projection = parse_fields(fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if stream and projection:
+        raise HTTPException(status_code=400, detail="fields is not supported with stream=true")
+    
+    if stream:
+        if format == "ndjson":
+            return StreamingResponse(
+                ndjson(service.stream_students(), StudentRead), media_type="application/x-ndjson"
+            )
+        return StreamingResponse(
+            json_array(service.stream_students(), StudentRead), media_type="application/json"
+        )
+    return FastJSONResponse(await service.list_students(rows=True, fields=projection))
+
+
+@router.get("/students/export")
+async def export_students(
+    format: str = Query("csv", regex="^(csv|ndjson|arrow)$"),
+    search: Optional[str] = None,
+    grade: Optional[str] = None,
+    class_type: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = Query("asc", regex="^(asc|desc)$"),
+    service: StudentService = Depends(get_student_service),
+):
+    """
+    Export students as CSV, NDJSON or an Arrow IPC stream.
+    
+    Accepts the same filters and sorting as `GET /students`. Rows are streamed
+    from a server-side cursor, so a full export runs in constant memory.
     """
-    return await service.list_students()
+    batches = service.stream_students(
+        search=search, grade=grade, class_type=class_type, sort_by=sort_by, sort_order=sort_order
+    )
+    headers = {"Content-Disposition": f'attachment; filename="students.{format}"'}
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            ndjson(batches, StudentRead), media_type="application/x-ndjson", headers=headers
+        )
+    if format == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Arrow export requires the pyarrow package")
+        return StreamingResponse(
+            arrow_stream(batches, StudentRead, STUDENT_READ_COLUMN_MAP),
+            media_type="application/vnd.apache.arrow.stream",
+            headers=headers,
+        )
+    return StreamingResponse(csv_rows(batches, StudentRead), media_type="text/csv", headers=headers)
 
 
-@router.get("/students", response_model=PaginatedStudentResponse)
+@router.get(
+    "/students",
+    response_model=PaginatedStudentResponse,
+    response_class=FastJSONResponse,
+    responses={200: {"description": "A page of students. " + FIELDS_PROJECTION_NOTE}},
+    dependencies=[Depends(conditional_get(settings.STUDENTS_CACHE_CONTROL))],
+)
 async def get_students(
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
@@ -24,23 +111,86 @@ async def get_students(
     class_type: Optional[str] = None,
     sort_by: Optional[str] = None,
     sort_order: Optional[str] = Query("asc", regex="^(asc|desc)$"),
+    after: Optional[str] = None,
+    count: str = Query("exact", regex="^(exact|estimate|none)$"),
+    fields: Optional[str] = None,
     service: StudentService = Depends(get_student_service)
 ):
     """
     Get students with pagination, filtering, and sorting.
+    
+    - `after`: keyset pagination cursor; send it empty for the first page,
+      then pass each response's `next_cursor` (`page` is ignored)
+    - `count`: `exact` total, planner `estimate`, or `none` to skip counting
+    - `fields`: comma-separated columns to return, e.g. `first_name,last_name,total_score,grade`
+      (`id` is always included); only those columns are read from the database, and
+      the items then hold only those keys rather than the full `StudentRead` schema
     """
-    return await service.list_students_paginated(
-        page=page,
-        page_size=page_size,
-        search=search,
-        grade=grade,
-        class_type=class_type,
-        sort_by=sort_by,
-        sort_order=sort_order
-    )
+    try:
+        result = await service.list_students_paginated(
+            page=page,
+            page_size=page_size,
+            search=search,
+            grade=grade,
+            class_type=class_type,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            after=after,
+            count=count,
+            rows=True,
+            fields=parse_fields(fields),
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Rows already have the PaginatedStudentResponse shape: skip per-row validation
+    return fast_json(result, response)
 
 
-@router.get("/students/{student_id}", response_model=StudentRead)
+@router.get(
+    "/students/leaderboard",
+    response_model=Leaderboard,
+    dependencies=[Depends(conditional_get(settings.STUDENTS_CACHE_CONTROL))],
+)
+async def get_leaderboard(
+    class_type: Optional[str] = Query(None, regex=CLASS_TYPE_PATTERN),
+    top: int = Query(10, ge=1, le=100),
+    service: StudentService = Depends(get_student_service),
+):
+    """
+    Get the best students by total score with their rank and percent rank.
+    
+    - `class_type`: rank within a class type; leave it out to rank all students
+    - `top`: students ranked 1 to `top` are returned (students tied at the cut-off are all included)
+    """
+    return await service.get_leaderboard(class_type, top)
+
+
+@router.get(
+    "/students/{student_id}/rank",
+    response_model=StudentRank,
+    dependencies=[Depends(conditional_get(settings.STUDENTS_CACHE_CONTROL))],
+)
+async def get_student_rank(
+    student_id: int, service: StudentService = Depends(get_student_service)
+):
+    """
+    Get a student's rank and percent rank by total score within their class type.
+    
+    Equal total scores share a rank; `percent_rank` is 0.0 for the best student
+    and 1.0 for the last. Both are null for a student without a total score,
+    who is not ranked.
+    """
+    rank = await service.get_student_rank(student_id)
+    if not rank:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return rank
+
+
+@router.get(
+    "/students/{student_id}",
+    response_model=StudentRead,
+    dependencies=[Depends(conditional_get(settings.STUDENTS_CACHE_CONTROL))],
+)
 async def get_student(
     student_id: int, service: StudentService = Depends(get_student_service)
 ):
@@ -64,6 +214,28 @@ async def create_student(
     return await service.create_student(student)
 
 
+@router.post("/students/bulk", response_model=StudentImportResult)
+async def bulk_import_students(
+    request: Request,
+    format: Optional[str] = Query(None, regex="^(csv|ndjson)$"),
+    service: StudentService = Depends(get_student_service),
+):
+    """
+    Bulk import students from the request body.
+    
+    - CSV with a header row (`text/csv`) or one JSON object per line (`application/x-ndjson`)
+    - The body is streamed and written in batches; grades are calculated automatically
+    - Invalid rows are reported with their line number and skipped
+    - Batches are committed one by one, so the import is not atomic: a batch the
+      database rejects is rolled back and reported once (`line` to `last_line`,
+      counted in `failed_batches`), the other batches stay imported
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    return await service.import_students(request.stream(), format)
+
+
 @router.put("/students/{student_id}", response_model=StudentRead)
 async def update_student(
     student_id: int,
@@ -93,7 +265,11 @@ async def delete_student(
     return None
 
 
-@router.get("/students/stats/overview", response_model=StudentStats)
+@router.get(
+    "/students/stats/overview",
+    response_model=StudentStats,
+    dependencies=[Depends(conditional_get(settings.STATS_CACHE_CONTROL))],
+)
 async def get_statistics(
     service: StudentService = Depends(get_student_service)
 ):
@@ -107,7 +283,10 @@ async def get_statistics(
     return await service.get_statistics()
 
 
-@router.get("/students/stats/detailed")
+@router.get(
+    "/students/stats/detailed",
+    dependencies=[Depends(conditional_get(settings.STATS_CACHE_CONTROL))],
+)
 async def get_detailed_statistics(
     class_type: Optional[str] = None,
     service: StudentService = Depends(get_student_service)
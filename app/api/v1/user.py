@@ -3,8 +3,9 @@ from app.schemas.user import UserCreate, UserRead
 from app.services.user_service import UserService
 from app.api.v1.dependencies import get_user_service
 from icecream import ic
+from app.core.profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/users", response_model=list[UserRead])
@@ -10,6 +10,47 @@ class Settings(BaseSettings):
     # Database Configuration 
     DATABASE_URL: str
     SKIP_DB_INIT: bool = False  # Set to True to skip database initialization on startup
+    DB_ECHO: bool = False  # Log every SQL statement with its parameters (debugging only)
+    DB_DRIVER: str = "psycopg"  # "psycopg" or "asyncpg" (pip install asyncpg)
+    
+    # Connection Pool Configuration
+    DB_POOL_SIZE: int = 10  # Connections kept open per process
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before raising
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reopen connections older than this (-1 to never)
+    DB_POOL_PRE_PING: bool = True  # Test each connection on checkout (one round trip per checkout)
+    DB_NULL_POOL: bool = False  # No pooling in the app, e.g. behind PgBouncer
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # PostgreSQL statement_timeout per connection (0: none)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements per connection (0 for PgBouncer transaction mode)
+    
+    # Read Replica Configuration
+    DATABASE_READ_URLS: Optional[str] = None  # Comma-separated replica URLs; GET requests read from them
+    DB_READ_STRATEGY: str = "round_robin"  # "round_robin" or "least_connections"
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # After a write, that client reads from the primary this long
+    
+    # Query Logging Configuration
+    QUERY_LOG_LEVEL: str = "INFO"  # Level of the app.db.queries logger; "WARNING" keeps slow queries only
+    QUERY_LOG_SAMPLE_PERCENT: float = 1.0  # Percentage of queries logged (at INFO)
+    QUERY_LOG_SLOW_MS: float = 500.0  # Queries at least this slow are always logged (at WARNING)
+    
+    # Statistics Configuration
+    STATS_MATERIALIZED: bool = False  # Serve stats endpoints from the student_stats summary tables
+    
+    # Cache Configuration
+    CACHE_ENABLED: bool = False  # Cache student reads and statistics in process memory
+    CACHE_TTL_SECONDS: float = 60.0
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_BACKEND: str = "memory"  # "memory" (per process) or "redis" (shared by all workers)
+    CACHE_REDIS_URL: Optional[str] = None  # Redis store; with the memory backend, used for cross-worker invalidation
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 30.0
+    
+    # HTTP Caching Configuration (responses carry an ETag; these set Cache-Control)
+    STUDENTS_CACHE_CONTROL: str = "no-cache"  # e.g. "private, max-age=5"
+    STATS_CACHE_CONTROL: str = "no-cache"
+    
+    # Profiling Configuration
+    PROFILING_ENABLED: bool = False  # Honour X-Profile request headers (Server-Timing, cProfile captures)
+    PROFILE_DIR: str = "profiles"  # Where X-Profile: cprofile writes .prof files
     
     # App Configuration 
     APP_NAME: str = "FastAPI Backend"
@@ -0,0 +1,210 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+from app.db.query_log import add_query_observer
+
+# Each worker process serves requests on one event loop thread, so metrics are
+# plain dict/int/float updates without locks. Values are per process.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines of the metric in the text exposition format."""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self.samples()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, labels: tuple, value: float):
+        self.values[labels] = value
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self.series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        names = self.labels + ("le",)
+        for key, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+))
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the response is fully sent", ("method", "route")
+))
+IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being served"
+))
+REQUEST_DB_DURATION = registry.register(Histogram(
+    "http_request_db_duration_seconds", "Time spent executing SQL per HTTP request", ("method", "route")
+))
+REQUEST_DB_QUERIES = registry.register(Counter(
+    "http_request_db_queries_total", "SQL statements executed for HTTP requests", ("method", "route")
+))
+REQUEST_RENDER_DURATION = registry.register(Histogram(
+    "http_request_render_duration_seconds", "Time spent rendering orjson response bodies per HTTP request", ("method", "route")
+))
+DB_QUERY_DURATION = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time (inside and outside requests)"
+))
+POOL_SIZE = registry.register(Gauge("db_pool_size", "Connections kept by the pool", ("pool",)))
+POOL_CHECKED_OUT = registry.register(Gauge("db_pool_checked_out", "Connections in use", ("pool",)))
+POOL_IDLE = registry.register(Gauge("db_pool_idle", "Connections idle in the pool", ("pool",)))
+POOL_OVERFLOW = registry.register(Gauge("db_pool_overflow", "Connections opened beyond the pool size", ("pool",)))
+
+
+@dataclass
+class RequestTimings:
+    """Time a request spent in the database and rendering its response."""
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    render_seconds: float = 0.0
+    # Only measured in profiling mode (see app.core.profiling)
+    session_seconds: float = 0.0
+    endpoint_end: Optional[float] = None
+
+
+# Timings of the request being served (None outside requests)
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def _observe_query(cursor, statement: str, executemany: bool, duration: float):
+    DB_QUERY_DURATION.observe((), duration)
+    timings = current_timings.get()
+    if timings is not None:
+        timings.db_seconds += duration
+        timings.db_queries += 1
+
+
+def install_query_metrics(engine: Engine):
+    """Time every statement of the engine and attribute it to the current request."""
+    add_query_observer(engine, _observe_query)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and DB time per route.
+
+    Routes are labelled by their path template (``/api/v1/students/{student_id}``),
+    requests that match no route as ``unmatched``, which keeps the number of
+    series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # Reported if the app fails before starting a response
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            current_timings.reset(token)
+
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            REQUESTS.inc(labels + (str(status),))
+            REQUEST_DURATION.observe(labels, duration)
+            REQUEST_DB_DURATION.observe(labels, timings.db_seconds)
+            REQUEST_DB_QUERIES.inc(labels, timings.db_queries)
+            if timings.render_seconds:
+                REQUEST_RENDER_DURATION.observe(labels, timings.render_seconds)
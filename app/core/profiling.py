@@ -0,0 +1,185 @@
+import cProfile
+import functools
+import inspect
+import os
+import re
+import time
+from datetime import datetime
+from typing import Callable
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import RequestTimings, current_timings
+
+# Request header asking for a profile: "timing" (Server-Timing only) or "cprofile"
+PROFILE_HEADER = b"x-profile"
+
+# Only one cProfile capture at a time: the profiler sees every coroutine of the event loop
+_capture_running = False
+
+
+def _add_session_time(seconds: float):
+    timings = current_timings.get()
+    if timings is not None:
+        timings.session_seconds += seconds
+
+
+class TimedAsyncSession(AsyncSession):
+    """AsyncSession adding the wall time of its database calls to the request timings.
+
+    That time minus the cursor time of the statements is the ORM's share
+    (compiling statements, hydrating objects, flushing). Only used when
+    PROFILING_ENABLED is set.
+    """
+
+    async def _timed(self, method, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _add_session_time(time.perf_counter() - start)
+
+    async def execute(self, *args, **kwargs):
+        return await self._timed(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._timed(super().scalar, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._timed(super().get, *args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        return await self._timed(super().flush, *args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        return await self._timed(super().refresh, *args, **kwargs)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """Wrap a route endpoint to record when it returned (serialization starts there)."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_end()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_end()
+    return wrapper
+
+
+def _mark_endpoint_end():
+    timings = current_timings.get()
+    if timings is not None:
+        timings.endpoint_end = time.perf_counter()
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose endpoint reports when it returned, in profiling mode only."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if settings.PROFILING_ENABLED:
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def server_timing(timings: RequestTimings, start: float, now: float) -> str:
+    """Server-Timing header value splitting the time to the first byte into phases.
+
+    - db: executing statements (cursor time)
+    - orm: the rest of the time in session calls (compilation, hydration, flush)
+    - serialize: response model validation and rendering after the endpoint returned
+    - compute: everything else (endpoint Python code, dependencies, framework)
+    """
+    total = now - start
+    db = timings.db_seconds
+    orm = max(timings.session_seconds - db, 0.0)
+    serialize = timings.render_seconds
+    if timings.endpoint_end is not None:
+        serialize += now - timings.endpoint_end
+    compute = max(total - db - orm - serialize, 0.0)
+    phases = [("db", db), ("orm", orm), ("compute", compute), ("serialize", serialize), ("total", total)]
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases)
+
+
+def _profile_name(scope) -> str:
+    """File name of a capture in PROFILE_DIR (the only part sent back to the client)."""
+    route = scope.get("route")
+    name = re.sub(r"[^A-Za-z0-9]+", "_", route.path if route is not None else scope["path"]).strip("_")
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return f"{stamp}-{scope['method']}-{name or 'root'}.prof"
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware answering ``X-Profile`` requests.
+
+    ``X-Profile: timing`` adds a ``Server-Timing`` header with the db, orm,
+    compute and serialize phases. ``X-Profile: cprofile`` also runs cProfile
+    until the response starts and writes the profile to PROFILE_DIR (its file
+    name, never the server path, is returned in ``X-Profile-File``; open it
+    with ``python -m pstats`` or snakeviz). Only installed when PROFILING_ENABLED is set; requests without
+    the header pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _capture_running
+        mode = None
+        if scope["type"] == "http":
+            mode = dict(scope["headers"]).get(PROFILE_HEADER, b"").decode().strip().lower()
+        if mode not in ("timing", "cprofile"):
+            await self.app(scope, receive, send)
+            return
+
+        timings = current_timings.get()
+        token = None
+        if timings is None:
+            timings = RequestTimings()
+            token = current_timings.set(timings)
+
+        profiler = None
+        if mode == "cprofile" and not _capture_running:
+            _capture_running = True
+            profiler = cProfile.Profile()
+        capturing = profiler is not None
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal profiler
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, start, now).encode()))
+                if profiler is not None:
+                    profiler.disable()
+                    name = _profile_name(scope)
+                    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+                    profiler.dump_stats(os.path.join(settings.PROFILE_DIR, name))
+                    headers.append((b"x-profile-file", name.encode()))
+                    profiler = None
+                elif mode == "cprofile":
+                    # Another capture is running
+                    headers.append((b"x-profile-file", b"busy"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            if profiler is not None:
+                profiler.enable()
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if capturing:
+                _capture_running = False
+            if token is not None:
+                current_timings.reset(token)
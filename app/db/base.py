@@ -3,6 +3,9 @@ from app.db.session import Base, engine
 # Import all models here so they are registered with SQLAlchemy
 from app.models.user import User  # Import User model
 from app.models.student import Student  # Import Student model
+from app.models.scoring_scheme import ScoringScheme  # Import scoring scheme model
+from app.models.student_stats import StudentStat, StudentSubjectStat  # Import statistics models
+from app.models.table_version import TableVersion  # Import table version model
 
 async def init_db():
     """
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import weakref
+from functools import lru_cache
+from typing import Any, Callable
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.db.queries")
+
+# Longest statement text written to a log record (the fingerprint covers the full text)
+MAX_STATEMENT_LENGTH = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w%])-?\d+(?:\.\d+)?\b")
+_NAMED_PARAMETER = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*(?:::\w+)?\s*,\s*\?)*(?:::\w+)?\s*\)")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> tuple:
+    """(normalized statement, short hash) identifying a query independently of its values.
+
+    Literals and bound parameters become ``?`` and expanded ``IN`` lists
+    collapse to ``(?)``, so the same query with different values (or list
+    lengths) shares one fingerprint.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NAMED_PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PARAMETER_LIST.sub("(?)", normalized)
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+# observer(cursor, statement, executemany, duration_seconds), called after each statement
+QueryObserver = Callable[[Any, str, bool, float], None]
+
+_query_observers: "weakref.WeakKeyDictionary[Engine, list]" = weakref.WeakKeyDictionary()
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with it when the statement raises
+    context._query_start_time = time.perf_counter()
+
+
+def add_query_observer(engine: Engine, observer: QueryObserver):
+    """Call ``observer`` with the duration of every statement the engine runs.
+
+    The engine gets one pair of cursor execute listeners however many
+    observers there are (query log, metrics), so each statement is timed once.
+    Failed statements are not observed.
+    """
+    observers = _query_observers.get(engine)
+    if observers is None:
+        observers = _query_observers[engine] = []
+
+        def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+            duration = time.perf_counter() - context._query_start_time
+            for notify in observers:
+                notify(cursor, statement, executemany, duration)
+
+        event.listen(engine, "before_cursor_execute", _start_query_timer)
+        event.listen(engine, "after_cursor_execute", stop_query_timer)
+    observers.append(observer)
+
+
+class QueryLogger:
+    """Structured, sampled logging of the SQL statements run by an engine.
+
+    Every statement is timed with the shared query timer. A random
+    ``sample_percent`` of them is logged at INFO and statements taking at
+    least ``slow_ms`` are always logged at WARNING, each as one JSON record
+    with the statement fingerprint, duration and row count. Timing is cheap;
+    the fingerprint is only computed for statements that are logged.
+    """
+
+    def __init__(self, sample_percent: float = 1.0, slow_ms: float = 500.0):
+        self.sample_rate = min(max(sample_percent, 0.0), 100.0) / 100
+        self.slow_seconds = slow_ms / 1000
+
+    def install(self, engine: Engine):
+        add_query_observer(engine, self._log)
+
+    def _log(self, cursor, statement: str, executemany: bool, duration: float):
+        slow = duration >= self.slow_seconds
+        if slow:
+            level = logging.WARNING
+        elif self.sample_rate and random.random() < self.sample_rate:
+            level = logging.INFO
+        else:
+            return
+        if not logger.isEnabledFor(level):
+            return
+
+        normalized, digest = fingerprint(statement)
+        record = {
+            "event": "slow_query" if slow else "query",
+            "fingerprint": digest,
+            "duration_ms": round(duration * 1000, 3),
+            # -1 when the driver does not know (e.g. server-side cursors before they are read)
+            "rows": cursor.rowcount,
+            "executemany": executemany,
+            "statement": normalized[:MAX_STATEMENT_LENGTH],
+        }
+        logger.log(level, json.dumps(record), extra={"query": record})
+
+
+def configure_query_logging(engine: Engine, level: str, sample_percent: float, slow_ms: float):
+    """Set the query logger level and attach a QueryLogger to the engine.
+
+    The logger gets a plain stderr handler unless one was configured
+    elsewhere (e.g. by a logging config passed to uvicorn).
+    """
+    logger.setLevel(level.upper())
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    QueryLogger(sample_percent, slow_ms).install(engine)
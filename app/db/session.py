@@ -1,45 +1,192 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import itertools
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy import event
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy.pool import NullPool
+from typing import AsyncGenerator, AsyncIterator, List, Optional
 from app.core.config import settings
+from app.db.query_log import configure_query_logging
+from app.core.metrics import install_query_metrics
+from app.core.profiling import TimedAsyncSession
 
-# Ensure DATABASE_URL uses psycopg driver
-database_url = settings.DATABASE_URL
-if "postgresql://" in database_url and "+psycopg" not in database_url:
-    # Replace postgresql:// with postgresql+psycopg://
-    database_url = database_url.replace("postgresql://", "postgresql+psycopg://", 1)
-elif "postgresql+asyncpg://" in database_url:
-    # Replace asyncpg with psycopg
-    database_url = database_url.replace("postgresql+asyncpg://", "postgresql+psycopg://", 1)
-
-# Create async engine with psycopg 
-engine = create_async_engine(
-    database_url,
-    echo=True,    # Set to False in production
-    future=True,  
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,       # Maximum number of connections to allow in excess of pool_size
-)
+def _database_url(url: str, driver: str) -> str:
+    """Point a postgresql:// URL at the configured async driver (psycopg or asyncpg)."""
+    for prefix in ("postgresql+psycopg://", "postgresql+asyncpg://", "postgresql://"):
+        if url.startswith(prefix):
+            return f"postgresql+{driver}://" + url[len(prefix):]
+    return url
 
-# Create async session factory 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
+
+def _engine_options() -> dict:
+    """Pool and driver options for create_async_engine, from settings."""
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,  # Test connections on checkout
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,  # Replace connections older than this (-1: never)
+    }
+    if settings.DB_NULL_POOL:
+        # A new connection per checkout, for use behind an external pooler such as PgBouncer
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,  # Maximum number of connections to allow in excess of pool_size
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,  # Wait for a free connection before failing
+        )
+
+    connect_args = {}
+    if settings.DB_DRIVER == "asyncpg":
+        connect_args["prepared_statement_cache_size"] = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+        if settings.DB_PREPARED_STATEMENT_CACHE_SIZE == 0:
+            # asyncpg's own statement cache must be off too behind a transaction pooler
+            connect_args["statement_cache_size"] = 0
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    else:
+        if settings.DB_PREPARED_STATEMENT_CACHE_SIZE == 0:
+            # Never prepare server-side statements
+            connect_args["prepare_threshold"] = None
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    options["connect_args"] = connect_args
+    return options
+
+
+if settings.DB_DRIVER not in ("psycopg", "asyncpg"):
+    raise ValueError(f"Unsupported DB_DRIVER {settings.DB_DRIVER!r}, expected 'psycopg' or 'asyncpg'")
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Async engine with the configured driver, pool options, query logging and metrics."""
+    new_engine = create_async_engine(
+        _database_url(url, settings.DB_DRIVER),
+        echo=settings.DB_ECHO,  # Logs every statement and its parameters; debugging only
+        future=True,
+        **_engine_options(),
+    )
+    event.listen(new_engine.sync_engine, "connect", _set_prepared_statement_cache_size)
+    # Sampled query logging (durations, row counts and slow queries)
+    configure_query_logging(
+        new_engine.sync_engine,
+        level=settings.QUERY_LOG_LEVEL,
+        sample_percent=settings.QUERY_LOG_SAMPLE_PERCENT,
+        slow_ms=settings.QUERY_LOG_SLOW_MS,
+    )
+    # DB time and query counts for /metrics
+    install_query_metrics(new_engine.sync_engine)
+    return new_engine
+
+
+def _set_prepared_statement_cache_size(dbapi_connection, connection_record):
+    """Size psycopg's per-connection cache of prepared statements."""
+    if settings.DB_DRIVER == "psycopg" and settings.DB_PREPARED_STATEMENT_CACHE_SIZE:
+        dbapi_connection.driver_connection.prepared_max = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+
+
+# Create the primary async engine (psycopg unless DB_DRIVER=asyncpg)
+engine = _create_engine(settings.DATABASE_URL)
+
+SESSION_OPTIONS = dict(
+    # The profiling session also times ORM work, at a small cost per call
+    class_=TimedAsyncSession if settings.PROFILING_ENABLED else AsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
+# Create async session factory 
+AsyncSessionLocal = async_sessionmaker(engine, **SESSION_OPTIONS)
+
+
+# Session.info flags of routed sessions: read from a replica (which may lag), or from the
+# primary because the client wrote recently (see get_routed_db)
+REPLICA_SESSION = "replica"
+READ_YOUR_WRITES_SESSION = "read_your_writes"
+
+
+class ReadReplicaRouter:
+    """Hands out sessions bound to read replicas.
+
+    ``round_robin`` cycles through the replicas; ``least_connections`` picks
+    the replica with the fewest sessions currently open by this process
+    (ties go round-robin). With no replicas configured there is nothing to
+    route and callers use the primary.
+    """
+
+    def __init__(self, urls: List[str], strategy: str = "round_robin"):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unsupported DB_READ_STRATEGY {strategy!r}")
+        self.strategy = strategy
+        self.engines = [_create_engine(url) for url in urls]
+        self.sessionmakers = [async_sessionmaker(e, **SESSION_OPTIONS) for e in self.engines]
+        self.active = [0] * len(self.engines)
+        self._turn = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def _pick(self) -> int:
+        start = next(self._turn) % len(self.engines)
+        order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+        if self.strategy == "least_connections":
+            return min(order, key=self.active.__getitem__)
+        return start
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        index = self._pick()
+        self.active[index] += 1
+        try:
+            async with self.sessionmakers[index]() as session:
+                session.info[REPLICA_SESSION] = True
+                yield session
+        finally:
+            self.active[index] -= 1
+
+    def status(self) -> List[dict]:
+        return [
+            {"url": e.url.render_as_string(hide_password=True), "sessions": active, **pool_status(e)}
+            for e, active in zip(self.engines, self.active)
+        ]
+
+    async def dispose(self):
+        for e in self.engines:
+            await e.dispose()
+
+
+def _read_urls() -> List[str]:
+    return [url.strip() for url in (settings.DATABASE_READ_URLS or "").split(",") if url.strip()]
+
+
+# Read replicas (empty unless DATABASE_READ_URLS is set)
+read_router = ReadReplicaRouter(_read_urls(), settings.DB_READ_STRATEGY)
+
+
+def pool_status(pool_engine: Optional[AsyncEngine] = None) -> dict:
+    """Connections of an engine pool: checked out, idle in the pool and in overflow."""
+    pool = (pool_engine or engine).pool
+    if isinstance(pool, NullPool):
+        return {"pool": "NullPool", "checked_out": None, "idle": None, "overflow": None}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # The counter starts at -size and only goes positive once the pool itself is exhausted
+        "overflow": max(pool.overflow(), 0),
+        "timeout_seconds": pool.timeout(),
+    }
+
+
 # Base class models for SQLAlchemy 
 Base = declarative_base()
 
-# Dependency to get database session
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """
-    Dependency function that yields a database session
-    """
-    async with AsyncSessionLocal() as session:
+
+@asynccontextmanager
+async def session_scope(session_factory: async_sessionmaker = AsyncSessionLocal) -> AsyncIterator[AsyncSession]:
+    """Session committed when the block succeeds and rolled back when it raises."""
+    async with session_factory() as session:
         try:
             yield session
             await session.commit()
@@ -49,4 +196,11 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
-            
\ No newline at end of file
+
+# Dependency to get database session
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function that yields a database session
+    """
+    async with session_scope() as session:
+        yield session
@@ -1,9 +1,15 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+from app.core.metrics import MetricsMiddleware, registry, POOL_SIZE, POOL_CHECKED_OUT, POOL_IDLE, POOL_OVERFLOW
 from app.db.base import init_db
+from app.db.session import read_router
 from app.api.v1 import router as api_router
+from app.services.cache import student_cache
+from app.services.single_flight import stats_flight
 
 
 @asynccontextmanager
@@ -14,10 +20,15 @@ async def lifespan(app: FastAPI):
         await init_db()
     else:
         print("⚠ Skipping database initialization (SKIP_DB_INIT=True)")
+    if settings.CACHE_ENABLED:
+        await student_cache.start()
     print("✓ Application startup complete")
     yield
     # Shutdown
     print("Shutting down application...")
+    if settings.CACHE_ENABLED:
+        await student_cache.close()
+    await read_router.dispose()
 
 
 app = FastAPI(
@@ -34,6 +45,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing and cProfile captures on request (X-Profile header)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency, status and DB time for /metrics
+app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -67,5 +85,50 @@ async def health_check_db():
         }
 
 
+@app.get("/health/pool")
+async def health_check_pool():
+    """
+    Connection pool health check endpoint - checked-out, idle and overflow connections
+    of the primary and of each read replica.
+    """
+    from app.db.session import pool_status
+    return {**pool_status(), "replicas": read_router.status()}
+
+
+@app.get("/health/cache")
+async def health_check_cache():
+    """
+    Cache health check endpoint - hit/miss/eviction counters of the student cache.
+    """
+    return {"enabled": settings.CACHE_ENABLED, **student_cache.stats()}
+
+
+@app.get("/health/coalescing")
+async def health_check_coalescing():
+    """
+    Request coalescing counters - statistics computations run vs. callers that shared one.
+    """
+    return stats_flight.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics of this worker process: request latency, status codes,
+    DB time per route and connection pool gauges.
+    """
+    from app.db.session import pool_status
+    pools = [("primary", pool_status())]
+    pools += [(f"replica{index}", replica) for index, replica in enumerate(read_router.status())]
+    for name, status in pools:
+        if status["checked_out"] is None:  # NullPool keeps no connections
+            continue
+        POOL_SIZE.set((name,), status["size"])
+        POOL_CHECKED_OUT.set((name,), status["checked_out"])
+        POOL_IDLE.set((name,), status["idle"])
+        POOL_OVERFLOW.set((name,), status["overflow"])
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # Include API routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
\ No newline at end of file
@@ -1,4 +1,7 @@
 from app.models.user import User
 from app.models.student import Student
+from app.models.scoring_scheme import ScoringScheme
+from app.models.student_stats import StudentStat, StudentSubjectStat
+from app.models.table_version import TableVersion
 
-__all__ = ["User", "Student"]
+__all__ = ["User", "Student", "ScoringScheme", "StudentStat", "StudentSubjectStat", "TableVersion"]
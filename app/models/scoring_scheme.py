@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, Float, Enum, Index
+from app.db.session import Base
+from app.models.student import ClassTypeEnum
+
+
+class ScoringScheme(Base):
+    """Max score of every subject for one class_type and exam year.
+
+    Students reference their scheme instead of storing the max scores on
+    every row. New students get the latest scheme of their class_type.
+    """
+    __tablename__ = "scoring_schemes"
+    __table_args__ = (
+        Index("ix_scoring_schemes_class_type_exam_year", "class_type", "exam_year"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    class_type = Column(Enum(ClassTypeEnum, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    exam_year = Column(Integer, nullable=False)
+    
+    # Maximum scores for Social Science subjects
+    khmer_max = Column(Float, nullable=False)
+    math_max = Column(Float, nullable=False)
+    history_max = Column(Float, nullable=False)
+    geography_max = Column(Float, nullable=False)
+    ethics_max = Column(Float, nullable=False)
+    earth_science_max = Column(Float, nullable=False)
+    
+    # Maximum scores for Science subjects
+    chemistry_max = Column(Float, nullable=False)
+    physics_max = Column(Float, nullable=False)
+    biology_max = Column(Float, nullable=False)
+    physical_education_max = Column(Float, nullable=False)
+    
+    # Common subject max score
+    foreign_language_max = Column(Float, nullable=False)
+
+
+# The max score columns, in StudentRead order
+MAX_SCORE_COLUMNS = [
+    "khmer_max", "math_max", "history_max", "geography_max", "ethics_max", "earth_science_max",
+    "chemistry_max", "physics_max", "biology_max", "physical_education_max", "foreign_language_max",
+]
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Index, ForeignKey, literal_column
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
 import enum
@@ -23,8 +24,23 @@ class ClassTypeEnum(str, enum.Enum):
     SCIENCE = "science"
 
 
+def _scheme_max(name: str) -> property:
+    """Property reading a max score from the student's scoring scheme."""
+    return property(lambda self: getattr(self.scoring_scheme, name) if self.scoring_scheme else None)
+
+
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # Listing filters and the common sort columns (id breaks ties for keyset pagination)
+        Index("ix_students_class_type_grade_id", "class_type", "grade", "id"),
+        Index("ix_students_total_score_id", "total_score", "id"),
+        Index("ix_students_average_score_id", "average_score", "id"),
+        Index("ix_students_last_name_id", "last_name", "id"),
+        Index("ix_students_first_name_id", "first_name", "id"),
+        # Students of a scheme; min(id) per scheme for the statistics tables is one index probe
+        Index("ix_students_scoring_scheme_id_id", "scoring_scheme_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=False)
@@ -51,22 +67,9 @@ class Student(Base):
     # Common subject for both tracks
     foreign_language_score = Column(Float, default=0.0)  # ភាសាបរទេស (Foreign Language)
     
-    # Maximum scores for Social Science subjects
-    khmer_max = Column(Float, default=125.0)
-    math_max = Column(Float, default=75.0)
-    history_max = Column(Float, default=75.0)
-    geography_max = Column(Float, default=75.0)
-    ethics_max = Column(Float, default=75.0)
-    earth_science_max = Column(Float, default=50.0)
-    
-    # Maximum scores for Science subjects
-    chemistry_max = Column(Float, default=75.0, nullable=True)
-    physics_max = Column(Float, default=75.0, nullable=True)
-    biology_max = Column(Float, default=75.0, nullable=True)
-    physical_education_max = Column(Float, default=75.0, nullable=True)
-    
-    # Common subject max score
-    foreign_language_max = Column(Float, default=50.0)
+    # Max scores come from the class_type scoring scheme (see ScoringScheme)
+    scoring_scheme_id = Column(Integer, ForeignKey("scoring_schemes.id"), nullable=False)
+    scoring_scheme = relationship("ScoringScheme", lazy="joined", innerjoin=True)
     
     # Calculated fields
     total_score = Column(Float, default=0.0)
@@ -75,4 +78,41 @@ class Student(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Read-only max scores of the scoring scheme, under their former column names
+    khmer_max = _scheme_max("khmer_max")
+    math_max = _scheme_max("math_max")
+    history_max = _scheme_max("history_max")
+    geography_max = _scheme_max("geography_max")
+    ethics_max = _scheme_max("ethics_max")
+    earth_science_max = _scheme_max("earth_science_max")
+    chemistry_max = _scheme_max("chemistry_max")
+    physics_max = _scheme_max("physics_max")
+    biology_max = _scheme_max("biology_max")
+    physical_education_max = _scheme_max("physical_education_max")
+    foreign_language_max = _scheme_max("foreign_language_max")
+
+
+# "first_name last_name", as used by the name search. Backed by the pg_trgm GIN
+# index ix_students_full_name_trgm so ILIKE '%term%' does not scan the table.
+STUDENT_FULL_NAME = Student.first_name + literal_column("' '", String) + Student.last_name
+
+Index(
+    "ix_students_full_name_trgm",
+    STUDENT_FULL_NAME.label("full_name"),
+    postgresql_using="gin",
+    postgresql_ops={"full_name": "gin_trgm_ops"},
+)
+
+# Rankings within a class type (leaderboards, a student's rank): ordered by
+# total score, best first, so a top-N is an index range and a rank a count over it
+Index(
+    "ix_students_class_type_total_score_id",
+    Student.class_type,
+    Student.total_score.desc(),
+    Student.id,
+)
+
 
+# Registers the target of Student.scoring_scheme (imported last: it needs the enums above)
+from app.models.scoring_scheme import ScoringScheme  # noqa: E402,F401
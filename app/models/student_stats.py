@@ -0,0 +1,61 @@
+from sqlalchemy import Column, Integer, String, Float, Enum, Boolean, ForeignKey
+from app.db.session import Base
+from app.models.student import GenderEnum, ClassTypeEnum
+
+
+class StudentStat(Base):
+    """Student counts per class_type x gender x grade, maintained on every student write."""
+    __tablename__ = "student_stats"
+    
+    class_type = Column(Enum(ClassTypeEnum, values_callable=lambda x: [e.value for e in x]), primary_key=True)
+    gender = Column(Enum(GenderEnum, values_callable=lambda x: [e.value for e in x]), primary_key=True)
+    grade = Column(String(1), primary_key=True)  # Grade letter, "" for ungraded students
+    
+    student_count = Column(Integer, nullable=False, default=0)
+    average_score_sum = Column(Float, nullable=False, default=0.0)
+    average_count = Column(Integer, nullable=False, default=0)  # Students with an average score
+    
+    # Performance tiers (based on average score)
+    tier_excellent = Column(Integer, nullable=False, default=0)      # 90-100%
+    tier_good = Column(Integer, nullable=False, default=0)           # 75-89%
+    tier_average = Column(Integer, nullable=False, default=0)        # 60-74%
+    tier_below_average = Column(Integer, nullable=False, default=0)  # 50-59%
+    tier_poor = Column(Integer, nullable=False, default=0)           # <50%
+
+
+class StudentSubjectStat(Base):
+    """Per-subject score aggregates per class_type x scoring scheme, maintained on every student write.
+    
+    Every student of a row shares the scheme's max score, so pass/fail and the
+    score ranges of a row are exact for that max (see StudentStatsStore for how
+    rows with different max scores are combined).
+    """
+    __tablename__ = "student_subject_stats"
+    
+    class_type = Column(Enum(ClassTypeEnum, values_callable=lambda x: [e.value for e in x]), primary_key=True)
+    scoring_scheme_id = Column(Integer, ForeignKey("scoring_schemes.id", ondelete="CASCADE"), primary_key=True)
+    subject = Column(String, primary_key=True)
+    max_score = Column(Float, nullable=False)  # The scheme's max score of the subject (> 0)
+    
+    # Students of the scheme (the subject applies to all of them) and those with a score
+    student_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)
+    first_student_id = Column(Integer, nullable=True)  # Lowest id of those students
+    
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sumsq = Column(Float, nullable=False, default=0.0)
+    score_min = Column(Float, nullable=True)
+    score_max = Column(Float, nullable=True)
+    # Set when the current min or max score was removed: score_min/score_max are
+    # then only bounds until the row is refreshed
+    extremes_stale = Column(Boolean, nullable=False, default=False)
+    
+    # Pass = score >= 50% of max
+    pass_count = Column(Integer, nullable=False, default=0)
+    fail_count = Column(Integer, nullable=False, default=0)
+    
+    # Score ranges as percentage of max
+    range_0_24 = Column(Integer, nullable=False, default=0)
+    range_25_49 = Column(Integer, nullable=False, default=0)
+    range_50_74 = Column(Integer, nullable=False, default=0)
+    range_75_100 = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, BigInteger
+from app.db.session import Base
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped by a statement-level trigger on every write.
+
+    The counter is updated in the writing transaction, so a committed version
+    never runs ahead of the data it describes. Used for HTTP ETags.
+
+    The update holds the table's row lock until the writer commits, so writes
+    to one table are serialized on it. That is acceptable for the student
+    write rate (bulk imports bump it once per COPY statement); a sequence
+    would avoid the lock but is not transactional, so a reader could see a
+    new version with the old data and cache it under the new ETag.
+    """
+    __tablename__ = "table_versions"
+    
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -28,22 +28,19 @@ class StudentCreate(StudentBase):
     biology_score: Optional[float] = Field(default=0.0, ge=0.0)
     physical_education_score: Optional[float] = Field(default=0.0, ge=0.0)
     
-    # Optional max scores for Social Science (defaults will be used if not provided)
-    khmer_max: Optional[float] = Field(default=75.0, gt=0)
-    math_max: Optional[float] = Field(default=125.0, gt=0)
-    history_max: Optional[float] = Field(default=75.0, gt=0)
-    geography_max: Optional[float] = Field(default=75.0, gt=0)
-    ethics_max: Optional[float] = Field(default=75.0, gt=0)
-    earth_science_max: Optional[float] = Field(default=50.0, gt=0)
-    
-    # Optional max scores for Science subjects
-    chemistry_max: Optional[float] = Field(default=75.0, gt=0)
-    physics_max: Optional[float] = Field(default=75.0, gt=0)
-    biology_max: Optional[float] = Field(default=75.0, gt=0)
-    physical_education_max: Optional[float] = Field(default=75.0, gt=0)
-    
-    # Foreign language max score (shared by both class types)
-    foreign_language_max: Optional[float] = Field(default=50.0, gt=0)
+    # Deprecated and ignored: max scores come from the class_type scoring scheme.
+    # Still accepted so existing clients keep working.
+    khmer_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    math_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    history_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    geography_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    ethics_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    earth_science_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    chemistry_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    physics_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    biology_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    physical_education_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
+    foreign_language_max: Optional[float] = Field(default=None, gt=0, deprecated=True)
 
 
 class StudentUpdate(BaseModel):
@@ -126,12 +123,67 @@ class StudentStats(BaseModel):
     subject_stats: dict[str, dict[str, int]]  # subject -> {pass: count, fail: count}
 
 
+class StudentRank(BaseModel):
+    """Schema for a student's rank within their class type."""
+    student_id: int
+    class_type: ClassTypeEnum
+    total_score: Optional[float]
+    rank: Optional[int]  # 1 for the best total score; equal scores share a rank; None without a total score
+    class_size: int  # Ranked students of the class type
+    percent_rank: Optional[float]  # (rank - 1) / (class_size - 1): 0.0 for the best, 1.0 for the last
+
+
+class LeaderboardEntry(BaseModel):
+    """A student on a leaderboard."""
+    id: int
+    first_name: str
+    last_name: str
+    gender: GenderEnum
+    class_type: ClassTypeEnum
+    total_score: float
+    average_score: Optional[float]  # Ranking only needs the total score
+    grade: Optional[GradeEnum]
+    rank: int
+    percent_rank: float
+
+
+class Leaderboard(BaseModel):
+    """Schema for the best students of a class type (or of all students)."""
+    class_type: Optional[ClassTypeEnum]  # None when ranked across all students
+    class_size: int
+    top: int
+    items: List[LeaderboardEntry]  # Students ranked within the top; ties at the cut-off are all included
+
+
+class StudentImportError(BaseModel):
+    """A rejected row of a bulk import, or a batch the database rolled back."""
+    line: int
+    last_line: Optional[int] = None  # Set for a rolled back batch: its rows span lines line..last_line
+    errors: List[dict]
+
+
+class StudentImportResult(BaseModel):
+    """Schema for the result of a bulk import."""
+    inserted: int
+    failed: int
+    failed_batches: int = 0  # Batches rolled back by the database (their rows count as failed)
+    errors: List[StudentImportError]  # First 1000 rejected rows and batches
+
+
+# The `fields` query parameter returns partial students: documented on the list responses
+FIELDS_PROJECTION_NOTE = (
+    "Students with every StudentRead field. With the `fields` query parameter each item "
+    "only has `id` and the requested fields."
+)
+
+
 class PaginatedStudentResponse(BaseModel):
     """Schema for paginated student response."""
     model_config = ConfigDict(from_attributes=True)
     
-    items: List[StudentRead]
-    total: int
+    items: List[StudentRead] = Field(description=FIELDS_PROJECTION_NOTE)
+    total: Optional[int]  # None when the count was skipped (count=none)
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page (keyset mode)
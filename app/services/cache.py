@@ -0,0 +1,404 @@
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterable, Optional
+from app.core.config import settings
+
+
+def _hashable(value):
+    """Turn JSON lists back into tuples so decoded params can be used as keys."""
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+class CacheBackend(ABC):
+    """Interface of the stores behind the student cache.
+
+    Keys are ``(namespace, params)`` pairs. Writers invalidate whole
+    namespaces (or a single entry); every namespace invalidation bumps the
+    namespace generation so a read that started before the write cannot
+    store its stale result afterwards. Subclasses implement the storage
+    primitives, the read-through logic and counters live here.
+    """
+
+    name = "base"
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.bus: Optional["CacheInvalidationBus"] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @abstractmethod
+    async def _read(self, namespace: str, params: Hashable) -> Optional[Any]:
+        """Return the stored value, or None if absent or expired."""
+
+    @abstractmethod
+    async def _write(self, namespace: str, params: Hashable, value: Any, generation: Optional[int]):
+        """Store a value so that it is not served if ``generation`` is outdated."""
+
+    @abstractmethod
+    async def _invalidate(self, namespaces: Iterable[str], params: Optional[Hashable]) -> int:
+        """Drop entries and return how many were dropped."""
+
+    @abstractmethod
+    async def generation(self, namespace: str) -> int:
+        """Current generation of the namespace, bumped by every namespace invalidation."""
+
+    @abstractmethod
+    async def last_write(self, namespace: str) -> float:
+        """Wall-clock time of the latest invalidation of the namespace (0 if none)."""
+
+    @abstractmethod
+    def lock(self, namespace: str, params: Hashable):
+        """Async context manager serializing computations of one key; yields whether it had to wait."""
+
+    async def get(self, namespace: str, params: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+        value = await self._read(namespace, params)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, namespace: str, params: Hashable, value: Any, generation: Optional[int] = None):
+        """Store a value, unless the namespace was invalidated since ``generation`` was read."""
+        await self._write(namespace, params, value, generation)
+
+    async def invalidate(self, namespaces: Iterable[str], params: Optional[Hashable] = None):
+        """Drop every entry of the namespaces (or only ``params``), in every worker."""
+        namespaces = sorted(set(namespaces))
+        self.invalidations += await self._invalidate(namespaces, params)
+        if self.bus is not None:
+            await self.bus.publish(namespaces, params)
+
+    async def get_or_compute(
+        self, namespace: str, params: Hashable, compute: Callable[[], Awaitable[Any]], lag_seconds: float = 0.0
+    ) -> Any:
+        """Read-through: return the cached value or compute and store it.
+
+        Concurrent misses on the same key compute once; the other callers wait
+        for the lock and then read the stored result. ``lag_seconds`` is the
+        replication lag to allow for when ``compute`` reads a replica: while
+        the namespace was written more recently than that, the result is
+        returned but not stored, since the replica may not have the write yet.
+        """
+        value = await self.get(namespace, params)
+        if value is not None:
+            return value
+        async with self.lock(namespace, params) as waited:
+            if waited:
+                value = await self._read(namespace, params)
+                if value is not None:
+                    self.coalesced += 1
+                    return value
+            generation = await self.generation(namespace)
+            started = time.time()
+            value = await compute()
+            if not lag_seconds or started - await self.last_write(namespace) >= lag_seconds:
+                await self.set(namespace, params, value, generation)
+            return value
+
+    def clear(self):
+        """Forget locally held entries (shared stores have nothing local)."""
+
+    async def start(self):
+        if self.bus is not None:
+            await self.bus.start(self)
+
+    async def close(self):
+        if self.bus is not None:
+            await self.bus.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "shared_invalidation": self.bus is not None,
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache whose entries also expire after a fixed TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self._generations: dict = {}
+        self._written_at: dict = {}
+        self._locks: dict = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def last_write(self, namespace: str) -> float:
+        return self._written_at.get(namespace, 0.0)
+
+    async def _read(self, namespace: str, params: Hashable) -> Optional[Any]:
+        key = (namespace, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _write(self, namespace: str, params: Hashable, value: Any, generation: Optional[int]):
+        if generation is not None and generation != self._generations.get(namespace, 0):
+            return
+        key = (namespace, params)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _invalidate(self, namespaces: Iterable[str], params: Optional[Hashable]) -> int:
+        namespaces = set(namespaces)
+        now = time.time()
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._written_at[namespace] = now
+        if params is not None:
+            keys = [(namespace, params) for namespace in namespaces if (namespace, params) in self._entries]
+        else:
+            keys = [key for key in self._entries if key[0] in namespaces]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    @asynccontextmanager
+    async def lock(self, namespace: str, params: Hashable) -> AsyncIterator[bool]:
+        key = (namespace, params)
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            waited = entry[0].locked()
+            async with entry[0]:
+                yield waited
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every worker through a Redis server.
+
+    Values are stored as JSON under keys that include the namespace
+    generation, so invalidating a namespace is a single ``INCR`` and the old
+    entries simply expire. Computations are serialized cluster-wide with a
+    ``SET NX`` lock; callers that find the lock taken poll until the holder
+    has stored its result.
+    """
+
+    name = "redis"
+    LOCK_POLL_SECONDS = 0.05
+
+    # Delete the lock only if this caller still holds it
+    RELEASE_LOCK_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, redis, ttl_seconds: float = 60.0, lock_timeout: float = 30.0, prefix: str = "student-cache"):
+        super().__init__(ttl_seconds)
+        self.redis = redis
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+        self._release_lock = redis.register_script(self.RELEASE_LOCK_SCRIPT)
+
+    @staticmethod
+    def _params_key(params: Hashable) -> str:
+        return json.dumps(params, separators=(",", ":"), default=str)
+
+    def _value_key(self, namespace: str, generation: int, params: Hashable) -> str:
+        return f"{self.prefix}:{namespace}:{generation}:{self._params_key(params)}"
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:generation"
+
+    def _written_at_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:written_at"
+
+    async def generation(self, namespace: str) -> int:
+        return int(await self.redis.get(self._generation_key(namespace)) or 0)
+
+    async def last_write(self, namespace: str) -> float:
+        return float(await self.redis.get(self._written_at_key(namespace)) or 0.0)
+
+    async def _read(self, namespace: str, params: Hashable) -> Optional[Any]:
+        generation = await self.generation(namespace)
+        raw = await self.redis.get(self._value_key(namespace, generation, params))
+        return json.loads(raw) if raw is not None else None
+
+    async def _write(self, namespace: str, params: Hashable, value: Any, generation: Optional[int]):
+        # A value computed before an invalidation lands under the old generation, where nobody reads
+        if generation is None:
+            generation = await self.generation(namespace)
+        await self.redis.set(
+            self._value_key(namespace, generation, params),
+            json.dumps(value, separators=(",", ":")),
+            px=int(self.ttl_seconds * 1000),
+        )
+
+    async def _invalidate(self, namespaces: Iterable[str], params: Optional[Hashable]) -> int:
+        namespaces = list(namespaces)
+        now = time.time()
+        if params is not None:
+            # Single entries are deleted in place; a racing read may restore it until the TTL
+            keys = [self._value_key(namespace, await self.generation(namespace), params) for namespace in namespaces]
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                for namespace in namespaces:
+                    pipe.set(self._written_at_key(namespace), now)
+                deleted, *_ = await pipe.execute()
+            return deleted
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(self._generation_key(namespace))
+                pipe.set(self._written_at_key(namespace), now)
+            await pipe.execute()
+        return len(namespaces)
+
+    @asynccontextmanager
+    async def lock(self, namespace: str, params: Hashable) -> AsyncIterator[bool]:
+        key = f"{self.prefix}:{namespace}:lock:{self._params_key(params)}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        waited = False
+        acquired = await self.redis.set(key, token, nx=True, px=int(self.lock_timeout * 1000))
+        while not acquired and time.monotonic() < deadline:
+            waited = True
+            await asyncio.sleep(self.LOCK_POLL_SECONDS)
+            acquired = await self.redis.set(key, token, nx=True, px=int(self.lock_timeout * 1000))
+        # After the timeout the caller computes without the lock rather than failing
+        try:
+            yield waited
+        finally:
+            if acquired:
+                await self._release_lock(keys=[key], args=[token])
+
+    async def close(self):
+        await super().close()
+        await self.redis.aclose()
+
+
+class CacheInvalidationBus:
+    """Broadcasts invalidations over Redis pub/sub to the other workers' in-memory caches."""
+
+    RECONNECT_SECONDS = 1.0
+
+    def __init__(self, redis, channel: str = "student-cache:invalidate"):
+        self.redis = redis
+        self.channel = channel
+        self.sender = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, namespaces: Iterable[str], params: Optional[Hashable]):
+        message = {"sender": self.sender, "namespaces": list(namespaces), "params": params}
+        await self.redis.publish(self.channel, json.dumps(message, default=str))
+
+    async def start(self, backend: CacheBackend):
+        self._task = asyncio.create_task(self._listen(backend))
+
+    async def _listen(self, backend: CacheBackend):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "subscribe":
+                            # Invalidations sent while we were not subscribed are lost
+                            backend.clear()
+                        if message["type"] != "message":
+                            continue
+                        data = json.loads(message["data"])
+                        if data["sender"] == self.sender:
+                            continue
+                        backend.invalidations += await backend._invalidate(
+                            data["namespaces"], _hashable(data["params"])
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠ Cache invalidation channel error: {e}")
+                await asyncio.sleep(self.RECONNECT_SECONDS)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.redis.aclose()
+
+
+def _redis_client():
+    if not settings.CACHE_REDIS_URL:
+        raise ValueError("CACHE_REDIS_URL must be set to use Redis for the cache")
+    try:
+        from redis.asyncio import Redis
+    except ImportError:
+        raise RuntimeError("CACHE_REDIS_URL requires the redis package (pip install redis)")
+    return Redis.from_url(settings.CACHE_REDIS_URL)
+
+
+def create_cache_backend() -> CacheBackend:
+    """Build the cache backend selected by CACHE_BACKEND ("memory" or "redis")."""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(
+            _redis_client(),
+            ttl_seconds=settings.CACHE_TTL_SECONDS,
+            lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS,
+        )
+    backend = MemoryCacheBackend(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+    )
+    if settings.CACHE_REDIS_URL:
+        backend.bus = CacheInvalidationBus(_redis_client())
+    return backend
+
+
+# Shared by every request handled by this process
+student_cache = create_cache_backend()
@@ -0,0 +1,146 @@
+from typing import AsyncIterator, List, Optional
+from pydantic_core import to_jsonable_python
+from app.schemas.student import StudentCreate, StudentRead, StudentUpdate, StudentStats, StudentRank, Leaderboard
+from app.core.config import settings
+from app.db.session import REPLICA_SESSION, READ_YOUR_WRITES_SESSION
+from app.services.cache import CacheBackend, student_cache
+from app.services.student_service import StudentService
+
+
+# Cache namespaces, invalidated independently by the write paths
+STUDENT = "student"
+STUDENT_LISTS = "students"
+STATS = "stats"
+RANKINGS = "rankings"
+
+
+class CachedStudentService(StudentService):
+    """StudentService with a read-through cache for student reads and statistics.
+
+    Cached values are the serialized (JSON-compatible) responses, never ORM
+    objects, so they can outlive the session that loaded them. Writes commit
+    first and then invalidate exactly the namespaces they affect: a new
+    student changes the lists, statistics and rankings, an update or delete
+    also drops that student's own entry.
+
+    Reads sent to the primary because the client just wrote bypass the cache,
+    which may still hold what a lagging replica returned. Results read from a
+    replica are not stored within READ_YOUR_WRITES_SECONDS of a write.
+    """
+
+    def __init__(self, db, cache: CacheBackend = student_cache):
+        super().__init__(db)
+        self.cache = cache
+
+    async def _cached(self, namespace: str, params, compute):
+        """Read-through on the cache, unless this session reads its own writes."""
+        if self.db.info.get(READ_YOUR_WRITES_SESSION):
+            return await compute()
+        lag_seconds = settings.READ_YOUR_WRITES_SECONDS if self.db.info.get(REPLICA_SESSION) else 0.0
+        return await self.cache.get_or_compute(namespace, params, compute, lag_seconds)
+
+    @staticmethod
+    def _list_params(page, page_size, search, grade, class_type, sort_by, sort_order, after, count) -> tuple:
+        """Normalize list parameters so equivalent queries share one entry."""
+        # The name search is case-insensitive and ignores surrounding whitespace
+        search = search.strip().lower() if search and search.strip() else None
+        grade = grade if grade in ("A", "B", "C", "D", "E", "F") else None
+        class_type = class_type.strip() if class_type and class_type.strip() else None
+        sort_order = "desc" if sort_order == "desc" else "asc"
+        return (page, page_size, search, grade, class_type, sort_by or None, sort_order, after, count)
+
+    async def list_students_paginated(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        search: Optional[str] = None,
+        grade: Optional[str] = None,
+        class_type: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        after: Optional[str] = None,
+        count: str = "exact",
+        rows: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> dict:
+        # Cached items are always JSON-ready dicts, which also suit the fast path
+        params = self._list_params(page, page_size, search, grade, class_type, sort_by, sort_order, after, count)
+        params += (tuple(fields) if fields else None,)
+
+        async def compute():
+            result = await super(CachedStudentService, self).list_students_paginated(
+                page, page_size, search, grade, class_type, sort_by, sort_order, after, count,
+                rows=True, fields=fields,
+            )
+            result["items"] = [to_jsonable_python(row) for row in result["items"]]
+            return result
+
+        return await self._cached(STUDENT_LISTS, params, compute)
+
+    async def get_student(self, student_id: int) -> Optional[dict]:
+        async def compute():
+            student = await self._load_student(student_id)
+            return StudentRead.model_validate(student).model_dump(mode="json") if student else None
+
+        # Missing students are not cached (None reads as a miss)
+        return await self._cached(STUDENT, student_id, compute)
+
+    async def get_statistics(self) -> StudentStats:
+        async def compute():
+            stats = await super(CachedStudentService, self).get_statistics()
+            return stats.model_dump(mode="json")
+
+        return StudentStats.model_validate(await self._cached(STATS, ("overview",), compute))
+
+    async def get_detailed_statistics(self, class_type: Optional[str] = None) -> dict:
+        class_type = class_type or None
+        return await self._cached(
+            STATS,
+            ("detailed", class_type),
+            lambda: super(CachedStudentService, self).get_detailed_statistics(class_type),
+        )
+
+    async def get_student_rank(self, student_id: int) -> Optional[StudentRank]:
+        async def compute():
+            rank = await super(CachedStudentService, self).get_student_rank(student_id)
+            return rank.model_dump(mode="json") if rank else None
+
+        rank = await self._cached(RANKINGS, ("rank", student_id), compute)
+        return StudentRank.model_validate(rank) if rank else None
+
+    async def get_leaderboard(self, class_type: Optional[str] = None, top: int = 10) -> Leaderboard:
+        class_type = class_type or None
+
+        async def compute():
+            leaderboard = await super(CachedStudentService, self).get_leaderboard(class_type, top)
+            return leaderboard.model_dump(mode="json")
+
+        return Leaderboard.model_validate(
+            await self._cached(RANKINGS, ("leaderboard", class_type, top), compute)
+        )
+
+    async def create_student(self, student_data: StudentCreate):
+        student = await super().create_student(student_data)
+        await self.cache.invalidate([STUDENT_LISTS, STATS, RANKINGS])
+        return student
+
+    async def import_students(self, chunks: AsyncIterator[bytes], format: str) -> dict:
+        try:
+            return await super().import_students(chunks, format)
+        finally:
+            # Batches are committed as they go, so even a failed import changed data
+            await self.cache.invalidate([STUDENT_LISTS, STATS, RANKINGS])
+
+    async def update_student(self, student_id: int, student_data: StudentUpdate):
+        student = await super().update_student(student_id, student_data)
+        if student is not None:
+            await self.cache.invalidate([STUDENT], student_id)
+            await self.cache.invalidate([STUDENT_LISTS, STATS, RANKINGS])
+        return student
+
+    async def delete_student(self, student_id: int) -> bool:
+        deleted = await super().delete_student(student_id)
+        if deleted:
+            await self.cache.invalidate([STUDENT], student_id)
+            await self.cache.invalidate([STUDENT_LISTS, STATS, RANKINGS])
+        return deleted
@@ -1,4 +1,7 @@
+import numpy as np
+from sqlalchemy import case, cast, func
 from app.models.student import GradeEnum, ClassTypeEnum
+from typing import Mapping, Sequence
 
 
 class GradeCalculator:
@@ -130,4 +133,139 @@ class GradeCalculator:
         student.total_score = GradeCalculator.calculate_total_score(student)
         student.average_score = GradeCalculator.calculate_average(student)
         student.grade = GradeCalculator.calculate_grade(student)
+    
+    # Score columns read by the batch API (the same ones calculate_total_score uses)
+    BATCH_SCORE_COLUMNS = [
+        "khmer_score", "math_score", "history_score", "geography_score", "ethics_score",
+        "earth_science_score", "chemistry_score", "physics_score", "biology_score",
+        "foreign_language_score",
+    ]
+    
+    # Columns added without "or 0.0" in calculate_total_score (None is not defaulted)
+    _REQUIRED_SCORE_COLUMNS = ("math_score", "earth_science_score")
+    
+    @staticmethod
+    def _score_array(values: Sequence, default_none: bool) -> np.ndarray:
+        """Float64 array of scores; None becomes 0.0 ("or 0.0") or NaN."""
+        if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+            # Already numeric (e.g. generated cohorts): a float array holds no None
+            return values.astype(np.float64, copy=False)
+        fill = 0.0 if default_none else np.nan
+        return np.array([fill if value is None else value for value in values], dtype=np.float64)
+    
+    @staticmethod
+    def calculate_batch(class_types: Sequence, scores: Mapping[str, Sequence]) -> dict:
+        """Calculate total, average and grade for many students in one vectorized pass.
+        
+        ``class_types`` holds one class type per student and ``scores`` one sequence
+        per column of BATCH_SCORE_COLUMNS. Returns NumPy arrays ``total_score``,
+        ``average_score`` and ``grade`` (grade letters), bit-identical to the
+        per-student methods above.
+        """
+        columns = {
+            name: GradeCalculator._score_array(
+                scores[name], name not in GradeCalculator._REQUIRED_SCORE_COLUMNS
+            )
+            for name in GradeCalculator.BATCH_SCORE_COLUMNS
+        }
+        if isinstance(class_types, np.ndarray) and class_types.dtype.kind == "U":
+            is_science = class_types == ClassTypeEnum.SCIENCE.value
+        else:
+            is_science = np.array([_class_type_value(c) == ClassTypeEnum.SCIENCE.value for c in class_types], dtype=bool)
+        
+        # Foreign language bonus: points above 25
+        foreign_language = columns["foreign_language_score"]
+        bonus = np.where(foreign_language > 25.0, foreign_language - 25.0, 0.0)
+        
+        # Same operand order as calculate_total_score, so every sum rounds identically
+        science_total = (
+            columns["math_score"] + columns["chemistry_score"] + columns["physics_score"] +
+            columns["biology_score"] + columns["khmer_score"] + columns["history_score"] + bonus
+        )
+        social_science_total = (
+            columns["khmer_score"] + columns["math_score"] + columns["history_score"] +
+            columns["geography_score"] + columns["ethics_score"] + columns["earth_science_score"] + bonus
+        )
+        total = np.where(is_science, science_total, social_science_total)
+        
+        # Average as percentage of 475, capped at 100%
+        base_max = 475.0
+        average = np.where(total >= base_max, 100.0, (total / base_max) * 100.0)
+        
+        # Grade: the highest threshold the average reaches (NaN averages get F like the scalar path)
+        thresholds = sorted(GradeCalculator.GRADE_THRESHOLDS.items(), key=lambda item: item[1])
+        limits = np.array([limit for _, limit in thresholds])
+        letters = np.array([grade.value for grade, _ in thresholds])
+        index = np.searchsorted(limits, average, side="right") - 1
+        index = np.where(np.isnan(average), 0, np.clip(index, 0, None))
+        
+        return {"total_score": total, "average_score": average, "grade": letters[index]}
+    
+    @staticmethod
+    def update_students_grades(students: Sequence):
+        """Update the calculated fields of many students with the batch API."""
+        if not students:
+            return
+        result = GradeCalculator.calculate_batch(
+            [student.class_type for student in students],
+            {
+                name: [getattr(student, name) for student in students]
+                for name in GradeCalculator.BATCH_SCORE_COLUMNS
+            },
+        )
+        for student, total, average, grade in zip(
+            students, result["total_score"].tolist(), result["average_score"].tolist(), result["grade"].tolist()
+        ):
+            student.total_score = total
+            student.average_score = average
+            student.grade = GradeEnum(grade)
+
+    
+    # SQL counterparts of the rules above, used for set-based regrading.
+    # Operand order matches calculate_total_score so results are identical.
+    
+    @staticmethod
+    def total_score_expression(student):
+        """SQL expression of calculate_total_score over a Student-like entity."""
+        foreign_language = student.foreign_language_score
+        bonus = case((foreign_language > 25.0, foreign_language - 25.0), else_=0.0)
+        science = (
+            student.math_score +
+            func.coalesce(student.chemistry_score, 0.0) +
+            func.coalesce(student.physics_score, 0.0) +
+            func.coalesce(student.biology_score, 0.0) +
+            func.coalesce(student.khmer_score, 0.0) +
+            func.coalesce(student.history_score, 0.0) +
+            bonus
+        )
+        social_science = (
+            func.coalesce(student.khmer_score, 0.0) +
+            student.math_score +
+            func.coalesce(student.history_score, 0.0) +
+            func.coalesce(student.geography_score, 0.0) +
+            func.coalesce(student.ethics_score, 0.0) +
+            student.earth_science_score +
+            bonus
+        )
+        return case((student.class_type == ClassTypeEnum.SCIENCE, science), else_=social_science)
+    
+    @staticmethod
+    def average_expression(total):
+        """SQL expression of calculate_average for a total score expression."""
+        base_max = 475.0
+        return case((total >= base_max, 100.0), else_=(total / base_max) * 100.0)
+    
+    @staticmethod
+    def grade_expression(average, grade_type):
+        """SQL expression of calculate_grade for an average expression, cast to grade_type."""
+        thresholds = sorted(
+            GradeCalculator.GRADE_THRESHOLDS.items(), key=lambda item: item[1], reverse=True
+        )
+        whens = [(average >= limit, grade.value) for grade, limit in thresholds if grade != GradeEnum.F]
+        return cast(case(*whens, else_=GradeEnum.F.value), grade_type)
+
+
+def _class_type_value(class_type) -> str:
+    """Plain value of a class type (enum member or string)."""
+    return getattr(class_type, "value", class_type)
 
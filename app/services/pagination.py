@@ -0,0 +1,64 @@
+import base64
+import enum
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import DateTime, and_, or_, tuple_, literal
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not match the query."""
+
+
+def encode_cursor(sort_by: str, sort_order: str, key: Any, row_id: int) -> str:
+    """Encode the sort key and id of the last row of a page as an opaque token."""
+    if isinstance(key, enum.Enum):
+        key = key.value
+    elif isinstance(key, datetime):
+        key = key.isoformat()
+    payload = {"s": sort_by, "o": sort_order, "k": key, "i": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: str, sort_order: str, column) -> tuple[Any, int]:
+    """Decode a cursor into (sort key, id), checking it was issued for the same sort."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        key, row_id = payload["k"], int(payload["i"])
+        issued_for = (payload["s"], payload["o"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Malformed pagination cursor")
+
+    if issued_for != (sort_by, sort_order):
+        raise InvalidCursorError("Cursor was issued for a different sort order")
+
+    if key is not None and isinstance(column.type, DateTime):
+        try:
+            key = datetime.fromisoformat(key)
+        except (ValueError, TypeError):
+            raise InvalidCursorError("Malformed pagination cursor")
+    return key, row_id
+
+
+def keyset_order(column, id_column, sort_order: str) -> list:
+    """ORDER BY clauses for keyset pagination (NULL keys sort last ascending, first descending)."""
+    if sort_order == "desc":
+        return [column.desc().nulls_first(), id_column.desc()]
+    return [column.asc().nulls_last(), id_column.asc()]
+
+
+def keyset_condition(column, id_column, sort_order: str, key: Optional[Any], row_id: int):
+    """WHERE condition selecting the rows that sort after (key, row_id)."""
+    # Row-value comparisons keep the (column, id) index usable
+    bound = tuple_(literal(key, column.type), literal(row_id, id_column.type))
+    if sort_order == "desc":
+        if key is None:
+            return or_(column.is_not(None), and_(column.is_(None), id_column < row_id))
+        return tuple_(column, id_column) < bound
+
+    if key is None:
+        return and_(column.is_(None), id_column > row_id)
+    return or_(tuple_(column, id_column) > bound, column.is_(None))
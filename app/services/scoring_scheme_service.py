@@ -0,0 +1,40 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, inspect
+from app.models.student import ClassTypeEnum
+from app.models.scoring_scheme import ScoringScheme
+
+
+class ScoringSchemeService:
+    """Looks up the scoring schemes new and re-classed students are given.
+
+    Each class type's current scheme (latest exam year) is read once per
+    instance, so a request or a bulk import queries it at most once. A
+    rollback expires the cached schemes (loading their attributes again
+    would need implicit IO), so an expired scheme is read again.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._current = {}
+
+    @staticmethod
+    def current_scheme_query(class_type):
+        """SELECT of the current scheme of a class type (latest exam year, then latest id)."""
+        return (
+            select(ScoringScheme)
+            .where(ScoringScheme.class_type == class_type)
+            .order_by(ScoringScheme.exam_year.desc(), ScoringScheme.id.desc())
+            .limit(1)
+        )
+
+    async def current_scheme(self, class_type) -> ScoringScheme:
+        """Current scheme of a class type; raises LookupError if it has none."""
+        class_type = ClassTypeEnum(class_type)
+        cached = self._current.get(class_type)
+        if cached is None or inspect(cached).expired:
+            result = await self.db.execute(self.current_scheme_query(class_type))
+            scheme = result.scalar_one_or_none()
+            if scheme is None:
+                raise LookupError(f"No scoring scheme for class type {class_type.value}")
+            self._current[class_type] = scheme
+        return self._current[class_type]
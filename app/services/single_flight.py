@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one computation.
+
+    The first caller for a key runs the computation; callers arriving while
+    it is in flight await the same result (or exception) instead of running
+    their own. Nothing is kept once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leading request was cancelled (e.g. client went away): run it ourselves
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.do(key, compute)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executions += 1
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved, there may be no followers
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+
+# Shared by the statistics endpoints of this process
+stats_flight = SingleFlight()
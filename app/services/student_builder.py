@@ -0,0 +1,32 @@
+from app.models.scoring_scheme import ScoringScheme
+from app.models.student import Student
+from app.schemas.student import StudentCreate
+
+
+def column_value(value):
+    """Plain value of an enum member (ORM attributes may hold either)."""
+    return getattr(value, "value", value)
+
+
+def build_student(student_data: StudentCreate, scheme: ScoringScheme) -> Student:
+    """Build (but do not add) a Student graded against the given scoring scheme."""
+    # Max scores come from the scheme; the *_max fields of StudentCreate are ignored
+    return Student(
+        first_name=student_data.first_name,
+        last_name=student_data.last_name,
+        gender=student_data.gender,
+        class_type=student_data.class_type,
+        khmer_score=student_data.khmer_score,
+        math_score=student_data.math_score,
+        history_score=student_data.history_score,
+        geography_score=student_data.geography_score,
+        ethics_score=student_data.ethics_score,
+        earth_science_score=student_data.earth_science_score,
+        chemistry_score=student_data.chemistry_score,
+        physics_score=student_data.physics_score,
+        biology_score=student_data.biology_score,
+        physical_education_score=student_data.physical_education_score,
+        foreign_language_score=student_data.foreign_language_score,
+        scoring_scheme_id=scheme.id,
+        scoring_scheme=scheme,
+    )
@@ -0,0 +1,184 @@
+import codecs
+import csv
+import json
+import psycopg
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+from app.models.student import Student
+from app.schemas.student import StudentCreate
+from app.services.grade_calculator import GradeCalculator
+from app.services.scoring_scheme_service import ScoringSchemeService
+from app.services.student_builder import build_student, column_value
+from app.services.student_stats_store import StudentStatsStore, StatsDelta
+from typing import AsyncIterator, List, Optional, Tuple
+
+
+# Columns written for imported students (id and timestamps come from the database)
+IMPORT_COLUMNS = [
+    column for column in Student.__table__.columns
+    if column.name not in ("id", "created_at", "updated_at")
+]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class StudentImporter:
+    """Imports students from CSV or NDJSON in batches.
+
+    Rows are validated with ``StudentCreate`` and graded by ``GradeCalculator``.
+    Each batch is written with PostgreSQL ``COPY`` (psycopg) or a multi-row
+    ``INSERT`` (other drivers) and committed together with its statistics
+    deltas. Invalid rows are reported and skipped, the rest of the file is
+    still imported. The import is not atomic: a batch the database rejects
+    is rolled back and reported once (with the lines it spans), batches
+    before and after it stay imported. CSV records must not span several
+    lines.
+    """
+
+    BATCH_SIZE = 1000
+    MAX_REPORTED_ERRORS = 1000
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.schemes = ScoringSchemeService(db)
+        self.inserted = 0
+        self.failed = 0
+        self.failed_batches = 0
+        self.errors: List[dict] = []
+
+    def _error(self, line: int, errors: list):
+        """Record a rejected row (only the first MAX_REPORTED_ERRORS are kept)."""
+        self.failed += 1
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def _batch_error(self, batch: List[Tuple[int, Student]], error: Exception):
+        """Record a batch the database rolled back: all its rows failed, reported as one error."""
+        self.failed += len(batch)
+        self.failed_batches += 1
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            message = str(error).splitlines()[0] if str(error) else type(error).__name__
+            self.errors.append({
+                "line": batch[0][0],
+                "last_line": batch[-1][0],
+                "errors": [{"type": "database_error", "msg": message, "rows": len(batch)}],
+            })
+
+    @staticmethod
+    def _parse_csv(header: List[str], line: str) -> dict:
+        values = next(csv.reader([line]))
+        if len(values) != len(header):
+            raise ValueError(f"Expected {len(header)} fields, got {len(values)}")
+        # Empty cells fall back to the schema defaults
+        return {name: value for name, value in zip(header, values) if value != ""}
+
+    @staticmethod
+    def _parse_ndjson(line: str) -> dict:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Each line must be a JSON object")
+        return record
+
+    async def _records(self, lines: AsyncIterator[str], format: str) -> AsyncIterator[Tuple[int, dict]]:
+        """Yield (line number, raw record), reporting lines that cannot be parsed."""
+        header: Optional[List[str]] = None
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            if format == "csv" and header is None:
+                header = [name.strip() for name in next(csv.reader([line]))]
+                continue
+            try:
+                if format == "csv":
+                    yield line_number, self._parse_csv(header, line)
+                else:
+                    yield line_number, self._parse_ndjson(line)
+            except (ValueError, csv.Error) as e:
+                self._error(line_number, [{"type": "parse_error", "msg": str(e)}])
+
+    async def import_students(self, lines: AsyncIterator[str], format: str) -> dict:
+        """Import every valid row and return counts plus per-row errors."""
+        batch: List[Tuple[int, Student]] = []
+        async for line_number, record in self._records(lines, format):
+            try:
+                student_data = StudentCreate.model_validate(record)
+            except ValidationError as e:
+                self._error(line_number, e.errors(include_url=False, include_context=False))
+                continue
+            scheme = await self.schemes.current_scheme(student_data.class_type)
+            batch.append((line_number, build_student(student_data, scheme)))
+            if len(batch) >= self.BATCH_SIZE:
+                await self._write_batch(batch)
+                batch = []
+        if batch:
+            await self._write_batch(batch)
+
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "failed_batches": self.failed_batches,
+            "errors": self.errors,
+        }
+
+    @staticmethod
+    def _apply_column_defaults(student: Student):
+        """Fill unset columns with their scalar defaults, as an ORM insert would."""
+        for column in IMPORT_COLUMNS:
+            if getattr(student, column.key) is None and column.default is not None and column.default.is_scalar:
+                setattr(student, column.key, column.default.arg)
+
+    async def _write_batch(self, batch: List[Tuple[int, Student]]):
+        """Grade, write and commit one batch; a database error rolls back and reports the batch only."""
+        students = [student for _, student in batch]
+        for student in students:
+            self._apply_column_defaults(student)
+        GradeCalculator.update_students_grades(students)
+
+        delta = StatsDelta()
+        rows = []
+        for student in students:
+            delta.add(StatsDelta.snapshot(student))
+            rows.append([column_value(getattr(student, column.key)) for column in IMPORT_COLUMNS])
+
+        try:
+            if self.db.get_bind().dialect.driver == "psycopg":
+                await self._copy_rows(rows)
+            else:
+                await self.db.execute(
+                    insert(Student),
+                    [dict(zip((c.key for c in IMPORT_COLUMNS), row)) for row in rows],
+                )
+            await StudentStatsStore(self.db).apply(delta)
+            await self.db.commit()
+        except (SQLAlchemyError, psycopg.Error) as e:
+            # COPY goes through the driver connection, so its errors are not wrapped by SQLAlchemy
+            await self.db.rollback()
+            self._batch_error(batch, e)
+            return
+        self.inserted += len(rows)
+
+    async def _copy_rows(self, rows: List[list]):
+        """Stream rows into the students table with COPY FROM STDIN."""
+        conn = await self.db.connection()
+        raw = await conn.get_raw_connection()
+        columns = ", ".join(column.name for column in IMPORT_COLUMNS)
+        async with raw.driver_connection.cursor() as cursor:
+            async with cursor.copy(f"COPY students ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    await copy.write_row(row)
@@ -0,0 +1,111 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
+from app.models.student import Student
+from app.models.student_stats import StudentStat
+from app.schemas.student import StudentRank, Leaderboard, LeaderboardEntry
+from app.core.config import settings
+from typing import Optional
+
+
+LEADERBOARD_COLUMNS = [
+    Student.__table__.c[name]
+    for name in LeaderboardEntry.model_fields
+    if name not in ("rank", "percent_rank")
+]
+
+
+class StudentRanking:
+    """Ranks students by total score within their class type, best first.
+
+    Backed by the index on (class_type, total_score DESC, id): a student's
+    rank is one more than the number of students of the class type with a
+    higher total, counted over an index range instead of sorting the class
+    (so it reads ``rank`` index entries: cheap near the top, up to the class
+    size at the bottom), and a leaderboard is ``RANK()`` over the first
+    ``top`` rows (and ties) of the index order. ``PERCENT_RANK()`` would read the whole class type,
+    so percent ranks are derived from the rank and the class size (the same
+    value). Students without a total score are not ranked.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def class_size(self, class_type: Optional[str] = None) -> int:
+        """Ranked students of a class type (of all class types without one)."""
+        if settings.STATS_MATERIALIZED:
+            # student_stats counts every student: take out the unranked ones (a short index range)
+            counted = select(func.coalesce(func.sum(StudentStat.student_count), 0))
+            unranked = select(func.count()).select_from(Student).where(Student.total_score.is_(None))
+            if class_type:
+                counted = counted.where(StudentStat.class_type == class_type)
+                unranked = unranked.where(Student.class_type == class_type)
+            query = select(counted.scalar_subquery() - unranked.scalar_subquery())
+        else:
+            query = select(func.count()).select_from(Student).where(Student.total_score.isnot(None))
+            if class_type:
+                query = query.where(Student.class_type == class_type)
+        return (await self.db.execute(query)).scalar()
+
+    @staticmethod
+    def percent_rank(rank: int, class_size: int) -> float:
+        """PERCENT_RANK() of a rank: (rank - 1) / (class_size - 1), 0.0 in a class of one."""
+        if class_size <= 1:
+            return 0.0
+        return (rank - 1) / (class_size - 1)
+
+    async def get_rank(self, student_id: int) -> Optional[StudentRank]:
+        """Rank of a student within their class type, None if there is no such student.
+
+        A student without a total score is returned with ``rank`` and
+        ``percent_rank`` left as None. The count of better students is an
+        index-only range scan of O(rank) entries, not an O(log n) lookup.
+        """
+        other = aliased(Student)
+        better = (
+            select(func.count())
+            .where(other.class_type == Student.class_type, other.total_score > Student.total_score)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(Student.class_type, Student.total_score, (better + 1).label("rank"))
+            .where(Student.id == student_id)
+        )
+        student = result.one_or_none()
+        if student is None:
+            return None
+
+        class_size = await self.class_size(student.class_type)
+        ranked = student.total_score is not None
+        return StudentRank(
+            student_id=student_id,
+            class_type=student.class_type,
+            total_score=student.total_score,
+            rank=student.rank if ranked else None,
+            class_size=class_size,
+            percent_rank=self.percent_rank(student.rank, class_size) if ranked else None,
+        )
+
+    async def get_leaderboard(self, class_type: Optional[str] = None, top: int = 10) -> Leaderboard:
+        """Students ranked within the top ``top`` of a class type (of all students without one)."""
+        rank = func.rank().over(order_by=Student.total_score.desc())
+        ranked = select(*LEADERBOARD_COLUMNS, rank.label("rank")).where(Student.total_score.isnot(None))
+        if class_type:
+            ranked = ranked.where(Student.class_type == class_type)
+        # FETCH ... WITH TIES keeps every student tied with the last one (rank <= top)
+        # and, unlike a filter on the rank, lets the planner cost the index scan as
+        # reading only the first rows
+        ranked = ranked.order_by(Student.total_score.desc()).fetch(top, with_ties=True).subquery()
+
+        result = await self.db.execute(select(ranked).order_by(ranked.c.rank, ranked.c.id))
+        rows = result.mappings().all()
+        class_size = await self.class_size(class_type)
+        return Leaderboard(
+            class_type=class_type,
+            class_size=class_size,
+            top=top,
+            items=[
+                LeaderboardEntry(**row, percent_rank=self.percent_rank(row["rank"], class_size))
+                for row in rows
+            ],
+        )
@@ -0,0 +1,101 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, update, or_, case
+from app.models.student import Student
+from app.models.scoring_scheme import ScoringScheme
+from app.services.grade_calculator import GradeCalculator
+from app.services.scoring_scheme_service import ScoringSchemeService
+from app.services.student_stats_store import StudentStatsStore
+from typing import AsyncIterator, Tuple
+
+
+class StudentRegrader:
+    """Recomputes total_score, average_score and grade for every student.
+
+    Works through the table in id order with one set-based ``UPDATE`` per
+    chunk, generated from GradeCalculator's rules, and commits after each
+    chunk. Rows that already hold the right values are not rewritten, so a
+    run can be resumed from the last reported id (or simply restarted).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _update_statement(lower_id: int, upper_id: int, reset_max_scores: bool):
+        """UPDATE for students with lower_id < id <= upper_id."""
+        total = GradeCalculator.total_score_expression(Student)
+        average = GradeCalculator.average_expression(total)
+        grade = GradeCalculator.grade_expression(average, Student.grade.type)
+        values = {"total_score": total, "average_score": average, "grade": grade}
+        changed = [
+            Student.total_score.is_distinct_from(total),
+            Student.average_score.is_distinct_from(average),
+            Student.grade.is_distinct_from(grade),
+        ]
+
+        if reset_max_scores:
+            # Students whose scheme belongs to another class type get their class type's current scheme
+            scheme_class_type = (
+                select(ScoringScheme.class_type)
+                .where(ScoringScheme.id == Student.scoring_scheme_id)
+                .scalar_subquery()
+            )
+            current_scheme_id = (
+                ScoringSchemeService.current_scheme_query(Student.class_type)
+                .with_only_columns(ScoringScheme.id)
+                .scalar_subquery()
+            )
+            mismatched = scheme_class_type != Student.class_type
+            values["scoring_scheme_id"] = case((mismatched, current_scheme_id), else_=Student.scoring_scheme_id)
+            changed.append(mismatched)
+
+        return (
+            update(Student)
+            .where(Student.id > lower_id, Student.id <= upper_id, or_(*changed))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def run(
+        self,
+        chunk_size: int = 5000,
+        start_after: int = 0,
+        reset_max_scores: bool = False,
+    ) -> AsyncIterator[Tuple[int, int, int]]:
+        """Regrade chunk by chunk, yielding (students processed, students changed, last id)."""
+        processed = changed = 0
+        last_id = start_after
+        while True:
+            # Upper id bound of the next chunk, read through the primary key index
+            chunk = (
+                select(Student.id)
+                .where(Student.id > last_id)
+                .order_by(Student.id)
+                .limit(chunk_size)
+                .subquery()
+            )
+            bounds = await self.db.execute(select(func.count(), func.max(chunk.c.id)))
+            count, upper_id = bounds.one()
+            if not count:
+                break
+
+            result = await self.db.execute(
+                self._update_statement(last_id, upper_id, reset_max_scores)
+            )
+            await self.db.commit()
+
+            processed += count
+            changed += result.rowcount
+            last_id = upper_id
+            yield processed, changed, last_id
+
+        # Grades feed the statistics summary tables
+        await StudentStatsStore(self.db).rebuild()
+        await self.db.commit()
+
+    async def count_remaining(self, start_after: int = 0) -> int:
+        """Number of students a run starting after this id will process."""
+        result = await self.db.execute(
+            select(func.count()).select_from(Student).where(Student.id > start_after)
+        )
+        return result.scalar()
@@ -1,45 +1,108 @@
+import json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, desc, asc
-from app.models.student import Student, GradeEnum, ClassTypeEnum
+from sqlalchemy import select, func, desc, asc
+from sqlalchemy.orm import contains_eager
+from app.models.student import Student, STUDENT_FULL_NAME
+from app.models.table_version import TableVersion
+from app.models.scoring_scheme import ScoringScheme
 from app.services.grade_calculator import GradeCalculator
-from typing import Optional, List
-from app.schemas.student import StudentCreate, StudentUpdate, StudentStats
+from app.services.scoring_scheme_service import ScoringSchemeService
+from app.services.student_stats_engine import StudentStatsEngine
+from app.services.student_stats_store import StudentStatsStore, StatsDelta
+from app.services.student_builder import build_student
+from app.services.student_import import StudentImporter, iter_lines
+from app.services.student_ranking import StudentRanking
+from app.services.single_flight import stats_flight
+from app.services.pagination import encode_cursor, decode_cursor, keyset_condition, keyset_order
+from typing import Optional, List, AsyncIterator
+from app.schemas.student import StudentCreate, StudentRead, StudentUpdate, StudentStats, StudentRank, Leaderboard
+from app.core.config import settings
+from app.db.session import READ_YOUR_WRITES_SESSION
+
+
+# Columns of StudentRead by field name (max scores from the scoring scheme), for reads that skip the ORM
+STUDENT_READ_COLUMN_MAP = {
+    name: Student.__table__.c.get(name, ScoringScheme.__table__.c.get(name))
+    for name in StudentRead.model_fields
+}
+STUDENT_READ_COLUMNS = list(STUDENT_READ_COLUMN_MAP.values())
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a fields projection names columns StudentRead does not have."""
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated ``fields`` projection into StudentRead order (id is always kept)."""
+    if not fields or not fields.strip():
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(StudentRead.model_fields)
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return [name for name in StudentRead.model_fields if name in requested]
 
 
 class StudentService:
     def __init__(self, db: AsyncSession):
         self.db = db
         
-    async def list_students(self) -> List[Student]:
-        """Get all students from database."""
-        result = await self.db.execute(select(Student).order_by(Student.id))
-        students = result.scalars().all()
-        return list(students)
+    async def list_students(self, rows: bool = False, fields: Optional[List[str]] = None) -> List[Student]:
+        """Get all students from database (as plain dicts with ``rows``)."""
+        result = await self.db.execute(self._select(rows, fields).order_by(Student.id))
+        return self._fetch(result, rows)
     
-    async def list_students_paginated(
+    @staticmethod
+    def _select(rows: bool, fields: Optional[List[str]] = None):
+        """SELECT of Student objects, or of the StudentRead columns (or ``fields``) as rows.
+        
+        Both join the scoring scheme, so its max scores can be sorted on.
+        """
+        if not rows:
+            return select(Student).join(Student.scoring_scheme).options(contains_eager(Student.scoring_scheme))
+        columns = [STUDENT_READ_COLUMN_MAP[name] for name in fields] if fields else STUDENT_READ_COLUMNS
+        return select(*columns).join_from(Student, ScoringScheme)
+    
+    @staticmethod
+    def _fetch(result, rows: bool) -> list:
+        """Result as Student objects, or as dicts keyed like StudentRead."""
+        if rows:
+            return [dict(row) for row in result.mappings()]
+        return list(result.scalars().all())
+    
+    async def stream_students(
         self,
-        page: int = 1,
-        page_size: int = 10,
         search: Optional[str] = None,
         grade: Optional[str] = None,
         class_type: Optional[str] = None,
         sort_by: Optional[str] = None,
-        sort_order: str = "asc"
-    ) -> dict:
-        """Get students with pagination, filtering, and sorting."""
-        # Base query
-        query = select(Student)
-        
-        # Apply search filter (name)
+        sort_order: str = "asc",
+        batch_size: int = 500,
+    ) -> AsyncIterator[List[Student]]:
+        """Yield the filtered, sorted students batch by batch from a server-side cursor."""
+        query = self._apply_filters(self._select(False), search, grade, class_type)
+        query = self._apply_sorting(query, sort_by, sort_order)
+        if sort_by:
+            # Tie-breaker so repeated exports list rows in the same order
+            query = query.order_by(Student.id)
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for batch in result.scalars().partitions():
+            yield batch
+    
+    def _apply_filters(
+        self,
+        query,
+        search: Optional[str] = None,
+        grade: Optional[str] = None,
+        class_type: Optional[str] = None,
+    ):
+        """Apply the name search, grade and class_type filters to a query."""
+        # Apply search filter (name). A match in the first or last name is also a
+        # match in the full name, so one trigram-indexed expression covers all three
         if search and search.strip():
             search_term = f"%{search.strip()}%"
-            query = query.where(
-                or_(
-                    Student.first_name.ilike(search_term),
-                    Student.last_name.ilike(search_term),
-                    func.concat(Student.first_name, ' ', Student.last_name).ilike(search_term)
-                )
-            )
+            query = query.where(STUDENT_FULL_NAME.ilike(search_term))
         
         # Apply grade filter
         if grade and grade in ['A', 'B', 'C', 'D', 'E', 'F']:
@@ -49,9 +112,12 @@ class StudentService:
         if class_type and class_type.strip():
             query = query.where(Student.class_type == class_type.strip())
         
-        # Apply sorting
+        return query
+    
+    def _apply_sorting(self, query, sort_by: Optional[str] = None, sort_order: str = "asc"):
+        """Order a query by a StudentRead field (unknown fields leave it unordered, none sorts by id)."""
         if sort_by:
-            sort_column = getattr(Student, sort_by, None)
+            sort_column = STUDENT_READ_COLUMN_MAP.get(sort_by)
             if sort_column is not None:
                 if sort_order == "desc":
                     query = query.order_by(desc(sort_column))
@@ -59,11 +125,64 @@ class StudentService:
                     query = query.order_by(asc(sort_column))
         else:
             query = query.order_by(Student.id)
+        return query
+    
+    async def _count(self, query, count: str) -> Optional[int]:
+        """Count the rows of a filtered query: exact, planner estimate, or skipped."""
+        if count == "none":
+            return None
+        if count == "estimate":
+            # The planner's row estimate costs no table scan
+            compiled = query.compile(
+                dialect=self.db.get_bind().dialect,
+                compile_kwargs={"literal_binds": True},
+            )
+            conn = await self.db.connection()
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
         
-        # Get total count
         count_query = select(func.count()).select_from(query.subquery())
         total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        return total_result.scalar()
+    
+    async def list_students_paginated(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        search: Optional[str] = None,
+        grade: Optional[str] = None,
+        class_type: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        after: Optional[str] = None,
+        count: str = "exact",
+        rows: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> dict:
+        """Get students with pagination, filtering, and sorting.
+        
+        Passing ``after`` switches to keyset pagination, which costs the same for
+        every page: an empty value fetches the first page, then the
+        ``next_cursor`` of each page fetches the next one. ``count`` selects
+        an exact total, a planner estimate ("estimate"), or none ("none").
+        With ``rows`` the items are plain dicts read without the ORM, for the
+        fast JSON response path; ``fields`` (see ``parse_fields``) then limits
+        the columns read and returned.
+        """
+        # Base query
+        query = self._apply_filters(self._select(rows, fields), search, grade, class_type)
+        
+        total = await self._count(query, count)
+        
+        if after is not None:
+            return await self._list_students_keyset(
+                query, page, page_size, sort_by, sort_order, after, total, rows, fields
+            )
+        
+        query = self._apply_sorting(query, sort_by, sort_order)
         
         # Apply pagination
         offset = (page - 1) * page_size
@@ -71,90 +190,155 @@ class StudentService:
         
         # Execute query
         result = await self.db.execute(query)
-        students = result.scalars().all()
+        students = self._fetch(result, rows)
         
         # Convert to list of Student objects (already ORM models, will be serialized by Pydantic)
         return {
-            "items": list(students),
+            "items": students,
             "total": total,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size
+            "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+            "next_cursor": None,
         }
     
+    @staticmethod
+    def _keyset_sort(sort_by: Optional[str], sort_order: str) -> tuple[str, str]:
+        """Normalize sort_by/sort_order for keyset pagination (fields StudentRead lacks sort by id)."""
+        if not sort_by or sort_by not in STUDENT_READ_COLUMN_MAP:
+            sort_by = "id"
+        return sort_by, "desc" if sort_order == "desc" else "asc"
+    
+    async def _list_students_keyset(
+        self,
+        query,
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        sort_order: str,
+        after: str,
+        total: Optional[int],
+        rows: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> dict:
+        """Fetch the page following a cursor, ordered by (sort column, id)."""
+        sort_by, sort_order = self._keyset_sort(sort_by, sort_order)
+        sort_column = STUDENT_READ_COLUMN_MAP[sort_by]
+        
+        if after:
+            key, last_id = decode_cursor(after, sort_by, sort_order, sort_column)
+            query = query.where(keyset_condition(sort_column, Student.id, sort_order, key, last_id))
+        
+        # The cursor needs the sort key even when the projection leaves it out
+        hidden_sort_key = rows and sort_by not in (fields or STUDENT_READ_COLUMN_MAP)
+        if hidden_sort_key:
+            query = query.add_columns(sort_column)
+        
+        # Fetch one extra row to know whether another page exists
+        query = query.order_by(*keyset_order(sort_column, Student.id, sort_order)).limit(page_size + 1)
+        result = await self.db.execute(query)
+        students = self._fetch(result, rows)
+        
+        next_cursor = None
+        if len(students) > page_size:
+            students = students[:page_size]
+            last = students[-1]
+            if rows:
+                next_cursor = encode_cursor(sort_by, sort_order, last[sort_by], last["id"])
+            else:
+                next_cursor = encode_cursor(sort_by, sort_order, getattr(last, sort_by), last.id)
+        
+        if hidden_sort_key:
+            for student in students:
+                del student[sort_by]
+        
+        return {
+            "items": students,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+            "next_cursor": next_cursor,
+        }
+    
+    async def get_version(self) -> int:
+        """Change counter of the students and scoring_schemes tables (bumped by triggers on every write).
+
+        Student responses include the scheme max scores, so both tables count;
+        the counters only grow, so their sum changes whenever either does.
+        """
+        result = await self.db.execute(
+            select(func.sum(TableVersion.version)).where(
+                TableVersion.table_name.in_([Student.__tablename__, ScoringScheme.__tablename__])
+            )
+        )
+        return result.scalar() or 0
+    
     async def get_student(self, student_id: int) -> Optional[Student]:
         """Get a specific student by ID."""
+        return await self._load_student(student_id)
+    
+    async def _load_student(self, student_id: int) -> Optional[Student]:
+        """Load a student row in this session (never served from a cache)."""
         result = await self.db.execute(
             select(Student).where(Student.id == student_id)
         )
         return result.scalar_one_or_none()
     
+    async def get_student_rank(self, student_id: int) -> Optional[StudentRank]:
+        """Rank and percent rank of a student within their class type."""
+        return await StudentRanking(self.db).get_rank(student_id)
+    
+    async def get_leaderboard(self, class_type: Optional[str] = None, top: int = 10) -> Leaderboard:
+        """Best students by total score, within a class type or across all students."""
+        return await StudentRanking(self.db).get_leaderboard(class_type or None, top)
+    
     async def create_student(self, student_data: StudentCreate) -> Student:
         """Create a new student with grade calculations."""
-        # Adjust max scores based on class_type
-        if student_data.class_type == ClassTypeEnum.SOCIAL_SCIENCE:
-            # Social Science: khmer_max=125, math_max=75
-            khmer_max = 125.0
-            math_max = 75.0
-            history_max = 75.0
-        else:  # ClassTypeEnum.SCIENCE
-            # Science: math_max=125, khmer_max=75, history_max=50
-            khmer_max = 75.0
-            math_max = 125.0
-            history_max = 50.0
-        
-        db_student = Student(
-            first_name=student_data.first_name,
-            last_name=student_data.last_name,
-            gender=student_data.gender,
-            class_type=student_data.class_type,
-            khmer_score=student_data.khmer_score,
-            math_score=student_data.math_score,
-            history_score=student_data.history_score,
-            geography_score=student_data.geography_score,
-            ethics_score=student_data.ethics_score,
-            earth_science_score=student_data.earth_science_score,
-            chemistry_score=student_data.chemistry_score,
-            physics_score=student_data.physics_score,
-            biology_score=student_data.biology_score,
-            physical_education_score=student_data.physical_education_score,
-            foreign_language_score=student_data.foreign_language_score,
-            khmer_max=khmer_max,
-            math_max=math_max,
-            history_max=history_max,
-            geography_max=student_data.geography_max,
-            ethics_max=student_data.ethics_max,
-            earth_science_max=student_data.earth_science_max,
-            chemistry_max=student_data.chemistry_max,
-            physics_max=student_data.physics_max,
-            biology_max=student_data.biology_max,
-            physical_education_max=student_data.physical_education_max,
-            foreign_language_max=student_data.foreign_language_max,
-        )
+        scheme = await ScoringSchemeService(self.db).current_scheme(student_data.class_type)
+        db_student = build_student(student_data, scheme)
         
         # Calculate grades
         GradeCalculator.update_student_grades(db_student)
         
         self.db.add(db_student)
+        await self.db.flush()
+        
+        # Keep the statistics summary tables in step, in the same transaction
+        await StudentStatsStore(self.db).record(None, StatsDelta.snapshot(db_student))
+        
         await self.db.commit()
         await self.db.refresh(db_student)
         return db_student
     
+    async def import_students(self, chunks: AsyncIterator[bytes], format: str) -> dict:
+        """Bulk import students from a CSV or NDJSON byte stream."""
+        return await StudentImporter(self.db).import_students(iter_lines(chunks), format)
+    
     async def update_student(
         self, student_id: int, student_data: StudentUpdate
     ) -> Optional[Student]:
         """Update a student and recalculate grades."""
-        student = await self.get_student(student_id)
+        student = await self._load_student(student_id)
         if not student:
             return None
         
+        old_snapshot = StatsDelta.snapshot(student)
+        
         # Update fields if provided
         update_data = student_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(student, field, value)
         
+        # A student moving to another class type takes that class type's current scheme
+        if student.class_type != student.scoring_scheme.class_type:
+            student.scoring_scheme = await ScoringSchemeService(self.db).current_scheme(student.class_type)
+        
         # Recalculate grades after update
         GradeCalculator.update_student_grades(student)
+        await self.db.flush()
+        
+        await StudentStatsStore(self.db).record(old_snapshot, StatsDelta.snapshot(student))
         
         await self.db.commit()
         await self.db.refresh(student)
@@ -162,204 +346,44 @@ class StudentService:
     
     async def delete_student(self, student_id: int) -> bool:
         """Delete a student."""
-        student = await self.get_student(student_id)
+        student = await self._load_student(student_id)
         if not student:
             return False
         
+        old_snapshot = StatsDelta.snapshot(student)
         await self.db.delete(student)
+        await self.db.flush()
+        
+        await StudentStatsStore(self.db).record(old_snapshot, None)
+        
         await self.db.commit()
         return True
     
+    async def _single_flight(self, key: tuple, compute):
+        """stats_flight.do, except for reads of a client's own writes.
+
+        A computation already in flight may have started before the write.
+        """
+        if self.db.info.get(READ_YOUR_WRITES_SESSION):
+            return await compute()
+        return await stats_flight.do(key, compute)
+    
+    def _stats_source(self):
+        if settings.STATS_MATERIALIZED:
+            return StudentStatsStore(self.db)
+        return StudentStatsEngine(self.db)
+    
     async def get_statistics(self) -> StudentStats:
-        """Get statistics about all students."""
-        # Get all students
-        students = await self.list_students()
-        total_students = len(students)
-        
-        # Count pass/fail
-        pass_count = sum(
-            1 for s in students 
-            if s.grade and GradeCalculator.is_passing(s.grade)
-        )
-        fail_count = total_students - pass_count
-        
-        # Grade distribution
-        grade_distribution = {grade.value: 0 for grade in GradeEnum}
-        for student in students:
-            if student.grade:
-                grade_distribution[student.grade.value] += 1
-        
-        # Subject statistics (pass/fail per subject)
-        # A subject is passing if score >= 50% of max
-        subject_stats = {
-            "khmer": {"pass": 0, "fail": 0},
-            "math": {"pass": 0, "fail": 0},
-            "history": {"pass": 0, "fail": 0},
-            "geography": {"pass": 0, "fail": 0},
-            "ethics": {"pass": 0, "fail": 0},
-            "earth_science": {"pass": 0, "fail": 0},
-        }
+        """Get statistics about all students (computed in the database).
         
-        for student in students:
-            subjects = [
-                ("khmer", student.khmer_score, student.khmer_max),
-                ("math", student.math_score, student.math_max),
-                ("history", student.history_score, student.history_max),
-                ("geography", student.geography_score, student.geography_max),
-                ("ethics", student.ethics_score, student.ethics_max),
-                ("earth_science", student.earth_science_score, student.earth_science_max),
-            ]
-            
-            for subject_name, score, max_score in subjects:
-                if max_score > 0:
-                    percentage = (score / max_score) * 100
-                    if percentage >= 50:
-                        subject_stats[subject_name]["pass"] += 1
-                    else:
-                        subject_stats[subject_name]["fail"] += 1
-        
-        return StudentStats(
-            total_students=total_students,
-            pass_count=pass_count,
-            fail_count=fail_count,
-            grade_distribution=grade_distribution,
-            subject_stats=subject_stats,
-        )
+        Concurrent calls share one computation (see SingleFlight).
+        """
+        return await self._single_flight(("overview",), self._stats_source().get_statistics)
 
     async def get_detailed_statistics(self, class_type: Optional[str] = None) -> dict:
         """Get detailed analytics with subject averages, score distributions, and demographics."""
-        # Get all students or filter by class_type
-        query = select(Student)
-        if class_type:
-            query = query.where(Student.class_type == class_type)
-        
-        result = await self.db.execute(query)
-        students = list(result.scalars().all())
-        
-        if not students:
-            return {
-                "total_students": 0,
-                "subject_averages": {},
-                "score_distribution": {},
-                "gender_stats": {},
-                "performance_tiers": {}
-            }
-        
-        # Determine subjects based on class_type
-        if class_type == 'science':
-            subjects = ['math', 'chemistry', 'physics', 'biology', 'khmer', 'history', 'foreign_language']
-        elif class_type == 'social_science':
-            subjects = ['khmer', 'math', 'history', 'geography', 'ethics', 'earth_science', 'foreign_language']
-        else:
-            # All subjects
-            subjects = ['khmer', 'math', 'history', 'geography', 'ethics', 'earth_science', 
-                       'chemistry', 'physics', 'biology', 'foreign_language']
-        
-        # Calculate subject averages and score distributions
-        subject_averages = {}
-        score_distribution = {}
-        
-        for subject in subjects:
-            score_attr = f"{subject}_score"
-            max_attr = f"{subject}_max"
-            
-            scores = []
-            max_scores = []
-            for student in students:
-                max_score = getattr(student, max_attr, 0)
-                if max_score > 0:  # Only include if subject is applicable
-                    score = getattr(student, score_attr, 0)
-                    scores.append(score)
-                    max_scores.append(max_score)
-            
-            if scores:
-                # Use the first max_score as reference (should be consistent for all students)
-                subject_max = max_scores[0] if max_scores else 100
-                
-                subject_averages[subject] = {
-                    "average": round(sum(scores) / len(scores), 2),
-                    "highest": round(max(scores), 2),
-                    "lowest": round(min(scores), 2),
-                    "total_students": len(scores),
-                    "max_score": subject_max
-                }
-                
-                # Score ranges based on percentage: 0-24%, 25-49%, 50-74%, 75-100%
-                ranges = {"0-24%": 0, "25-49%": 0, "50-74%": 0, "75-100%": 0}
-                for score in scores:
-                    percentage = (score / subject_max) * 100
-                    if percentage < 25:
-                        ranges["0-24%"] += 1
-                    elif percentage < 50:
-                        ranges["25-49%"] += 1
-                    elif percentage < 75:
-                        ranges["50-74%"] += 1
-                    else:  # 75-100%
-                        ranges["75-100%"] += 1
-                
-                score_distribution[subject] = ranges
-        
-        # Gender-based statistics
-        gender_stats = {
-            "male": {"count": 0, "average": 0, "pass": 0},
-            "female": {"count": 0, "average": 0, "pass": 0}
-        }
-        
-        male_students = [s for s in students if s.gender == 'M']
-        female_students = [s for s in students if s.gender == 'F']
-        
-        if male_students:
-            gender_stats["male"]["count"] = len(male_students)
-            gender_stats["male"]["average"] = round(
-                sum(s.average_score for s in male_students) / len(male_students), 2
-            )
-            gender_stats["male"]["pass"] = sum(
-                1 for s in male_students if s.grade and GradeCalculator.is_passing(s.grade)
-            )
-        
-        if female_students:
-            gender_stats["female"]["count"] = len(female_students)
-            gender_stats["female"]["average"] = round(
-                sum(s.average_score for s in female_students) / len(female_students), 2
-            )
-            gender_stats["female"]["pass"] = sum(
-                1 for s in female_students if s.grade and GradeCalculator.is_passing(s.grade)
-            )
-        
-        # Performance tiers (based on average score)
-        performance_tiers = {
-            "excellent": 0,   # 90-100%
-            "good": 0,        # 75-89%
-            "average": 0,     # 60-74%
-            "below_average": 0,  # 50-59%
-            "poor": 0         # <50%
-        }
-        
-        for student in students:
-            avg = student.average_score
-            if avg >= 90:
-                performance_tiers["excellent"] += 1
-            elif avg >= 75:
-                performance_tiers["good"] += 1
-            elif avg >= 60:
-                performance_tiers["average"] += 1
-            elif avg >= 50:
-                performance_tiers["below_average"] += 1
-            else:
-                performance_tiers["poor"] += 1
-        
-        # Grade distribution
-        grade_distribution = {grade.value: 0 for grade in GradeEnum}
-        for student in students:
-            if student.grade:
-                grade_distribution[student.grade.value] += 1
-        
-        return {
-            "total_students": len(students),
-            "subject_averages": subject_averages,
-            "score_distribution": score_distribution,
-            "gender_stats": gender_stats,
-            "performance_tiers": performance_tiers,
-            "grade_distribution": grade_distribution
-        }
-
+        class_type = class_type or None
+        return await self._single_flight(
+            ("detailed", class_type),
+            lambda: self._stats_source().get_detailed_statistics(class_type),
+        )
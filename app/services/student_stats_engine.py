@@ -0,0 +1,220 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_
+from app.models.student import Student, GradeEnum, GenderEnum
+from app.models.scoring_scheme import ScoringScheme
+from app.schemas.student import StudentStats
+from typing import Optional
+
+
+class StudentStatsEngine:
+    """Computes student statistics with server-side SQL aggregates.
+
+    Every statistic is expressed as an aggregate (mostly ``COUNT(*) FILTER``)
+    so the database returns a single row instead of the whole table. Max
+    scores are read from each student's scoring scheme through a join.
+    """
+
+    # Subjects reported in the overview pass/fail breakdown
+    OVERVIEW_SUBJECTS = ["khmer", "math", "history", "geography", "ethics", "earth_science"]
+
+    # Subjects reported in the detailed statistics, per class type
+    DETAILED_SUBJECTS = {
+        "science": ["math", "chemistry", "physics", "biology", "khmer", "history", "foreign_language"],
+        "social_science": ["khmer", "math", "history", "geography", "ethics", "earth_science", "foreign_language"],
+        None: ["khmer", "math", "history", "geography", "ethics", "earth_science",
+               "chemistry", "physics", "biology", "foreign_language"],
+    }
+
+    # Score ranges as [lower, upper) percentage of the subject max score
+    SCORE_RANGES = [("0-24%", None, 25), ("25-49%", 25, 50), ("50-74%", 50, 75), ("75-100%", 75, None)]
+
+    # Performance tiers as [lower, upper) average score
+    PERFORMANCE_TIERS = [
+        ("excellent", 90, None),
+        ("good", 75, 90),
+        ("average", 60, 75),
+        ("below_average", 50, 60),
+        ("poor", None, 50),
+    ]
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _passing_grade():
+        """Condition for a passing grade (graded and not F)."""
+        return and_(Student.grade.is_not(None), Student.grade != GradeEnum.F)
+
+    @staticmethod
+    def _subject_percentage(subject: str):
+        """Score of a subject as a percentage of the student's own max score."""
+        score = getattr(Student, f"{subject}_score")
+        max_score = getattr(ScoringScheme, f"{subject}_max")
+        # NULLIF guards the division, the FILTER clauses also require max > 0
+        return (score / func.nullif(max_score, 0)) * 100
+
+    @staticmethod
+    def _in_range(value, lower, upper):
+        """Condition for lower <= value < upper (either bound may be open)."""
+        conditions = []
+        if lower is not None:
+            conditions.append(value >= lower)
+        if upper is not None:
+            conditions.append(value < upper)
+        return and_(*conditions)
+
+    @staticmethod
+    def _rounded(value, count: int = 1) -> Optional[float]:
+        """value / count to 2 decimals, None when every aggregated value was NULL."""
+        if value is None:
+            return None
+        return round(value / count, 2)
+
+    async def get_statistics(self) -> StudentStats:
+        """Get pass/fail, grade and per-subject statistics in one query."""
+        columns = [
+            func.count().label("total_students"),
+            func.count().filter(self._passing_grade()).label("pass_count"),
+        ]
+        for grade in GradeEnum:
+            columns.append(
+                func.count().filter(Student.grade == grade).label(f"grade_{grade.value}")
+            )
+
+        # A subject is passing if score >= 50% of max (subjects with max <= 0 are skipped)
+        for subject in self.OVERVIEW_SUBJECTS:
+            applicable = getattr(ScoringScheme, f"{subject}_max") > 0
+            percentage = self._subject_percentage(subject)
+            columns.append(
+                func.count().filter(and_(applicable, percentage >= 50)).label(f"{subject}_pass")
+            )
+            columns.append(
+                func.count().filter(and_(applicable, percentage < 50)).label(f"{subject}_fail")
+            )
+
+        result = await self.db.execute(select(*columns).join_from(Student, ScoringScheme))
+        row = result.one()._mapping
+
+        total_students = row["total_students"]
+        pass_count = row["pass_count"]
+
+        return StudentStats(
+            total_students=total_students,
+            pass_count=pass_count,
+            fail_count=total_students - pass_count,
+            grade_distribution={grade.value: row[f"grade_{grade.value}"] for grade in GradeEnum},
+            subject_stats={
+                subject: {"pass": row[f"{subject}_pass"], "fail": row[f"{subject}_fail"]}
+                for subject in self.OVERVIEW_SUBJECTS
+            },
+        )
+
+    async def get_detailed_statistics(self, class_type: Optional[str] = None) -> dict:
+        """Get subject averages, score distributions and demographics in one query.
+
+        The reference max score of each subject (used for the score ranges) is
+        taken from the first applicable student, as an uncorrelated subquery that
+        PostgreSQL evaluates once.
+        """
+        scope = [Student.class_type == class_type] if class_type else []
+        subjects = self.DETAILED_SUBJECTS.get(class_type, self.DETAILED_SUBJECTS[None])
+        passing = self._passing_grade()
+
+        columns = [func.count().label("total_students")]
+
+        for subject in subjects:
+            score = getattr(Student, f"{subject}_score")
+            max_column = getattr(ScoringScheme, f"{subject}_max")
+            applicable = max_column > 0
+
+            reference_max = (
+                select(max_column)
+                .join_from(Student, ScoringScheme)
+                .where(applicable, *scope)
+                .order_by(Student.id)
+                .limit(1)
+                .correlate(None)
+                .scalar_subquery()
+            )
+            percentage = (score / func.nullif(reference_max, 0)) * 100
+
+            columns += [
+                func.count().filter(applicable).label(f"{subject}_count"),
+                func.sum(score).filter(applicable).label(f"{subject}_sum"),
+                func.max(score).filter(applicable).label(f"{subject}_highest"),
+                func.min(score).filter(applicable).label(f"{subject}_lowest"),
+                reference_max.label(f"{subject}_max_score"),
+            ]
+            for index, (_, lower, upper) in enumerate(self.SCORE_RANGES):
+                columns.append(
+                    func.count()
+                    .filter(and_(applicable, self._in_range(percentage, lower, upper)))
+                    .label(f"{subject}_range_{index}")
+                )
+
+        for gender in GenderEnum:
+            is_gender = Student.gender == gender
+            columns += [
+                func.count().filter(is_gender).label(f"{gender.value}_count"),
+                func.sum(Student.average_score).filter(is_gender).label(f"{gender.value}_average_sum"),
+                func.count().filter(and_(is_gender, passing)).label(f"{gender.value}_pass"),
+            ]
+
+        for tier, lower, upper in self.PERFORMANCE_TIERS:
+            columns.append(
+                func.count().filter(self._in_range(Student.average_score, lower, upper)).label(f"tier_{tier}")
+            )
+
+        for grade in GradeEnum:
+            columns.append(
+                func.count().filter(Student.grade == grade).label(f"grade_{grade.value}")
+            )
+
+        result = await self.db.execute(select(*columns).join_from(Student, ScoringScheme).where(*scope))
+        row = result.one()._mapping
+
+        total_students = row["total_students"]
+        if not total_students:
+            return {
+                "total_students": 0,
+                "subject_averages": {},
+                "score_distribution": {},
+                "gender_stats": {},
+                "performance_tiers": {}
+            }
+
+        subject_averages = {}
+        score_distribution = {}
+        for subject in subjects:
+            count = row[f"{subject}_count"]
+            if not count:
+                continue
+            subject_averages[subject] = {
+                "average": self._rounded(row[f"{subject}_sum"], count),
+                "highest": self._rounded(row[f"{subject}_highest"]),
+                "lowest": self._rounded(row[f"{subject}_lowest"]),
+                "total_students": count,
+                "max_score": row[f"{subject}_max_score"]
+            }
+            score_distribution[subject] = {
+                label: row[f"{subject}_range_{index}"]
+                for index, (label, _, _) in enumerate(self.SCORE_RANGES)
+            }
+
+        gender_stats = {}
+        for key, gender in (("male", GenderEnum.MALE), ("female", GenderEnum.FEMALE)):
+            count = row[f"{gender.value}_count"]
+            gender_stats[key] = {
+                "count": count,
+                "average": self._rounded(row[f"{gender.value}_average_sum"], count) if count else 0,
+                "pass": row[f"{gender.value}_pass"],
+            }
+
+        return {
+            "total_students": total_students,
+            "subject_averages": subject_averages,
+            "score_distribution": score_distribution,
+            "gender_stats": gender_stats,
+            "performance_tiers": {tier: row[f"tier_{tier}"] for tier, _, _ in self.PERFORMANCE_TIERS},
+            "grade_distribution": {grade.value: row[f"grade_{grade.value}"] for grade in GradeEnum}
+        }
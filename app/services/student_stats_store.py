@@ -0,0 +1,575 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, case, cast, delete, insert, update, literal, text, tuple_, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.student import Student, GradeEnum, GenderEnum
+from app.models.scoring_scheme import ScoringScheme
+from app.models.student_stats import StudentStat, StudentSubjectStat
+from app.schemas.student import StudentStats
+from app.services.student_stats_engine import StudentStatsEngine
+from app.services.student_builder import column_value
+from typing import Optional, List
+
+
+# Every subject that appears in the overview or detailed statistics
+SUBJECTS = StudentStatsEngine.DETAILED_SUBJECTS[None]
+
+# Score range columns, in the order of StudentStatsEngine.SCORE_RANGES
+RANGE_COLUMNS = ["range_0_24", "range_25_49", "range_50_74", "range_75_100"]
+
+# Compared columns that are NULL, rather than 0, for a missing row
+NULLABLE_COLUMNS = ("score_min", "score_max", "max_score", "first_student_id")
+
+STUDENT_COUNTERS = ["student_count", "average_score_sum", "average_count"] + [
+    f"tier_{tier}" for tier, _, _ in StudentStatsEngine.PERFORMANCE_TIERS
+]
+SUBJECT_COUNTERS = [
+    "student_count", "scored_count", "score_sum", "score_sumsq", "pass_count", "fail_count",
+] + RANGE_COLUMNS
+
+
+def _in_range(value: float, lower, upper) -> bool:
+    """Python counterpart of StudentStatsEngine._in_range."""
+    return (lower is None or value >= lower) and (upper is None or value < upper)
+
+
+class StatsDelta:
+    """Accumulates the changes a set of student writes makes to the summary tables."""
+
+    def __init__(self):
+        self.students = {}  # (class_type, gender, grade) -> {counter: delta}
+        self.subjects = {}  # (class_type, scoring_scheme_id, subject) -> {counter: delta}
+        self.max_scores = {}  # (class_type, scoring_scheme_id, subject) -> max score of the scheme
+        self.added = {}     # subject key -> [min, max] of added scores
+        self.removed = {}   # subject key -> [min, max] of removed scores
+        self.members = set()  # Subject keys that gained or lost students
+
+    @staticmethod
+    def snapshot(student) -> dict:
+        """Copy the values of a student that the summary tables depend on."""
+        return {
+            "class_type": column_value(student.class_type),
+            "gender": column_value(student.gender),
+            "grade": column_value(student.grade) or "",
+            "average_score": student.average_score,
+            "scoring_scheme_id": student.scoring_scheme_id,
+            "subjects": {
+                subject: (getattr(student, f"{subject}_score"), getattr(student, f"{subject}_max"))
+                for subject in SUBJECTS
+            },
+        }
+
+    def add(self, snapshot: dict, sign: int = 1, member: bool = True):
+        """Add (sign=1) or remove (sign=-1) a student snapshot.
+
+        ``member`` is False when the student stays in the same subject rows
+        (an update within the scheme): only the scores change.
+        """
+        class_type = snapshot["class_type"]
+        key = (class_type, snapshot["gender"], snapshot["grade"])
+        counters = self.students.setdefault(key, dict.fromkeys(STUDENT_COUNTERS, 0))
+        counters["student_count"] += sign
+
+        average = snapshot["average_score"]
+        if average is not None:
+            counters["average_score_sum"] += sign * average
+            counters["average_count"] += sign
+            for tier, lower, upper in StudentStatsEngine.PERFORMANCE_TIERS:
+                if _in_range(average, lower, upper):
+                    counters[f"tier_{tier}"] += sign
+                    break
+
+        for subject, (score, max_score) in snapshot["subjects"].items():
+            if not max_score or max_score <= 0:
+                continue
+            subject_key = (class_type, snapshot["scoring_scheme_id"], subject)
+            self.max_scores[subject_key] = max_score
+            counters = self.subjects.setdefault(subject_key, dict.fromkeys(SUBJECT_COUNTERS, 0))
+            if member:
+                counters["student_count"] += sign
+                self.members.add(subject_key)
+            if score is None:
+                continue
+            percentage = (score / max_score) * 100
+            counters["scored_count"] += sign
+            counters["score_sum"] += sign * score
+            counters["score_sumsq"] += sign * score * score
+            counters["pass_count" if percentage >= 50 else "fail_count"] += sign
+            for column, (_, lower, upper) in zip(RANGE_COLUMNS, StudentStatsEngine.SCORE_RANGES):
+                if _in_range(percentage, lower, upper):
+                    counters[column] += sign
+                    break
+
+            bounds = (self.added if sign > 0 else self.removed).setdefault(subject_key, [score, score])
+            bounds[0], bounds[1] = min(bounds[0], score), max(bounds[1], score)
+
+    def change(self, old: Optional[dict], new: Optional[dict]):
+        """Record a create (old=None), update, or delete (new=None)."""
+        member = True
+        if old is not None and new is not None:
+            same_rows = (old["class_type"], old["scoring_scheme_id"]) == (new["class_type"], new["scoring_scheme_id"])
+            if same_rows:
+                # Unchanged subjects cancel out and must not mark min/max as stale
+                member = False
+                old_subjects, new_subjects = dict(old["subjects"]), dict(new["subjects"])
+                for subject in SUBJECTS:
+                    if old_subjects[subject] == new_subjects[subject]:
+                        del old_subjects[subject], new_subjects[subject]
+                old, new = {**old, "subjects": old_subjects}, {**new, "subjects": new_subjects}
+        if old is not None:
+            self.add(old, -1, member)
+        if new is not None:
+            self.add(new, 1, member)
+
+
+class StudentStatsStore:
+    """Summary tables behind the statistics endpoints.
+
+    ``student_stats`` and ``student_subject_stats`` are updated incrementally in
+    the transaction of every student write, so reading statistics costs a few
+    dozen rows regardless of the number of students, and the results are the
+    ones StudentStatsEngine computes from the students table.
+
+    Subject rows are kept per class type and scoring scheme, so all students of
+    a row share one max score. Like the engine, a subject's score ranges and
+    reported ``max_score`` use the max score of the first student (by id) in
+    scope; rows with another max score are counted from the students table when
+    they are read. Removing a subject's lowest or highest score only marks the
+    row's min/max as stale: they are computed for stale rows when read and
+    stored again by ``refresh()`` (or ``rebuild()``).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, old: Optional[dict], new: Optional[dict]):
+        """Apply a single student write (see StatsDelta.change)."""
+        delta = StatsDelta()
+        delta.change(old, new)
+        await self.apply(delta)
+
+    async def apply(self, delta: StatsDelta):
+        """Apply accumulated deltas. Call after flushing the student changes."""
+        # Rows are upserted in key order so concurrent writers lock them in the same order
+        student_rows = [
+            {"class_type": class_type, "gender": gender, "grade": grade, **counters}
+            for (class_type, gender, grade), counters in sorted(delta.students.items())
+            if any(counters.values())
+        ]
+        if student_rows:
+            stmt = pg_insert(StudentStat).values(student_rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["class_type", "gender", "grade"],
+                set_={
+                    column: getattr(StudentStat, column) + stmt.excluded[column]
+                    for column in STUDENT_COUNTERS
+                },
+            )
+            await self.db.execute(stmt)
+
+        subject_rows = []
+        for key, counters in sorted(delta.subjects.items()):
+            added_min, added_max = delta.added.get(key, (None, None))
+            subject_rows.append({
+                "class_type": key[0],
+                "scoring_scheme_id": key[1],
+                "subject": key[2],
+                "max_score": delta.max_scores[key],
+                **counters,
+                "score_min": added_min,
+                "score_max": added_max,
+            })
+        if not subject_rows:
+            return
+        stmt = pg_insert(StudentSubjectStat).values(subject_rows)
+        set_ = {
+            column: getattr(StudentSubjectStat, column) + stmt.excluded[column]
+            for column in SUBJECT_COUNTERS
+        }
+        # LEAST/GREATEST ignore NULLs, so a row without added scores keeps its bounds
+        set_["score_min"] = func.least(StudentSubjectStat.score_min, stmt.excluded.score_min)
+        set_["score_max"] = func.greatest(StudentSubjectStat.score_max, stmt.excluded.score_max)
+        stmt = stmt.on_conflict_do_update(index_elements=["class_type", "scoring_scheme_id", "subject"], set_=set_)
+        await self.db.execute(stmt)
+
+        # The upsert locked every row of the delta, so the statements below read the
+        # students as left by every writer of those rows that committed before us
+        row_key = tuple_(StudentSubjectStat.class_type, StudentSubjectStat.scoring_scheme_id, StudentSubjectStat.subject)
+        if delta.members:
+            # One probe of ix_students_scoring_scheme_id_id per row
+            await self.db.execute(
+                update(StudentSubjectStat)
+                .where(row_key.in_(sorted(delta.members)))
+                .values(first_student_id=self._first_student_id())
+            )
+            # A row without students is not recomputed by rebuild(): drop it
+            await self.db.execute(
+                delete(StudentSubjectStat)
+                .where(row_key.in_(sorted(delta.members)), StudentSubjectStat.student_count == 0)
+            )
+        for key, (removed_min, removed_max) in sorted(delta.removed.items()):
+            # Removing the min or max cannot be undone incrementally: mark the row instead of
+            # scanning the students (an empty row has no min/max at all)
+            empty = StudentSubjectStat.scored_count == 0
+            await self.db.execute(
+                update(StudentSubjectStat)
+                .where(row_key == key)
+                .values(
+                    score_min=case((empty, None), else_=StudentSubjectStat.score_min),
+                    score_max=case((empty, None), else_=StudentSubjectStat.score_max),
+                    extremes_stale=case(
+                        (empty, False),
+                        ((StudentSubjectStat.score_min >= removed_min) | (StudentSubjectStat.score_max <= removed_max), True),
+                        else_=StudentSubjectStat.extremes_stale,
+                    ),
+                )
+            )
+
+    @staticmethod
+    def _first_student_id():
+        """Lowest id of the students of the current student_subject_stats row."""
+        return (
+            select(func.min(Student.id))
+            .where(
+                Student.scoring_scheme_id == StudentSubjectStat.scoring_scheme_id,
+                Student.class_type == StudentSubjectStat.class_type,
+            )
+            .scalar_subquery()
+        )
+
+    async def refresh(self):
+        """Store the exact min/max of the rows marked stale (reads only those rows' students)."""
+        for subject in SUBJECTS:
+            score = getattr(Student, f"{subject}_score")
+            # Lock first: the recompute then reads students after every writer of the rows committed
+            stale = (
+                await self.db.execute(
+                    select(StudentSubjectStat.class_type, StudentSubjectStat.scoring_scheme_id)
+                    .where(StudentSubjectStat.subject == subject, StudentSubjectStat.extremes_stale)
+                    .order_by(StudentSubjectStat.class_type, StudentSubjectStat.scoring_scheme_id)
+                    .with_for_update()
+                )
+            ).all()
+            if not stale:
+                continue
+            students = and_(
+                Student.scoring_scheme_id == StudentSubjectStat.scoring_scheme_id,
+                Student.class_type == StudentSubjectStat.class_type,
+            )
+            await self.db.execute(
+                update(StudentSubjectStat)
+                .where(StudentSubjectStat.subject == subject, StudentSubjectStat.extremes_stale)
+                .values(
+                    score_min=select(func.min(score)).where(students).scalar_subquery(),
+                    score_max=select(func.max(score)).where(students).scalar_subquery(),
+                    extremes_stale=False,
+                )
+            )
+
+    @staticmethod
+    def _subject_columns(subject: str):
+        """Score column, max column and applicability condition of a subject."""
+        score = getattr(Student, f"{subject}_score")
+        max_column = getattr(ScoringScheme, f"{subject}_max")
+        return score, max_column, max_column > 0
+
+    @staticmethod
+    def _student_rows_query():
+        """Recompute student_stats rows from the students table."""
+        columns = [
+            Student.class_type,
+            Student.gender,
+            func.coalesce(cast(Student.grade, String), "").label("grade"),
+            func.count().label("student_count"),
+            func.coalesce(func.sum(Student.average_score), 0.0).label("average_score_sum"),
+            func.count(Student.average_score).label("average_count"),
+        ]
+        for tier, lower, upper in StudentStatsEngine.PERFORMANCE_TIERS:
+            columns.append(
+                func.count()
+                .filter(StudentStatsEngine._in_range(Student.average_score, lower, upper))
+                .label(f"tier_{tier}")
+            )
+        return select(*columns).group_by(Student.class_type, Student.gender, "grade")
+
+    @classmethod
+    def _subject_rows_query(cls, subject: str):
+        """Recompute the student_subject_stats rows of one subject from the students table."""
+        score, max_column, applicable = cls._subject_columns(subject)
+        percentage = (score / max_column) * 100
+        columns = [
+            Student.class_type,
+            Student.scoring_scheme_id,
+            literal(subject).label("subject"),
+            max_column.label("max_score"),
+            func.count().label("student_count"),
+            func.count(score).label("scored_count"),
+            func.min(Student.id).label("first_student_id"),
+            func.coalesce(func.sum(score), 0.0).label("score_sum"),
+            func.coalesce(func.sum(score * score), 0.0).label("score_sumsq"),
+            func.min(score).label("score_min"),
+            func.max(score).label("score_max"),
+            literal(False).label("extremes_stale"),
+            func.count().filter(percentage >= 50).label("pass_count"),
+            func.count().filter(percentage < 50).label("fail_count"),
+        ]
+        for column, (_, lower, upper) in zip(RANGE_COLUMNS, StudentStatsEngine.SCORE_RANGES):
+            columns.append(
+                func.count().filter(StudentStatsEngine._in_range(percentage, lower, upper)).label(column)
+            )
+        return (
+            select(*columns)
+            .join_from(Student, ScoringScheme)
+            .where(applicable)
+            .group_by(Student.class_type, Student.scoring_scheme_id, max_column)
+        )
+
+    async def rebuild(self):
+        """Recompute both summary tables from scratch (blocks student writes meanwhile)."""
+        await self.db.execute(text("LOCK TABLE students IN SHARE MODE"))
+        await self.db.execute(delete(StudentStat))
+        await self.db.execute(delete(StudentSubjectStat))
+
+        student_query = self._student_rows_query()
+        await self.db.execute(
+            insert(StudentStat).from_select([c.name for c in student_query.selected_columns], student_query)
+        )
+        for subject in SUBJECTS:
+            subject_query = self._subject_rows_query(subject)
+            await self.db.execute(
+                insert(StudentSubjectStat).from_select(
+                    [c.name for c in subject_query.selected_columns], subject_query
+                )
+            )
+
+    async def check(self, tolerance: float = 1e-6) -> List[str]:
+        """Compare the summary tables with a recomputation and describe every difference.
+
+        The min/max of a row marked stale only have to bound the actual ones.
+        """
+        problems = []
+
+        expected = {
+            (column_value(row.class_type), column_value(row.gender), row.grade): row._mapping
+            for row in (await self.db.execute(self._student_rows_query())).all()
+        }
+        stored = {
+            (column_value(row.class_type), column_value(row.gender), row.grade): row
+            for row in (await self.db.execute(select(StudentStat))).scalars().all()
+        }
+        problems += self._compare("student_stats", expected, stored, STUDENT_COUNTERS, tolerance)
+
+        expected = {}
+        for subject in SUBJECTS:
+            for row in (await self.db.execute(self._subject_rows_query(subject))).all():
+                expected[(column_value(row.class_type), row.scoring_scheme_id, subject)] = row._mapping
+        stored = {
+            (column_value(row.class_type), row.scoring_scheme_id, row.subject): row
+            for row in (await self.db.execute(select(StudentSubjectStat))).scalars().all()
+        }
+        problems += self._compare(
+            "student_subject_stats", expected, stored,
+            SUBJECT_COUNTERS + ["max_score", "first_student_id"], tolerance,
+        )
+        fresh = {key: row for key, row in stored.items() if not row.extremes_stale}
+        problems += self._compare(
+            "student_subject_stats", {key: expected.get(key) for key in fresh}, fresh,
+            ["score_min", "score_max"], tolerance,
+        )
+        for key, row in stored.items():
+            want = expected.get(key)
+            if not row.extremes_stale or want is None or want["score_min"] is None:
+                continue
+            if row.score_min is None or row.score_min > want["score_min"]:
+                problems.append(f"student_subject_stats{key}.score_min: stale {row.score_min} above {want['score_min']}")
+            if row.score_max is None or row.score_max < want["score_max"]:
+                problems.append(f"student_subject_stats{key}.score_max: stale {row.score_max} below {want['score_max']}")
+        return problems
+
+    @staticmethod
+    def _compare(table: str, expected: dict, stored: dict, columns: List[str], tolerance: float) -> List[str]:
+        """Differences between expected row mappings and stored ORM rows (missing rows count as empty)."""
+        problems = []
+        for key in sorted(set(expected) | set(stored)):
+            want, have = expected.get(key), stored.get(key)
+            for column in columns:
+                empty = None if column in NULLABLE_COLUMNS else 0
+                wanted = want[column] if want is not None else empty
+                had = getattr(have, column) if have is not None else empty
+                if wanted is None or had is None:
+                    mismatch = wanted != had
+                else:
+                    mismatch = abs(wanted - had) > tolerance * max(1.0, abs(wanted))
+                if mismatch:
+                    problems.append(f"{table}{key}.{column}: expected {wanted}, stored {had}")
+        return problems
+
+    async def _student_stat_rows(self, class_type: Optional[str] = None) -> List[StudentStat]:
+        query = select(StudentStat)
+        if class_type:
+            query = query.where(StudentStat.class_type == class_type)
+        return list((await self.db.execute(query)).scalars().all())
+
+    async def _subject_stat_rows(self, class_type: Optional[str] = None) -> List[StudentSubjectStat]:
+        query = select(StudentSubjectStat)
+        if class_type:
+            query = query.where(StudentSubjectStat.class_type == class_type)
+        return list((await self.db.execute(query)).scalars().all())
+
+    @staticmethod
+    def _is_passing(grade: str) -> bool:
+        return grade != "" and grade != GradeEnum.F.value
+
+    async def get_statistics(self) -> StudentStats:
+        """Overview statistics read from the summary tables."""
+        student_rows = await self._student_stat_rows()
+        subject_rows = await self._subject_stat_rows()
+
+        grade_distribution = {grade.value: 0 for grade in GradeEnum}
+        total_students = pass_count = 0
+        for row in student_rows:
+            total_students += row.student_count
+            if row.grade:
+                grade_distribution[row.grade] += row.student_count
+            if self._is_passing(row.grade):
+                pass_count += row.student_count
+
+        subject_stats = {
+            subject: {"pass": 0, "fail": 0} for subject in StudentStatsEngine.OVERVIEW_SUBJECTS
+        }
+        for row in subject_rows:
+            if row.subject in subject_stats:
+                subject_stats[row.subject]["pass"] += row.pass_count
+                subject_stats[row.subject]["fail"] += row.fail_count
+
+        return StudentStats(
+            total_students=total_students,
+            pass_count=pass_count,
+            fail_count=total_students - pass_count,
+            grade_distribution=grade_distribution,
+            subject_stats=subject_stats,
+        )
+
+    async def _live_subject_values(self, rows: List[StudentSubjectStat], reference: dict) -> dict:
+        """Values of subject rows that the stored columns cannot give, from the students table.
+
+        Score ranges of rows whose max score is not the reference one, and
+        min/max of rows marked stale; one query per class type and scheme,
+        reading only the students of those rows.
+        """
+        groups = {}
+        for row in rows:
+            reference_max = reference[row.subject].max_score
+            score = getattr(Student, f"{row.subject}_score")
+            keys, columns = groups.setdefault((row.class_type, row.scoring_scheme_id), ([], []))
+            if row.max_score != reference_max:
+                percentage = (score / reference_max) * 100
+                for column, (_, lower, upper) in zip(RANGE_COLUMNS, StudentStatsEngine.SCORE_RANGES):
+                    keys.append((row.subject, column))
+                    columns.append(func.count().filter(StudentStatsEngine._in_range(percentage, lower, upper)))
+            if row.extremes_stale:
+                keys += [(row.subject, "score_min"), (row.subject, "score_max")]
+                columns += [func.min(score), func.max(score)]
+
+        values = {}
+        for (class_type, scoring_scheme_id), (keys, columns) in groups.items():
+            if not columns:
+                continue
+            result = await self.db.execute(
+                select(*columns).where(Student.class_type == class_type, Student.scoring_scheme_id == scoring_scheme_id)
+            )
+            for (subject, column), value in zip(keys, result.one()):
+                values.setdefault((class_type, scoring_scheme_id, subject), {})[column] = value
+        return values
+
+    async def get_detailed_statistics(self, class_type: Optional[str] = None) -> dict:
+        """Detailed statistics read from the summary tables (same values as the live ones)."""
+        student_rows = await self._student_stat_rows(class_type)
+        total_students = sum(row.student_count for row in student_rows)
+        if not total_students:
+            return {
+                "total_students": 0,
+                "subject_averages": {},
+                "score_distribution": {},
+                "gender_stats": {},
+                "performance_tiers": {}
+            }
+
+        subjects = StudentStatsEngine.DETAILED_SUBJECTS.get(class_type, SUBJECTS)
+        rows = [
+            row for row in await self._subject_stat_rows(class_type)
+            if row.subject in subjects and row.student_count
+        ]
+        # The engine's reference max score: that of the first student in scope
+        reference = {}
+        for row in rows:
+            current = reference.get(row.subject)
+            if current is None or row.first_student_id < current.first_student_id:
+                reference[row.subject] = row
+        live = await self._live_subject_values(
+            [row for row in rows if row.extremes_stale or row.max_score != reference[row.subject].max_score],
+            reference,
+        )
+
+        combined = {}
+        for row in rows:
+            values = live.get((row.class_type, row.scoring_scheme_id, row.subject), {})
+            totals = combined.setdefault(row.subject, {
+                "student_count": 0, "scored_count": 0, "score_sum": 0.0, "score_min": None, "score_max": None,
+                **dict.fromkeys(RANGE_COLUMNS, 0),
+            })
+            for column in ["student_count", "scored_count", "score_sum"] + RANGE_COLUMNS:
+                totals[column] += values.get(column, getattr(row, column))
+            for column, pick in (("score_min", min), ("score_max", max)):
+                value = values.get(column, getattr(row, column))
+                if value is not None:
+                    totals[column] = value if totals[column] is None else pick(totals[column], value)
+
+        subject_averages = {}
+        score_distribution = {}
+        for subject in subjects:
+            totals = combined.get(subject)
+            if totals is None:
+                continue
+            subject_averages[subject] = {
+                "average": StudentStatsEngine._rounded(
+                    totals["score_sum"] if totals["scored_count"] else None, totals["student_count"]
+                ),
+                "highest": StudentStatsEngine._rounded(totals["score_max"]),
+                "lowest": StudentStatsEngine._rounded(totals["score_min"]),
+                "total_students": totals["student_count"],
+                "max_score": reference[subject].max_score
+            }
+            score_distribution[subject] = {
+                label: totals[column]
+                for column, (label, _, _) in zip(RANGE_COLUMNS, StudentStatsEngine.SCORE_RANGES)
+            }
+
+        gender_stats = {}
+        for key, gender in (("male", GenderEnum.MALE), ("female", GenderEnum.FEMALE)):
+            rows = [row for row in student_rows if column_value(row.gender) == gender.value]
+            count = sum(row.student_count for row in rows)
+            average_sum = sum(row.average_score_sum for row in rows)
+            gender_stats[key] = {
+                "count": count,
+                "average": StudentStatsEngine._rounded(
+                    average_sum if sum(row.average_count for row in rows) else None, count
+                ) if count else 0,
+                "pass": sum(row.student_count for row in rows if self._is_passing(row.grade)),
+            }
+
+        grade_distribution = {grade.value: 0 for grade in GradeEnum}
+        for row in student_rows:
+            if row.grade:
+                grade_distribution[row.grade] += row.student_count
+
+        return {
+            "total_students": total_students,
+            "subject_averages": subject_averages,
+            "score_distribution": score_distribution,
+            "gender_stats": gender_stats,
+            "performance_tiers": {
+                tier: sum(getattr(row, f"tier_{tier}") for row in student_rows)
+                for tier, _, _ in StudentStatsEngine.PERFORMANCE_TIERS
+            },
+            "grade_distribution": grade_distribution
+        }
@@ -0,0 +1,239 @@
+"""
+Load test: throughput and latency of the student API on a synthetic cohort.
+
+Seeds a dedicated database with N students (realistic score distributions,
+written with COPY by generate_students.py), then
+runs the FastAPI app in-process and sends each scenario's requests with a
+number of concurrent clients. Results (requests/s, p50/p90/p99 latency) are
+printed and written as JSON so runs can be compared between commits.
+
+The benchmark database is emptied and reseeded, never point it at real data.
+Needs the migrations applied to it, the psycopg driver and httpx (pip install httpx).
+
+Usage:
+    export BENCHMARK_DATABASE_URL=postgresql://postgres@localhost/students_bench
+    DATABASE_URL=$BENCHMARK_DATABASE_URL alembic upgrade head
+    python benchmarks/api.py --students 100k --output bench-$(git rev-parse --short HEAD).json
+    python benchmarks/api.py --students 100k --reuse --compare bench-abc1234.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.environ.get("BENCHMARK_DATABASE_URL"):
+    sys.exit("Set BENCHMARK_DATABASE_URL to a database that may be emptied (see the module docstring)")
+# Settings are read at import time: point the app at the benchmark database first
+os.environ["DATABASE_URL"] = os.environ["BENCHMARK_DATABASE_URL"]
+os.environ.setdefault("QUERY_LOG_LEVEL", "ERROR")
+
+import httpx
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.student import Student
+from app.services.scoring_scheme_service import ScoringSchemeService
+from generate_students import CLASS_SUBJECTS, DEFAULT_GRADE_MIX, GRADE_LEVELS, generate, parse_count
+from seed_realistic_students import (
+    FIRST_NAMES_FEMALE,
+    FIRST_NAMES_MALE,
+    LAST_NAMES,
+    generate_foreign_language_score,
+    generate_realistic_score,
+)
+
+API = settings.API_V1_STR
+PAGE_SIZE = 20
+
+
+async def subject_maxima() -> dict:
+    """Max score of each subject a class type takes, from its current scoring scheme."""
+    async with AsyncSessionLocal() as db:
+        schemes = ScoringSchemeService(db)
+        maxima = {}
+        for class_type, subjects in CLASS_SUBJECTS.items():
+            scheme = await schemes.current_scheme(class_type)
+            maxima[class_type.value] = {f"{subject}_score": getattr(scheme, f"{subject}_max") for subject in subjects}
+        return maxima
+
+
+def cohort_record(maxima: dict) -> dict:
+    """One student of the synthetic cohort, as accepted by POST /students."""
+    class_type = random.choice(list(maxima))
+    grade_level = random.choices(GRADE_LEVELS, DEFAULT_GRADE_MIX)[0]
+    gender = random.choice(["M", "F"])
+    record = {
+        "first_name": random.choice(FIRST_NAMES_MALE if gender == "M" else FIRST_NAMES_FEMALE),
+        "last_name": random.choice(LAST_NAMES),
+        "gender": gender,
+        "class_type": class_type,
+        "foreign_language_score": generate_foreign_language_score(grade_level),
+    }
+    for subject, max_score in maxima[class_type].items():
+        record[subject] = generate_realistic_score(max_score, grade_level)
+    return record
+
+
+async def seed(count: int, reuse: bool, seed: int) -> int:
+    """Empty the benchmark database and generate `count` students (unless reusing an equal cohort)."""
+    async with AsyncSessionLocal() as db:
+        existing = (await db.execute(select(func.count()).select_from(Student))).scalar()
+    if reuse and existing >= count:
+        print(f"✓ Reusing {existing} existing students")
+        return existing
+
+    print(f"🌱 Replacing {existing} students with a generated cohort of {count}...")
+    start = time.perf_counter()
+    written = await generate(count, seed=seed, truncate=True, progress=False)
+    print(f"✓ Generated {written} students in {time.perf_counter() - start:.1f}s")
+    return written
+
+
+def scenarios(total: int, maxima: dict) -> list:
+    """(name, method, path factory, body factory, max requests) of every scenario."""
+    last_page = max(total // PAGE_SIZE, 1)
+
+    def student_id():
+        return random.randint(1, total)
+
+    return [
+        ("list_first_page", "GET", lambda: f"{API}/students?page=1&page_size={PAGE_SIZE}", None, None),
+        ("list_deep_page", "GET", lambda: f"{API}/students?page={last_page - random.randint(0, 10)}&page_size={PAGE_SIZE}", None, None),
+        ("list_search_sorted", "GET", lambda: f"{API}/students?search={random.choice(LAST_NAMES)}&sort_by=total_score&sort_order=desc&page_size={PAGE_SIZE}", None, None),
+        ("list_filtered_sorted", "GET", lambda: f"{API}/students?grade=A&class_type=science&sort_by=average_score&page_size={PAGE_SIZE}", None, None),
+        ("get_student", "GET", lambda: f"{API}/students/{student_id()}", None, None),
+        ("stats_overview", "GET", lambda: f"{API}/students/stats/overview", None, None),
+        ("stats_detailed", "GET", lambda: f"{API}/students/stats/detailed", None, None),
+        ("stats_detailed_science", "GET", lambda: f"{API}/students/stats/detailed?class_type=science", None, None),
+        # The whole table per request: a few requests are enough
+        ("list_all", "GET", lambda: f"{API}/students/all", None, 5),
+        ("create_student", "POST", lambda: f"{API}/students", lambda: cohort_record(maxima), None),
+        ("update_student", "PUT", lambda: f"{API}/students/{student_id()}", lambda: {"math_score": round(random.uniform(0, 75), 2)}, None),
+    ]
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1)))]
+
+
+async def run_scenario(client, name, method, path, body, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.request(method, path(), json=body() if body else None)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    await client.request(method, path(), json=body() if body else None)  # warm up
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p90_ms": ms(percentile(latencies, 0.90)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1]),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path} (negative latency change is better):")
+    for result in results:
+        before = baseline.get(result["scenario"])
+        if before is None:
+            continue
+        change = lambda key: (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        print(
+            f"  {result['scenario']:24s} rps {change('throughput_rps'):+7.1f}%"
+            f"   p50 {change('p50_ms'):+7.1f}%   p99 {change('p99_ms'):+7.1f}%"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the student API")
+    parser.add_argument("--students", default="10k", help="Cohort size, e.g. 10k, 100k, 1m")
+    parser.add_argument("--reuse", action="store_true", help="Keep the existing cohort if it is large enough")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients")
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios (repeatable)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the cohort and requests")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Print the change against an earlier results file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    total = await seed(parse_count(args.students), args.reuse, args.seed)
+    maxima = await subject_maxima()
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            print(f"\n🚀 {args.requests} requests per scenario, {args.concurrency} concurrent clients")
+            for name, method, path, body, max_requests in scenarios(total, maxima):
+                if args.scenario and name not in args.scenario:
+                    continue
+                requests = min(args.requests, max_requests or args.requests)
+                result = await run_scenario(client, name, method, path, body, requests, args.concurrency)
+                results.append(result)
+                print(
+                    f"  {name:24s} {result['throughput_rps']:9.1f} req/s   p50 {result['p50_ms']:9.2f} ms"
+                    f"   p99 {result['p99_ms']:9.2f} ms   errors {result['errors']}"
+                )
+    await engine.dispose()
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "students": total,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache_enabled": settings.CACHE_ENABLED,
+            "stats_materialized": settings.STATS_MATERIALIZED,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
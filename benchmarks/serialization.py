@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: per-row cost of serializing a page of students.
+
+Compares the default path (ORM objects validated through StudentRead by the
+route's response_model, then encoded by FastAPI) with the fast path (rows
+read as dicts, encoded by orjson via FastJSONResponse). No database needed.
+
+Usage:
+    python benchmarks/serialization.py [--rows 100] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/benchmark")
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.api.v1.responses import FastJSONResponse
+from app.models.student import Student, GenderEnum, ClassTypeEnum, GradeEnum
+from app.models.scoring_scheme import ScoringScheme
+from app.schemas.student import StudentRead
+from app.services.student_service import STUDENT_READ_COLUMN_MAP
+
+
+def make_students(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    scheme = ScoringScheme(
+        id=2, class_type=ClassTypeEnum.SCIENCE, exam_year=now.year,
+        khmer_max=75.0, math_max=125.0, history_max=50.0, geography_max=75.0, ethics_max=75.0,
+        earth_science_max=50.0, chemistry_max=75.0, physics_max=75.0, biology_max=75.0,
+        physical_education_max=75.0, foreign_language_max=50.0,
+    )
+    students = []
+    for i in range(count):
+        students.append(Student(
+            id=i + 1, first_name=f"First{i}", last_name=f"Last{i}",
+            gender=GenderEnum.MALE if i % 2 else GenderEnum.FEMALE,
+            class_type=ClassTypeEnum.SCIENCE, foreign_language_score=31.5,
+            khmer_score=60.25, math_score=101.5, history_score=40.0, geography_score=0.0,
+            ethics_score=0.0, earth_science_score=35.5, chemistry_score=55.0, physics_score=61.75,
+            biology_score=49.0, physical_education_score=0.0,
+            scoring_scheme_id=scheme.id, scoring_scheme=scheme,
+            total_score=434.0, average_score=91.37, grade=GradeEnum.A,
+            created_at=now, updated_at=now,
+        ))
+    return students
+
+
+def per_row_us(fn, rows: int, repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / (repeat * rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark student list serialization")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=200, help="Responses per measurement")
+    args = parser.parse_args()
+
+    students = make_students(args.rows)
+    rows = [{name: getattr(student, name) for name in STUDENT_READ_COLUMN_MAP} for student in students]
+    adapter = TypeAdapter(list[StudentRead])
+
+    def default_path():
+        # What FastAPI does for response_model=List[StudentRead]: validate, dump, json.dumps
+        validated = adapter.validate_python(students, from_attributes=True)
+        JSONResponse(adapter.dump_python(validated, mode="json"))
+
+    def typeadapter_path():
+        adapter.dump_json(adapter.validate_python(students, from_attributes=True))
+
+    def fast_path():
+        FastJSONResponse(rows)
+
+    assert FastJSONResponse(rows).body == adapter.dump_json(adapter.validate_python(students, from_attributes=True))
+
+    print(f"Serializing {args.rows} students x {args.repeat}")
+    results = [
+        ("response_model (default)", per_row_us(default_path, args.rows, args.repeat)),
+        ("TypeAdapter.dump_json", per_row_us(typeadapter_path, args.rows, args.repeat)),
+        ("rows + orjson (FastJSONResponse)", per_row_us(fast_path, args.rows, args.repeat)),
+    ]
+    baseline = results[0][1]
+    for name, cost in results:
+        print(f"  {name:36s} {cost:8.2f} µs/row  ({baseline / cost:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
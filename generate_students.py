@@ -0,0 +1,255 @@
+"""
+Generate a large synthetic cohort of students for benchmarking and capacity planning.
+
+Scores follow the same bands as seed_realistic_students.py (a grade level per
+student, each subject drawn within that level's percentage range of the
+subject's max score), but whole batches are drawn with NumPy, graded with
+GradeCalculator.calculate_batch and written with one COPY per batch. The COPY
+text is rendered by the Arrow CSV writer when pyarrow is installed (row by row
+in Python otherwise, about 4x slower). The statistics summary tables are
+rebuilt at the end.
+
+Every COPY also maintains the secondary indexes of the students table (about
+ten, including the trigram name index where pg_trgm is installed); that index
+maintenance, not the payload, dominates large loads. The table_versions
+trigger fires once per COPY statement and costs nothing per row. For large
+loads, --drop-indexes drops the secondary indexes first and rebuilds each one
+in a single pass at the end (student writes are not indexed meanwhile, so use
+it on a database nobody else is using).
+
+Run:
+    python generate_students.py --count 1m --seed 42
+    python generate_students.py --count 200k --science-share 0.3 --grade-mix 10,30,30,20,10 --truncate
+    python generate_students.py --count 5m --truncate --drop-indexes
+"""
+import argparse
+import asyncio
+import io
+import sys
+import time
+import numpy as np
+from sqlalchemy import text
+from app.db.session import AsyncSessionLocal
+from app.models.student import ClassTypeEnum
+from app.services.grade_calculator import GradeCalculator
+from app.services.scoring_scheme_service import ScoringSchemeService
+from app.services.student_stats_store import StudentStatsStore
+from seed_realistic_students import FIRST_NAMES_MALE, FIRST_NAMES_FEMALE, LAST_NAMES
+
+# Grade levels with the default share of students and their percentage range of max score
+GRADE_LEVELS = ["excellent", "good", "average", "below_average", "poor"]
+DEFAULT_GRADE_MIX = [5, 25, 35, 20, 15]
+LEVEL_RANGES = np.array([[0.85, 0.95], [0.70, 0.84], [0.55, 0.69], [0.40, 0.54], [0.20, 0.39]])
+SCORE_VARIATION = 0.03
+
+# Foreign language (max 50) is optional: 30% don't take it, the others score within their level's range
+FOREIGN_LANGUAGE_SKIP = 0.3
+FOREIGN_LANGUAGE_RANGES = np.array([[38, 48], [28, 37], [20, 27], [10, 19], [10, 19]], dtype=np.float64)
+
+# Subjects taken per class type (the others are stored as 0.0)
+CLASS_SUBJECTS = {
+    ClassTypeEnum.SOCIAL_SCIENCE: ["khmer", "math", "history", "geography", "ethics", "earth_science"],
+    ClassTypeEnum.SCIENCE: ["math", "chemistry", "physics", "biology", "physical_education", "earth_science"],
+}
+SCORE_COLUMNS = [
+    "khmer_score", "math_score", "history_score", "geography_score", "ethics_score",
+    "earth_science_score", "chemistry_score", "physics_score", "biology_score",
+    "physical_education_score", "foreign_language_score",
+]
+COPY_COLUMNS = [
+    "first_name", "last_name", "gender", "class_type", *SCORE_COLUMNS,
+    "scoring_scheme_id", "total_score", "average_score", "grade",
+]
+
+
+def parse_count(value: str) -> int:
+    """10000, 10k, 1m ..."""
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def parse_grade_mix(value: str) -> np.ndarray:
+    weights = np.array([float(part) for part in value.split(",")])
+    if len(weights) != len(GRADE_LEVELS) or (weights < 0).any() or weights.sum() <= 0:
+        raise argparse.ArgumentTypeError(f"expected {len(GRADE_LEVELS)} non-negative weights for {', '.join(GRADE_LEVELS)}")
+    return weights / weights.sum()
+
+
+def generate_batch(rng: np.random.Generator, size: int, science_share: float, grade_mix: np.ndarray, schemes: dict) -> dict:
+    """Draw `size` graded students as NumPy columns."""
+    is_science = rng.random(size) < science_share
+    level = rng.choice(len(GRADE_LEVELS), size=size, p=grade_mix)
+    low, high = LEVEL_RANGES[level, 0], LEVEL_RANGES[level, 1]
+
+    columns = {}
+    for class_type, subjects in CLASS_SUBJECTS.items():
+        rows = is_science if class_type == ClassTypeEnum.SCIENCE else ~is_science
+        scheme = schemes[class_type]
+        for subject in subjects:
+            percentage = rng.uniform(low, high) + rng.uniform(-SCORE_VARIATION, SCORE_VARIATION, size)
+            score = np.round(getattr(scheme, f"{subject}_max") * np.clip(percentage, 0.0, 1.0), 2)
+            column = columns.setdefault(f"{subject}_score", np.zeros(size))
+            column[rows] = score[rows]
+
+    takes_foreign_language = rng.random(size) >= FOREIGN_LANGUAGE_SKIP
+    foreign_language = np.round(rng.uniform(FOREIGN_LANGUAGE_RANGES[level, 0], FOREIGN_LANGUAGE_RANGES[level, 1]), 2)
+    columns["foreign_language_score"] = np.where(takes_foreign_language, foreign_language, 0.0)
+    for name in SCORE_COLUMNS:
+        columns.setdefault(name, np.zeros(size))
+
+    is_male = rng.random(size) < 0.5
+    male_names = np.array(FIRST_NAMES_MALE)[rng.integers(len(FIRST_NAMES_MALE), size=size)]
+    female_names = np.array(FIRST_NAMES_FEMALE)[rng.integers(len(FIRST_NAMES_FEMALE), size=size)]
+    columns["first_name"] = np.where(is_male, male_names, female_names)
+    columns["last_name"] = np.array(LAST_NAMES)[rng.integers(len(LAST_NAMES), size=size)]
+    columns["gender"] = np.where(is_male, "M", "F")
+    columns["class_type"] = np.where(is_science, ClassTypeEnum.SCIENCE.value, ClassTypeEnum.SOCIAL_SCIENCE.value)
+    columns["scoring_scheme_id"] = np.where(
+        is_science, schemes[ClassTypeEnum.SCIENCE].id, schemes[ClassTypeEnum.SOCIAL_SCIENCE].id
+    )
+
+    columns.update(GradeCalculator.calculate_batch(columns["class_type"], columns))
+    return columns
+
+
+def copy_text(columns: dict) -> bytes:
+    """Tab-separated COPY text of a batch (names are fixed lists without tabs or backslashes).
+
+    Floats are written in their shortest round-trip form either way, so the
+    stored values do not depend on the writer.
+    """
+    try:
+        import pyarrow
+        import pyarrow.csv
+    except ImportError:
+        buffer = io.StringIO()
+        for row in zip(*(columns[name].astype(str) for name in COPY_COLUMNS)):
+            buffer.write("\t".join(row))
+            buffer.write("\n")
+        return buffer.getvalue().encode()
+    buffer = io.BytesIO()
+    pyarrow.csv.write_csv(
+        pyarrow.table({name: columns[name] for name in COPY_COLUMNS}),
+        buffer,
+        pyarrow.csv.WriteOptions(include_header=False, delimiter="\t", quoting_style="none"),
+    )
+    return buffer.getvalue()
+
+
+async def drop_secondary_indexes(db) -> list:
+    """Drop the non-unique indexes of the students table and return their definitions."""
+    result = await db.execute(text("""
+        SELECT index_class.relname, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i JOIN pg_class index_class ON index_class.oid = i.indexrelid
+        WHERE i.indrelid = 'students'::regclass AND NOT i.indisunique
+        ORDER BY index_class.relname
+    """))
+    indexes = result.all()
+    for name, _ in indexes:
+        await db.execute(text(f'DROP INDEX "{name}"'))
+    await db.commit()
+    return [definition for _, definition in indexes]
+
+
+async def generate(
+    count: int,
+    science_share: float = 0.5,
+    grade_mix: np.ndarray = None,
+    seed: int = None,
+    batch_size: int = 50_000,
+    truncate: bool = False,
+    progress: bool = True,
+    drop_indexes: bool = False,
+) -> int:
+    """Insert `count` generated students and rebuild the statistics tables.
+
+    With ``drop_indexes`` the secondary indexes are dropped for the load and
+    recreated afterwards, even if the load fails.
+    """
+    rng = np.random.default_rng(seed)
+    if grade_mix is None:
+        grade_mix = np.array(DEFAULT_GRADE_MIX) / sum(DEFAULT_GRADE_MIX)
+
+    async with AsyncSessionLocal() as db:
+        if db.get_bind().dialect.driver != "psycopg":
+            sys.exit("❌ The generator writes with COPY and needs the psycopg driver (DB_DRIVER=psycopg)")
+        schemes = ScoringSchemeService(db)
+        current = {class_type: await schemes.current_scheme(class_type) for class_type in CLASS_SUBJECTS}
+
+        if truncate:
+            await db.execute(text("TRUNCATE students RESTART IDENTITY"))
+            await db.commit()
+            if progress:
+                print("🧹 Emptied the students table")
+
+        dropped = await drop_secondary_indexes(db) if drop_indexes else []
+        if progress and dropped:
+            print(f"🗑  Dropped {len(dropped)} secondary indexes for the load")
+
+        start = time.perf_counter()
+        written = 0
+        try:
+            while written < count:
+                size = min(batch_size, count - written)
+                block = copy_text(generate_batch(rng, size, science_share, grade_mix, current))
+                # Each commit returns the connection to the pool, so take it again per batch
+                conn = await db.connection()
+                raw = await conn.get_raw_connection()
+                async with raw.driver_connection.cursor() as cursor:
+                    async with cursor.copy(f"COPY students ({', '.join(COPY_COLUMNS)}) FROM STDIN") as copy:
+                        await copy.write(block)
+                await db.commit()
+                written += size
+                if progress:
+                    elapsed = time.perf_counter() - start
+                    print(f"  {written}/{count} students ({written / elapsed:,.0f} rows/s)", flush=True)
+        finally:
+            if dropped:
+                await db.rollback()
+                if progress:
+                    print(f"🔧 Recreating {len(dropped)} indexes...")
+                for definition in dropped:
+                    await db.execute(text(definition))
+                await db.commit()
+
+        if progress:
+            print("📊 Rebuilding statistics tables...")
+        await StudentStatsStore(db).rebuild()
+        await db.execute(text("ANALYZE students"))
+        await db.commit()
+    return written
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic student cohort")
+    parser.add_argument("--count", type=parse_count, default=parse_count("100k"), help="Students to add, e.g. 100000, 100k, 1m")
+    parser.add_argument("--science-share", type=float, default=0.5, help="Share of Science students (0-1)")
+    parser.add_argument(
+        "--grade-mix", type=parse_grade_mix, default=None,
+        help=f"Weights of {', '.join(GRADE_LEVELS)} (default {','.join(map(str, DEFAULT_GRADE_MIX))})",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed, for a reproducible cohort")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Students per COPY/commit")
+    parser.add_argument("--truncate", action="store_true", help="Delete all existing students first")
+    parser.add_argument(
+        "--drop-indexes", action="store_true",
+        help="Drop the secondary indexes during the load and recreate them at the end (large loads)",
+    )
+    args = parser.parse_args()
+
+    if not 0.0 <= args.science_share <= 1.0:
+        parser.error("--science-share must be between 0 and 1")
+
+    print(f"🎲 Generating {args.count} students...")
+    start = time.perf_counter()
+    written = await generate(
+        args.count, args.science_share, args.grade_mix, args.seed, args.batch_size, args.truncate,
+        drop_indexes=args.drop_indexes,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"✅ {written} students written in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s overall)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
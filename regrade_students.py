@@ -0,0 +1,39 @@
+"""
+Script to recompute total_score, average_score and grade for all students
+after grading rules change (max scores, grade thresholds, bonus rules).
+Run:
+  python regrade_students.py [--chunk-size N] [--start-after ID] [--reset-max-scores]
+
+Progress is printed after every chunk. If the run is interrupted, restart it
+with --start-after set to the last reported id.
+"""
+import argparse
+import asyncio
+from app.db.session import AsyncSessionLocal
+from app.services.student_regrade import StudentRegrader
+
+
+async def main(chunk_size: int, start_after: int, reset_max_scores: bool):
+    """Regrade every student in chunks and rebuild the statistics tables."""
+    async with AsyncSessionLocal() as db:
+        regrader = StudentRegrader(db)
+        total = await regrader.count_remaining(start_after)
+        print(f"🔄 Regrading {total} students (chunks of {chunk_size}, after id {start_after})...")
+
+        async for processed, changed, last_id in regrader.run(chunk_size, start_after, reset_max_scores):
+            percent = processed / total * 100 if total else 100.0
+            print(f"  {processed}/{total} ({percent:.1f}%) - {changed} changed - last id {last_id}")
+
+    print("✓ Regrade complete, statistics tables rebuilt")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute grades for all students.")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Students per UPDATE/commit")
+    parser.add_argument("--start-after", type=int, default=0, help="Resume after this student id")
+    parser.add_argument(
+        "--reset-max-scores", action="store_true",
+        help="Also move students whose scoring scheme is for another class type to their class type's current scheme",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size, args.start_after, args.reset_max_scores))
@@ -7,6 +7,8 @@ import asyncio
 from app.db.session import AsyncSessionLocal
 from app.models.student import Student, GenderEnum, ClassTypeEnum
 from app.services.grade_calculator import GradeCalculator
+from app.services.scoring_scheme_service import ScoringSchemeService
+from app.services.student_stats_store import StudentStatsStore
 from sqlalchemy import select, delete
 
 # Sample Khmer names
@@ -86,6 +88,7 @@ async def create_social_science_students():
     
     async with AsyncSessionLocal() as db:
         print("\n📚 Creating Social Science students...")
+        scheme = await ScoringSchemeService(db).current_scheme(ClassTypeEnum.SOCIAL_SCIENCE)
         
         # Define grade distribution (realistic distribution)
         grade_distribution = [
@@ -135,14 +138,8 @@ async def create_social_science_students():
                 ethics_score=ethics_score,
                 earth_science_score=earth_science_score,
                 foreign_language_score=foreign_language_score,
-                # Set max scores for Social Science
-                khmer_max=125.0,
-                math_max=75.0,
-                history_max=75.0,
-                geography_max=75.0,
-                ethics_max=75.0,
-                earth_science_max=50.0,
-                foreign_language_max=50.0,
+                # Max scores come from the Social Science scoring scheme
+                scoring_scheme=scheme,
             )
             
             # Calculate grades
@@ -160,6 +157,7 @@ async def create_science_students():
     
     async with AsyncSessionLocal() as db:
         print("\n🔬 Creating Science students...")
+        scheme = await ScoringSchemeService(db).current_scheme(ClassTypeEnum.SCIENCE)
         
         # Define grade distribution (realistic distribution)
         grade_distribution = [
@@ -209,14 +207,8 @@ async def create_science_students():
                 physical_education_score=physical_education_score,
                 earth_science_score=earth_science_score,
                 foreign_language_score=foreign_language_score,
-                # Set max scores for Science
-                math_max=125.0,
-                chemistry_max=75.0,
-                physics_max=75.0,
-                biology_max=75.0,
-                physical_education_max=75.0,
-                earth_science_max=50.0,
-                foreign_language_max=50.0,
+                # Max scores come from the Science scoring scheme
+                scoring_scheme=scheme,
             )
             
             # Calculate grades
@@ -228,6 +220,13 @@ async def create_science_students():
         await db.commit()
         print("✓ Successfully created 20 Science students!")
 
+async def rebuild_statistics():
+    """Recompute the statistics summary tables (the seed bypasses the service layer)."""
+    async with AsyncSessionLocal() as db:
+        await StudentStatsStore(db).rebuild()
+        await db.commit()
+        print("✓ Rebuilt the statistics summary tables")
+
 async def main():
     """Main function to clear and reseed database."""
     print("=" * 60)
@@ -240,6 +239,7 @@ async def main():
     # Create new students
     await create_social_science_students()
     await create_science_students()
+    await rebuild_statistics()
     
     print("\n" + "=" * 60)
     print("✅ DATABASE SEEDING COMPLETE!")
@@ -5,8 +5,10 @@ Run this script to populate the database with example data.
 import asyncio
 import random
 from app.db.session import AsyncSessionLocal
-from app.models.student import Student, GenderEnum
+from app.models.student import Student, GenderEnum, ClassTypeEnum
 from app.services.grade_calculator import GradeCalculator
+from app.services.scoring_scheme_service import ScoringSchemeService
+from app.services.student_stats_store import StudentStatsStore
 
 # Sample Khmer names
 FIRST_NAMES = [
@@ -25,16 +27,18 @@ async def create_sample_students():
     """Create 20 sample students with random scores."""
     async with AsyncSessionLocal() as db:
         # Check if students already exist
-        from sqlalchemy import select
-        result = await db.execute(select(Student))
-        existing = result.scalars().all()
+        from sqlalchemy import func, select
+        existing = (await db.execute(select(func.count()).select_from(Student))).scalar()
         
-        if len(existing) >= 20:
-            print(f"✓ Database already has {len(existing)} students. Skipping seed.")
+        if existing >= 20:
+            print(f"✓ Database already has {existing} students. Skipping seed.")
             return
         
         print("Creating 20 sample students...")
         
+        # Students default to Social Science; max scores come from its scoring scheme
+        scheme = await ScoringSchemeService(db).current_scheme(ClassTypeEnum.SOCIAL_SCIENCE)
+        
         students_created = 0
         for i in range(20):
             # Random gender
@@ -93,12 +97,7 @@ async def create_sample_students():
                 geography_score=round(geography_score, 2),
                 ethics_score=round(ethics_score, 2),
                 earth_science_score=round(earth_science_score, 2),
-                khmer_max=125.0,
-                math_max=75.0,
-                history_max=75.0,
-                geography_max=75.0,
-                ethics_max=75.0,
-                earth_science_max=50.0,
+                scoring_scheme=scheme,
             )
             
             # Calculate grades
@@ -108,6 +107,9 @@ async def create_sample_students():
             students_created += 1
             print(f"  Created student {i+1}/20: {first_name} {last_name} - Grade: {student.grade.value if student.grade else 'N/A'}")
         
+        # Students are added directly, bring the statistics summary tables up to date
+        await db.flush()
+        await StudentStatsStore(db).rebuild()
         await db.commit()
         print(f"\n✓ Successfully created {students_created} students!")
         print("✓ All grades have been automatically calculated.")
@@ -0,0 +1,54 @@
+"""
+Maintenance commands for the statistics summary tables (student_stats, student_subject_stats).
+Run:
+  python stats_maintenance.py check    # Compare the summary tables with the students table
+  python stats_maintenance.py rebuild  # Recompute the summary tables from scratch
+  python stats_maintenance.py refresh  # Recompute the subject min/max scores marked stale
+"""
+import asyncio
+import sys
+from app.db.session import AsyncSessionLocal
+from app.services.student_stats_store import StudentStatsStore
+
+
+async def rebuild():
+    """Recompute the summary tables from the students table."""
+    async with AsyncSessionLocal() as db:
+        await StudentStatsStore(db).rebuild()
+        await db.commit()
+    print("✓ Statistics summary tables rebuilt")
+
+
+async def refresh():
+    """Store the exact min/max scores of the subject rows marked stale."""
+    async with AsyncSessionLocal() as db:
+        await StudentStatsStore(db).refresh()
+        await db.commit()
+    print("✓ Stale subject min/max scores refreshed")
+
+
+async def check() -> bool:
+    """Report every difference between the summary tables and a recomputation."""
+    async with AsyncSessionLocal() as db:
+        problems = await StudentStatsStore(db).check()
+    if not problems:
+        print("✓ Statistics summary tables are consistent")
+        return True
+    print(f"⚠ Found {len(problems)} inconsistencies:")
+    for problem in problems:
+        print(f"  - {problem}")
+    print("ℹ Fix with: python stats_maintenance.py rebuild")
+    return False
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "rebuild":
+        asyncio.run(rebuild())
+    elif command == "refresh":
+        asyncio.run(refresh())
+    elif command == "check":
+        sys.exit(0 if asyncio.run(check()) else 1)
+    else:
+        print("Usage: python stats_maintenance.py [check|rebuild|refresh]")
+        sys.exit(1)
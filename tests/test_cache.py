@@ -0,0 +1,142 @@
+"""Student cache backends: read-through, generation invalidation and the compute lock."""
+import asyncio
+
+import pytest
+
+from app.services.cache import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+
+pytestmark = pytest.mark.anyio
+
+PARAMS = ("students", 1, ("science", "A"))
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def cache(request):
+    if request.param == "memory":
+        yield MemoryCacheBackend(ttl_seconds=60.0)
+        return
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = RedisCacheBackend(fakeredis.FakeAsyncRedis(), ttl_seconds=60.0, lock_timeout=5.0)
+    yield backend
+    await backend.close()
+
+
+async def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend(60.0)
+
+
+async def test_get_returns_what_set_stored(cache):
+    assert await cache.get("list", PARAMS) is None
+
+    await cache.set("list", PARAMS, {"items": [1, 2], "total": 2})
+
+    assert await cache.get("list", PARAMS) == {"items": [1, 2], "total": 2}
+    assert await cache.get("list", ("other",)) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+async def test_namespace_invalidation_bumps_the_generation(cache):
+    await cache.set("list", PARAMS, 1)
+    await cache.set("stats", PARAMS, 2)
+    generation = await cache.generation("list")
+
+    await cache.invalidate(["list"])
+
+    assert await cache.generation("list") == generation + 1
+    assert await cache.get("list", PARAMS) is None
+    assert await cache.get("stats", PARAMS) == 2
+
+
+async def test_value_computed_before_an_invalidation_is_not_served(cache):
+    generation = await cache.generation("list")
+    await cache.invalidate(["list"])
+
+    await cache.set("list", PARAMS, "stale", generation)
+
+    assert await cache.get("list", PARAMS) is None
+
+
+async def test_single_entry_invalidation_keeps_the_rest_of_the_namespace(cache):
+    await cache.set("list", PARAMS, 1)
+    await cache.set("list", ("other",), 2)
+
+    await cache.invalidate(["list"], PARAMS)
+
+    assert await cache.get("list", PARAMS) is None
+    assert await cache.get("list", ("other",)) == 2
+
+
+async def test_concurrent_misses_compute_once(cache):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return {"total": calls}
+
+    results = await asyncio.gather(*(cache.get_or_compute("list", PARAMS, compute) for _ in range(3)))
+
+    assert calls == 1
+    assert results == [{"total": 1}] * 3
+    assert cache.coalesced == 2
+
+
+async def test_results_read_within_the_lag_window_of_a_write_are_not_stored(cache):
+    async def compute():
+        return "replica"
+
+    await cache.invalidate(["list"])
+
+    assert await cache.get_or_compute("list", PARAMS, compute, lag_seconds=60.0) == "replica"
+    assert await cache.get("list", PARAMS) is None
+    assert await cache.get_or_compute("list", PARAMS, compute, lag_seconds=0.0) == "replica"
+    assert await cache.get("list", PARAMS) == "replica"
+
+
+async def test_lock_waits_for_the_holder(cache):
+    async def second_caller():
+        async with cache.lock("list", PARAMS) as waited:
+            return waited
+
+    async with cache.lock("list", PARAMS) as waited:
+        assert waited is False
+        second = asyncio.create_task(second_caller())
+        await asyncio.sleep(0.1)
+        assert not second.done()
+    assert await second is True
+
+
+async def test_redis_lock_is_set_nx_and_released_only_by_its_holder():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    cache = RedisCacheBackend(redis, lock_timeout=5.0, prefix="test")
+    key = 'test:list:lock:["students",1,["science","A"]]'
+
+    async with cache.lock("list", PARAMS):
+        assert await redis.get(key) is not None
+        assert not await redis.set(key, "other", nx=True)
+        # Expired and taken over by another worker: the release must leave it alone
+        await redis.set(key, "other")
+    assert await redis.get(key) == b"other"
+
+    await redis.delete(key)
+    async with cache.lock("list", PARAMS):
+        pass
+    assert await redis.get(key) is None
+    await cache.close()
+
+
+async def test_redis_lock_gives_up_after_the_timeout():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    cache = RedisCacheBackend(redis, lock_timeout=0.2, prefix="test")
+    key = 'test:list:lock:["students",1,["science","A"]]'
+    await redis.set(key, "stuck")
+
+    async with cache.lock("list", PARAMS) as waited:
+        assert waited is True
+
+    assert await redis.get(key) == b"stuck"
+    await cache.close()
@@ -0,0 +1,34 @@
+"""The student cache around writes: clients read their own writes, lagging replica reads are not stored."""
+import pytest
+
+from app.db.session import REPLICA_SESSION, READ_YOUR_WRITES_SESSION
+from app.schemas.student import StudentCreate
+from app.services.cache import MemoryCacheBackend
+from app.services.cached_student_service import CachedStudentService, STATS
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.parametrize("cohort", [{"count": 20, "seed": 3}], indirect=True),
+]
+
+NEW_STUDENT = StudentCreate(first_name="Dara", last_name="Sok", gender="F", math_score=70.0)
+
+
+async def test_write_followed_by_a_cached_read(cohort):
+    cache = MemoryCacheBackend(ttl_seconds=60.0)
+    service = CachedStudentService(cohort, cache)
+    cohort.info[REPLICA_SESSION] = True
+    before = await service.get_statistics()
+    assert await cache.get(STATS, ("overview",)) is not None
+
+    await service.create_student(NEW_STUDENT)
+
+    # A replica read right after the write is served but not stored: the replica may lag
+    assert (await service.get_statistics()).total_students == before.total_students + 1
+    assert await cache.get(STATS, ("overview",)) is None
+
+    # What a lagging replica returned is never served to the client that wrote
+    await cache.set(STATS, ("overview",), before.model_dump(mode="json"))
+    del cohort.info[REPLICA_SESSION]
+    cohort.info[READ_YOUR_WRITES_SESSION] = True
+    assert (await service.get_statistics()).total_students == before.total_students + 1
@@ -0,0 +1,34 @@
+"""ETags of the student reads: If-None-Match parsing and the versions they follow."""
+import pytest
+from sqlalchemy import update
+
+from app.api.v1.dependencies import _etag_matches
+from app.models.scoring_scheme import ScoringScheme
+from app.services.student_service import StudentService
+
+ETAG = '"students-12"'
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('"students-12"', True),
+    ('W/"students-12"', True),
+    ('"students-11", W/"students-12"', True),
+    ('"students-11",W/"students-13"', False),
+    ("*", True),
+    (" * ", True),
+    ('"students-1", ,', False),
+])
+def test_if_none_match(header, matches):
+    assert _etag_matches(header, ETAG) is matches
+
+
+@pytest.mark.anyio
+async def test_scoring_scheme_writes_change_the_version(db):
+    service = StudentService(db)
+    before = await service.get_version()
+
+    await db.execute(update(ScoringScheme).values(khmer_max=ScoringScheme.khmer_max))
+    await db.commit()
+
+    assert await service.get_version() > before
@@ -0,0 +1,119 @@
+"""Parity of GradeCalculator.calculate_batch with the per-student methods."""
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.models.student import ClassTypeEnum, GradeEnum
+from app.services.grade_calculator import GradeCalculator
+
+COLUMNS = GradeCalculator.BATCH_SCORE_COLUMNS
+OPTIONAL_COLUMNS = [name for name in COLUMNS if name not in GradeCalculator._REQUIRED_SCORE_COLUMNS]
+
+
+def make_student(class_type: ClassTypeEnum, **scores) -> SimpleNamespace:
+    """A student with every batch column, unset optional scores being None."""
+    values = {name: None for name in OPTIONAL_COLUMNS}
+    values.update(math_score=0.0, earth_science_score=0.0)
+    values.update(scores)
+    return SimpleNamespace(class_type=class_type, **values)
+
+
+def random_students(count: int, seed: int) -> list:
+    """Random scores, foreign language around the bonus limit and missing optional subjects."""
+    rng = random.Random(seed)
+    students = []
+    for _ in range(count):
+        scores = {name: round(rng.uniform(0, 125), rng.choice([0, 1, 2])) for name in COLUMNS}
+        scores["foreign_language_score"] = rng.choice([None, 0.0, 25.0, 25.5, 26.0, rng.uniform(0, 50)])
+        for name in OPTIONAL_COLUMNS:
+            if rng.random() < 0.15:
+                scores[name] = None
+        students.append(make_student(rng.choice(list(ClassTypeEnum)), **scores))
+    return students
+
+
+def threshold_students() -> list:
+    """Totals whose average lands exactly on each grade threshold, and just below it."""
+    students = []
+    for class_type in ClassTypeEnum:
+        for limit in GradeCalculator.GRADE_THRESHOLDS.values():
+            total = limit * 475.0 / 100.0
+            for value in (total, np.nextafter(total, 0.0), total - 0.5):
+                # khmer_score counts for both class types
+                students.append(make_student(class_type, khmer_score=max(float(value), 0.0)))
+        students.append(make_student(class_type, khmer_score=450.0, foreign_language_score=50.0))
+        students.append(make_student(class_type, math_score=475.0))
+    return students
+
+
+def batch(students: list) -> dict:
+    return GradeCalculator.calculate_batch(
+        [student.class_type for student in students],
+        {name: [getattr(student, name) for student in students] for name in COLUMNS},
+    )
+
+
+def assert_matches_scalar(students: list, result: dict):
+    assert result["total_score"].tolist() == [GradeCalculator.calculate_total_score(s) for s in students]
+    assert result["average_score"].tolist() == [GradeCalculator.calculate_average(s) for s in students]
+    assert result["grade"].tolist() == [GradeCalculator.calculate_grade(s).value for s in students]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_batch_matches_scalar_for_random_scores(seed):
+    students = random_students(500, seed)
+
+    assert_matches_scalar(students, batch(students))
+
+
+def test_batch_matches_scalar_on_grade_thresholds():
+    students = threshold_students()
+
+    result = batch(students)
+
+    assert_matches_scalar(students, result)
+    for class_type in ClassTypeEnum:
+        on_threshold = [
+            grade for student, grade in zip(students, result["grade"].tolist())
+            if student.class_type == class_type and student.khmer_score in (427.5, 380.0, 332.5, 285.0, 237.5)
+        ]
+        assert on_threshold == ["A", "B", "C", "D", "E"]
+
+
+@pytest.mark.parametrize("class_type", list(ClassTypeEnum))
+def test_batch_matches_scalar_with_missing_subjects(class_type):
+    students = [make_student(class_type)] + [
+        make_student(class_type, math_score=60.0, earth_science_score=40.0, **{name: 70.0})
+        for name in OPTIONAL_COLUMNS
+    ]
+
+    assert_matches_scalar(students, batch(students))
+
+
+def test_batch_accepts_numpy_arrays():
+    students = [student for student in random_students(200, seed=4) if all(
+        getattr(student, name) is not None for name in COLUMNS
+    )]
+
+    result = GradeCalculator.calculate_batch(
+        np.array([student.class_type.value for student in students]),
+        {name: np.array([getattr(student, name) for student in students]) for name in COLUMNS},
+    )
+
+    assert_matches_scalar(students, result)
+
+
+def test_update_students_grades_matches_update_student_grades():
+    students = random_students(100, seed=5)
+    expected = random_students(100, seed=5)
+
+    GradeCalculator.update_students_grades(students)
+    for student in expected:
+        GradeCalculator.update_student_grades(student)
+
+    assert [(s.total_score, s.average_score, s.grade) for s in students] == [
+        (s.total_score, s.average_score, s.grade) for s in expected
+    ]
+    assert all(isinstance(student.grade, GradeEnum) for student in students)
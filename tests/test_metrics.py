@@ -0,0 +1,35 @@
+"""Prometheus text rendering of the in-process metrics."""
+import pytest
+
+from app.core.metrics import Counter, Histogram, Metric, Registry
+
+
+def test_metric_without_samples_cannot_be_created():
+    class Incomplete(Metric):
+        type = "untyped"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "No samples")
+
+
+def test_registry_renders_counters_and_histograms():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ("route",)))
+    duration = registry.register(Histogram("duration_seconds", "Latency", buckets=(0.1, 1.0)))
+
+    requests.inc(('/a"b',))
+    duration.observe((), 0.05)
+    duration.observe((), 2.0)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 1',
+        "# HELP duration_seconds Latency",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{le="0.1"} 1',
+        'duration_seconds_bucket{le="1.0"} 1',
+        'duration_seconds_bucket{le="+Inf"} 2',
+        "duration_seconds_sum 2.05",
+        "duration_seconds_count 2",
+    ]
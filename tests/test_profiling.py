@@ -0,0 +1,29 @@
+"""X-Profile captures: the response names the profile without revealing server paths."""
+import os
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+async def hello(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"hello"})
+
+
+async def test_cprofile_capture_returns_only_the_file_name(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    transport = httpx.ASGITransport(app=ProfilingMiddleware(hello))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/students", headers={"X-Profile": "cprofile"})
+
+    name = response.headers["x-profile-file"]
+    assert os.path.basename(name) == name
+    assert str(tmp_path) not in name
+    assert (tmp_path / name).is_file()
+    assert "total;dur=" in response.headers["server-timing"]
@@ -0,0 +1,72 @@
+"""The shared query timer: one timing per statement, nothing left behind by failed statements."""
+import json
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.metrics import current_timings, install_query_metrics, RequestTimings
+from app.db.query_log import QueryLogger, add_query_observer, logger
+from app.db.session import _database_url
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordList(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+async def slow_query_log():
+    """An engine whose QueryLogger logs every statement as slow, and the logged records."""
+    handler = RecordList()
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.WARNING)
+    query_engine = create_async_engine(_database_url(settings.DATABASE_URL, settings.DB_DRIVER), poolclass=NullPool)
+    QueryLogger(sample_percent=0.0, slow_ms=0.0).install(query_engine.sync_engine)
+    try:
+        yield query_engine, handler.records
+    finally:
+        await query_engine.dispose()
+        logger.setLevel(level)
+        logger.removeHandler(handler)
+
+
+async def test_failed_statements_leave_no_timing_state(db, slow_query_log):
+    query_engine, records = slow_query_log
+    install_query_metrics(query_engine.sync_engine)
+    observed = []
+    add_query_observer(query_engine.sync_engine, lambda *args: observed.append(args))
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+
+    try:
+        async with query_engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(DBAPIError):
+                    async with connection.begin_nested():
+                        await connection.execute(text("SELECT 1 / 0"))
+            await connection.execute(text("SELECT pg_sleep(0.05)"))
+
+            assert connection.sync_connection.info == {}
+    finally:
+        current_timings.reset(token)
+
+    cursor, statement, executemany, duration = observed[-1]
+    assert "pg_sleep" in statement
+    assert 0.05 <= duration < 1
+    # The query log and the metrics see the same single timing of each statement
+    assert records[-1]["statement"] == "SELECT pg_sleep(?)"
+    assert records[-1]["duration_ms"] == round(duration * 1000, 3)
+    assert timings.db_queries == len(observed) == len(records)
+    assert timings.db_seconds == pytest.approx(sum(args[-1] for args in observed))
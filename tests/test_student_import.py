@@ -0,0 +1,64 @@
+"""Bulk import: batches the database rejects are rolled back and reported once."""
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.student import Student
+from app.services.student_import import StudentImporter
+from app.services.student_stats_store import StudentStatsStore
+
+pytestmark = pytest.mark.anyio
+
+
+def student(first_name: str, **fields) -> dict:
+    return {"first_name": first_name, "last_name": "Test", "gender": "F", "math_score": 40, **fields}
+
+
+# Valid for StudentCreate, rejected by PostgreSQL (text cannot contain NUL)
+REJECTED = student("Bad\x00Name")
+
+
+async def run_import(db, records: list, batch_size: int) -> dict:
+    async def lines():
+        for record in records:
+            yield json.dumps(record)
+
+    importer = StudentImporter(db)
+    importer.BATCH_SIZE = batch_size
+    return await importer.import_students(lines(), "ndjson")
+
+
+async def test_rejected_batch_is_rolled_back_and_reported_once(db):
+    records = [student("A"), student("B"), student("C"), REJECTED, {"first_name": "missing fields"}]
+
+    result = await run_import(db, records, batch_size=2)
+
+    assert result["inserted"] == 2
+    assert result["failed"] == 3
+    assert result["failed_batches"] == 1
+    row_error, batch_error = sorted(result["errors"], key=lambda error: error["line"], reverse=True)
+    assert row_error["line"] == 5
+    assert (batch_error["line"], batch_error["last_line"]) == (3, 4)
+    assert [error["type"] for error in batch_error["errors"]] == ["database_error"]
+    assert batch_error["errors"][0]["rows"] == 2
+    assert await db.scalar(select(func.count()).select_from(Student)) == 2
+    assert await StudentStatsStore(db).check() == []
+
+
+async def test_batches_after_a_rejected_batch_are_imported(db):
+    records = [
+        student("A"), REJECTED,
+        student("B"), student("C", class_type="science", chemistry_score=60),
+        student("D", class_type="science"), student("E"),
+    ]
+
+    result = await run_import(db, records, batch_size=2)
+
+    assert (result["inserted"], result["failed"], result["failed_batches"]) == (4, 2, 1)
+    names = (await db.execute(select(Student.first_name).order_by(Student.id))).scalars().all()
+    assert names == ["B", "C", "D", "E"]
+    science = await db.scalar(select(Student).where(Student.first_name == "C"))
+    assert science.scoring_scheme.class_type.value == "science"
+    assert science.total_score > 0
+    assert await StudentStatsStore(db).check() == []
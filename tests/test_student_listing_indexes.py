@@ -0,0 +1,79 @@
+"""The planner uses the listing indexes (b7e41c9a2d53) for the queries StudentService sends."""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+
+from app.db.session import engine
+from app.services.student_service import StudentService
+
+# Large enough for an index to beat a sequential scan
+COHORT_SIZE = 20_000
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.parametrize("cohort", [{"count": COHORT_SIZE, "seed": 4}], indirect=True),
+]
+
+
+@contextmanager
+def captured_statements():
+    """Collect the (statement, parameters) sent to the database."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def listing_plan(db, **params) -> str:
+    """EXPLAIN of the SELECT behind a students listing."""
+    with captured_statements() as statements:
+        await StudentService(db).list_students_paginated(count="none", rows=True, **params)
+    statement, parameters = statements[-1]
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.parametrize(
+    "params, index",
+    [
+        ({"class_type": "science", "grade": "A"}, "ix_students_class_type_grade_id"),
+        ({"sort_by": "total_score", "sort_order": "desc"}, "ix_students_total_score_id"),
+        ({"sort_by": "average_score"}, "ix_students_average_score_id"),
+        ({"sort_by": "last_name"}, "ix_students_last_name_id"),
+        ({"sort_by": "first_name", "sort_order": "desc"}, "ix_students_first_name_id"),
+        ({"sort_by": "total_score", "sort_order": "desc", "after": ""}, "ix_students_total_score_id"),
+        ({"sort_by": "average_score", "page": 50}, "ix_students_average_score_id"),
+    ],
+)
+async def test_listing_uses_index(cohort, params, index):
+    plan = await listing_plan(cohort, **params)
+
+    assert index in plan, plan
+    assert "Seq Scan on students" not in plan, plan
+
+
+async def test_name_search_uses_trigram_index(cohort):
+    result = await cohort.execute(
+        text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_students_full_name_trgm'")
+    )
+    if result.scalar() is None:
+        pytest.skip("pg_trgm index not available in the test database")
+    await cohort.execute(text(
+        "INSERT INTO students (first_name, last_name, gender, class_type, scoring_scheme_id) "
+        "SELECT 'Quillon', 'Zephyrine', 'F', 'science', scoring_scheme_id FROM students LIMIT 1"
+    ))
+    await cohort.execute(text("ANALYZE students"))
+    await cohort.commit()
+
+    plan = await listing_plan(cohort, search="phyri")
+
+    assert "ix_students_full_name_trgm" in plan, plan
+    assert "Seq Scan on students" not in plan, plan
@@ -0,0 +1,70 @@
+"""Ranks and class sizes, with and without the statistics summary tables."""
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.student import Student
+from app.services.student_ranking import StudentRanking
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.parametrize("cohort", [{"count": 60, "seed": 9}], indirect=True),
+]
+
+
+@pytest.fixture
+async def unranked(cohort):
+    """The cohort, its first 5 students without a total score."""
+    await cohort.execute(update(Student).where(Student.id <= 5).values(total_score=None))
+    await cohort.commit()
+    return cohort
+
+
+@pytest.mark.parametrize("materialized", [False, True])
+@pytest.mark.parametrize("class_type", [None, "science", "social_science"])
+async def test_class_size_counts_only_ranked_students(unranked, monkeypatch, materialized, class_type):
+    monkeypatch.setattr(settings, "STATS_MATERIALIZED", materialized)
+    ranked = select(Student.id).where(Student.total_score.isnot(None))
+    if class_type:
+        ranked = ranked.where(Student.class_type == class_type)
+    expected = len((await unranked.execute(ranked)).all())
+
+    assert await StudentRanking(unranked).class_size(class_type) == expected
+
+
+@pytest.mark.parametrize("materialized", [False, True])
+async def test_last_student_has_percent_rank_one(unranked, monkeypatch, materialized):
+    monkeypatch.setattr(settings, "STATS_MATERIALIZED", materialized)
+    last = await unranked.scalar(
+        select(Student.id)
+        .where(Student.class_type == "science", Student.total_score.isnot(None))
+        .order_by(Student.total_score, Student.id)
+        .limit(1)
+    )
+
+    rank = await StudentRanking(unranked).get_rank(last)
+
+    assert rank.rank == rank.class_size
+    assert rank.percent_rank == 1.0
+
+
+async def test_student_without_a_total_score_is_found_but_not_ranked(unranked):
+    ranking = StudentRanking(unranked)
+
+    rank = await ranking.get_rank(1)
+
+    assert (rank.student_id, rank.total_score, rank.rank, rank.percent_rank) == (1, None, None, None)
+    assert rank.class_size == await ranking.class_size(rank.class_type.value)
+    assert await ranking.get_rank(10_000) is None
+
+
+async def test_leaderboard_lists_students_without_an_average_score(unranked):
+    best = await unranked.scalar(
+        select(Student.id).where(Student.total_score.isnot(None)).order_by(Student.total_score.desc()).limit(1)
+    )
+    await unranked.execute(update(Student).where(Student.id == best).values(average_score=None))
+    await unranked.commit()
+
+    leaderboard = await StudentRanking(unranked).get_leaderboard(top=3)
+
+    assert (leaderboard.items[0].id, leaderboard.items[0].average_score) == (best, None)
@@ -0,0 +1,118 @@
+"""Parity of the SQL aggregate statistics with the former per-student Python loops."""
+import random
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.student import Student, ClassTypeEnum, GenderEnum, GradeEnum
+from app.schemas.student import StudentCreate, StudentStats
+from app.services.grade_calculator import GradeCalculator
+from app.services.scoring_scheme_service import ScoringSchemeService
+from app.services.student_builder import build_student
+from app.services.student_stats_engine import StudentStatsEngine
+
+pytestmark = pytest.mark.anyio
+
+SCORE_FIELDS = [
+    "khmer_score", "math_score", "history_score", "geography_score", "ethics_score",
+    "earth_science_score", "chemistry_score", "physics_score", "biology_score",
+    "physical_education_score", "foreign_language_score",
+]
+
+
+def python_statistics(students) -> StudentStats:
+    """StudentService.get_statistics before the aggregate engine: loops over every student."""
+    total_students = len(students)
+    pass_count = sum(1 for s in students if s.grade and GradeCalculator.is_passing(s.grade))
+
+    grade_distribution = {grade.value: 0 for grade in GradeEnum}
+    for student in students:
+        if student.grade:
+            grade_distribution[student.grade.value] += 1
+
+    subject_stats = {subject: {"pass": 0, "fail": 0} for subject in StudentStatsEngine.OVERVIEW_SUBJECTS}
+    for student in students:
+        for subject in StudentStatsEngine.OVERVIEW_SUBJECTS:
+            score = getattr(student, f"{subject}_score")
+            max_score = getattr(student, f"{subject}_max")
+            if max_score > 0:
+                if (score / max_score) * 100 >= 50:
+                    subject_stats[subject]["pass"] += 1
+                else:
+                    subject_stats[subject]["fail"] += 1
+
+    return StudentStats(
+        total_students=total_students,
+        pass_count=pass_count,
+        fail_count=total_students - pass_count,
+        grade_distribution=grade_distribution,
+        subject_stats=subject_stats,
+    )
+
+
+def random_scores(rng: random.Random, schemes: dict, class_type: ClassTypeEnum) -> dict:
+    """Scores spread over the whole range, with many exactly on the 25/50/75% boundaries."""
+    scheme = schemes[class_type]
+    scores = {}
+    for field in SCORE_FIELDS:
+        max_score = getattr(scheme, field.replace("_score", "_max"))
+        if rng.random() < 0.3:
+            scores[field] = max_score * rng.choice([0.0, 0.25, 0.5, 0.75, 1.0])
+        else:
+            scores[field] = round(rng.uniform(0, max_score), 2)
+    return scores
+
+
+async def add_cohort(db, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    service = ScoringSchemeService(db)
+    schemes = {class_type: await service.current_scheme(class_type) for class_type in ClassTypeEnum}
+    for index in range(count):
+        class_type = rng.choice(list(ClassTypeEnum))
+        data = StudentCreate(
+            first_name=f"First{index}",
+            last_name=f"Last{index}",
+            gender=rng.choice(list(GenderEnum)),
+            class_type=class_type,
+            **random_scores(rng, schemes, class_type),
+        )
+        student = build_student(data, schemes[class_type])
+        GradeCalculator.update_student_grades(student)
+        if rng.random() < 0.05:
+            student.grade = None  # Ungraded students count as failing
+        db.add(student)
+    await db.commit()
+
+
+async def test_overview_statistics_match_python_loops(db):
+    await add_cohort(db, 400)
+    students = list((await db.execute(select(Student))).scalars().all())
+
+    assert await StudentStatsEngine(db).get_statistics() == python_statistics(students)
+
+
+async def test_overview_statistics_of_an_empty_table(db):
+    assert await StudentStatsEngine(db).get_statistics() == python_statistics([])
+
+
+async def test_detailed_statistics_of_a_subject_without_scores(db):
+    service = ScoringSchemeService(db)
+    scheme = await service.current_scheme(ClassTypeEnum.SCIENCE)
+    for index in range(3):
+        data = StudentCreate(
+            first_name=f"First{index}", last_name="Last", gender=GenderEnum.FEMALE,
+            class_type=ClassTypeEnum.SCIENCE, math_score=60.0,
+        )
+        student = build_student(data, scheme)
+        GradeCalculator.update_student_grades(student)
+        db.add(student)
+    await db.flush()
+    await db.execute(update(Student).values(chemistry_score=None, average_score=None))
+    await db.commit()
+
+    stats = await StudentStatsEngine(db).get_detailed_statistics("science")
+
+    chemistry = stats["subject_averages"]["chemistry"]
+    assert (chemistry["average"], chemistry["highest"], chemistry["lowest"]) == (None, None, None)
+    assert chemistry["total_students"] == 3
+    assert stats["gender_stats"]["female"]["average"] is None
@@ -0,0 +1,108 @@
+"""Incremental maintenance of the statistics summary tables."""
+import asyncio
+
+import pytest
+from sqlalchemy import select, update
+
+from app.db.session import AsyncSessionLocal
+from app.models.student import Student
+from app.models.student_stats import StudentSubjectStat
+from app.schemas.student import StudentCreate, StudentUpdate
+from app.services.grade_calculator import GradeCalculator
+from app.services.student_service import StudentService
+from app.services.student_stats_engine import StudentStatsEngine
+from app.services.student_stats_store import StudentStatsStore, StatsDelta
+
+pytestmark = pytest.mark.anyio
+
+
+async def lower_math_score(session, student_id: int) -> StatsDelta:
+    """Set a student's math score to 0 and flush, returning the statistics delta."""
+    student = await session.get(Student, student_id)
+    old = StatsDelta.snapshot(student)
+    student.math_score = 0.0
+    GradeCalculator.update_student_grades(student)
+    await session.flush()
+    delta = StatsDelta()
+    delta.change(old, StatsDelta.snapshot(student))
+    return delta
+
+
+@pytest.mark.parametrize("cohort", [{"count": 500, "science_share": 0.0, "seed": 11}], indirect=True)
+async def test_concurrent_removals_of_the_max_score_keep_the_tables_consistent(cohort, db):
+    top = (await db.execute(
+        select(Student.id).order_by(Student.math_score.desc()).limit(2)
+    )).scalars().all()
+    await db.commit()
+
+    async def remove_max(student_id: int):
+        async with AsyncSessionLocal() as session:
+            delta = await lower_math_score(session, student_id)
+            await StudentStatsStore(session).apply(delta)
+            await session.commit()
+
+    await asyncio.gather(remove_max(top[0]), remove_max(top[1]))
+
+    store = StudentStatsStore(db)
+    assert await store.check() == []
+    third = await db.scalar(select(Student.math_score).order_by(Student.math_score.desc()).limit(1))
+    assert (await store.get_detailed_statistics())["subject_averages"]["math"]["highest"] == round(third, 2)
+
+    await store.refresh()
+    row = (await db.execute(
+        select(StudentSubjectStat).where(StudentSubjectStat.subject == "math")
+    )).scalar_one()
+    assert (row.score_max, row.extremes_stale) == (third, False)
+    assert await store.check() == []
+
+
+async def assert_matches_live(db):
+    """The summary tables are consistent and give the live statistics, stale rows included."""
+    store, engine = StudentStatsStore(db), StudentStatsEngine(db)
+    assert await store.check() == []
+    assert await store.get_statistics() == await engine.get_statistics()
+    for class_type in (None, "science", "social_science"):
+        assert await store.get_detailed_statistics(class_type) == await engine.get_detailed_statistics(class_type)
+
+
+@pytest.mark.parametrize("cohort", [{"count": 300, "seed": 12}], indirect=True)
+async def test_materialized_statistics_match_the_live_ones(cohort, db):
+    # Missing scores and averages, which the engine counts but does not aggregate
+    await db.execute(
+        update(Student).where(Student.id % 7 == 0).values(chemistry_score=None, khmer_score=None, average_score=None)
+    )
+    await db.execute(update(Student).where(Student.id % 11 == 0).values(history_score=None))
+    await StudentStatsStore(db).rebuild()
+    await db.commit()
+
+    await assert_matches_live(db)
+
+
+@pytest.mark.parametrize("cohort", [{"count": 120, "seed": 13}], indirect=True)
+async def test_student_writes_keep_the_tables_consistent(cohort, db):
+    service = StudentService(cohort)
+    top = await db.scalar(select(Student.id).order_by(Student.math_score.desc(), Student.id).limit(1))
+    lowest = await db.scalar(select(Student.id).order_by(Student.khmer_score, Student.id).limit(1))
+
+    created = await service.create_student(StudentCreate(
+        first_name="Dara", last_name="Sok", gender="M", class_type="science", math_score=125.0, physics_score=3.5,
+    ))
+    await assert_matches_live(db)
+
+    await service.update_student(created.id, StudentUpdate(chemistry_score=None, biology_score=80.0))
+    await service.update_student(lowest, StudentUpdate(khmer_score=70.0))
+    await assert_matches_live(db)
+
+    # Changing class type moves the student to the other scheme's rows
+    await service.update_student(top, StudentUpdate(class_type="social_science"))
+    await service.update_student(created.id, StudentUpdate(class_type="social_science"))
+    await assert_matches_live(db)
+
+    first = await db.scalar(select(Student.id).order_by(Student.id).limit(1))
+    for student_id in (first, top, created.id):
+        assert await service.delete_student(student_id)
+    await assert_matches_live(db)
+
+    await StudentStatsStore(db).refresh()
+    assert await db.scalar(select(StudentSubjectStat.subject).where(StudentSubjectStat.extremes_stale)) is None
+    await assert_matches_live(db)